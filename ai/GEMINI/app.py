@@ -1,68 +1,411 @@
-from google import genai
-from google.genai import types
-from dotenv import load_dotenv
+"""Lumi generation library: prompt filtering, Manim code generation and rendering
+
+Importing this module is cheap and has no side effects. The Gemini client,
+prompt templates, response cache and render pool are created on first use
+and reused by every later call in the process.
+"""
+import functools
 import os
-import sys
 import re
+import string
+
+from ai.GEMINI.cache import ResponseCache, make_key
+from ai.GEMINI.context_cache import ContextCacheRegistry
+from ai.GEMINI.instructions import load_index, load_template
+from ai.GEMINI.usage import DEFAULT_USAGE_PATH, UsageLog, load_records
+
+MODEL = "gemini-2.5-flash-preview-05-20"
+CODE_BLOCK_PATTERN = re.compile(r'```python\s*\n(.*?)\n```', re.DOTALL)
+PROMPTS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "prompts")
+
+
+@functools.lru_cache(maxsize=None)
+def get_client():
+    """Return the process-wide genai.Client, creating it on first use"""
+    from dotenv import load_dotenv
+    from google import genai
+
+    load_dotenv()
+    return genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+
+@functools.lru_cache(maxsize=None)
+def get_response_cache():
+    return ResponseCache()
+
+
+@functools.lru_cache(maxsize=None)
+def get_context_caches():
+    return ContextCacheRegistry()
+
 
-load_dotenv()
+@functools.lru_cache(maxsize=None)
+def get_usage_log():
+    return UsageLog(DEFAULT_USAGE_PATH)
 
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+@functools.lru_cache(maxsize=None)
+def get_prompt_index():
+    """Near-duplicate index of past prompts; LUMI_REUSE_THRESHOLD sets its similarity"""
+    from ai.dedup import PromptIndex
+
+    return PromptIndex(threshold=float(os.getenv("LUMI_REUSE_THRESHOLD", "0.7")))
+
+
+@functools.lru_cache(maxsize=None)
+def get_render_pool(max_workers=None):
+    from render.pool import RenderPool
+
+    return RenderPool(max_workers=max_workers)
+
+
+@functools.lru_cache(maxsize=None)
+def get_background_pool():
+    """The low-priority pool every progressive upgrade in the process queues on"""
+    from render.progressive import make_background_pool
+
+    return make_background_pool()
 
 
 def load_system_instruction():
-    system_instruction_path = os.path.join(os.path.dirname(
-        __file__), "..", "..", "prompts", "SystemInstruction.md")
-    with open(system_instruction_path, "r", encoding="utf-8") as f:
-        return f.read()
+    """The complete system instruction, every section included"""
+    return load_index(os.path.join(PROMPTS_DIR, "SystemInstruction.md")).full()
+
 
+def select_system_instruction(brief):
+    """The system instruction sliced to the sections relevant to `brief`
 
+    Only what the filter model wrote into the brief's placeholders is matched,
+    not the fixed wording of the userFilterPrompt format around it.
+    """
+    template = load_template(os.path.join(PROMPTS_DIR, "userFilterPrompt.md"))
+    index = load_index(os.path.join(PROMPTS_DIR, "SystemInstruction.md"))
+    return index.assemble(template.strip(brief))
+
+
+@functools.lru_cache(maxsize=None)
 def load_user_filter_instruction():
-    user_filter_instruction_path = os.path.join(os.path.dirname(
-        __file__), "..", "..", "prompts", "userFilterPrompt.md")
+    user_filter_instruction_path = os.path.join(PROMPTS_DIR, "userFilterPrompt.md")
     with open(user_filter_instruction_path, "r", encoding="utf-8") as f:
         return f.read()
 
 
+@functools.lru_cache(maxsize=None)
+def load_repair_template():
+    repair_prompt_path = os.path.join(PROMPTS_DIR, "repairPrompt.md")
+    with open(repair_prompt_path, "r", encoding="utf-8") as f:
+        return string.Template(f.read())
+
+
 def extract_python_code_blocks(text):
     """Extract content between ```python and ``` markers"""
-    pattern = r'```python\s*\n(.*?)\n```'
-    matches = re.findall(pattern, text, re.DOTALL)
+    matches = CODE_BLOCK_PATTERN.findall(text)
     return '\n\n'.join(matches) if matches else text
 
 
-system_instruction = load_system_instruction()
-user_filter_prompt = load_user_filter_instruction()
+def make_config(system_instruction, cached_content=None):
+    from google.genai import types
 
-user_prompt = '''
-create me animation video explaning the creation and fucntioning of neural networks.
+    if cached_content:
+        return types.GenerateContentConfig(cached_content=cached_content)
+    return types.GenerateContentConfig(system_instruction=system_instruction)
 
-'''
+
+def request_config(client, model, system_instruction, use_context_cache=True):
+    """Return (config, cached_content_name) for a request with this static prefix"""
+    cached_content = None
+    if use_context_cache:
+        cached_content = get_context_caches().get(client, model, system_instruction)
+    return make_config(system_instruction, cached_content), cached_content
+
+
+async def arequest_config(client, model, system_instruction, use_context_cache=True):
+    """Async variant of request_config; never blocks the event loop on the registry"""
+    cached_content = None
+    if use_context_cache:
+        cached_content = await get_context_caches().aget(client, model, system_instruction)
+    return make_config(system_instruction, cached_content), cached_content
+
+
+@functools.lru_cache(maxsize=None)
+def get_default_provider(model=None, use_context_cache=True):
+    """The configured provider, shared by every call in the process
+
+    LUMI_PROVIDER picks the primary (default "gemini") and LUMI_HEDGE_PROVIDER,
+    when set, a secondary to hedge slow requests with; both take
+    "<provider>[:<model>]" specs. The hedge deadlines start from the
+    latencies already in the usage log. Each provider is queued behind the
+    shared rate limiter unless LUMI_RATE_LIMIT=0.
+    """
+    from dotenv import load_dotenv
+
+    from ai.providers import HedgedProvider, make_provider
+    from ai.ratelimit import RateLimitedProvider, RateLimiter
+
+    load_dotenv()
+    usage_log = get_usage_log()
+    limiter = RateLimiter() if os.getenv("LUMI_RATE_LIMIT", "1") != "0" else None
+
+    def build(spec, model=None, **options):
+        provider = make_provider(spec, model, usage_log=usage_log, **options)
+        return provider if limiter is None else RateLimitedProvider(provider, limiter)
+
+    primary_spec = os.getenv("LUMI_PROVIDER", "gemini")
+    options = {"use_context_cache": use_context_cache} if primary_spec.startswith("gemini") else {}
+    provider = build(primary_spec, model, **options)
+    hedge_spec = os.getenv("LUMI_HEDGE_PROVIDER")
+    if hedge_spec:
+        provider = HedgedProvider(provider, build(hedge_spec))
+        if os.path.exists(usage_log.path):
+            provider.seed(load_records(usage_log.path))
+    return provider
+
+
+def get_provider(model=None, genai_client=None, use_context_cache=True):
+    """The default provider, or a Gemini one bound to `genai_client` (e.g. a FakeClient)"""
+    if genai_client is None:
+        return get_default_provider(model, use_context_cache)
+    from ai.GEMINI.provider import GeminiProvider
+
+    return GeminiProvider(model, get_usage_log(), client=genai_client,
+                          use_context_cache=use_context_cache)
+
+
+def cache_completion(completion, system_instruction, contents):
+    """Store a non-empty response under the model that produced it"""
+    if completion.text:
+        get_response_cache().put(make_key(completion.model, system_instruction, contents),
+                                 completion.text, model=completion.model)
 
 
-print("Generating filtered prompt...")
-response = client.models.generate_content(
-    model="gemini-2.5-flash-preview-05-20",
-    config=types.GenerateContentConfig(
-        system_instruction=user_filter_prompt),
-    contents=user_prompt,
-)
+def generate_text(system_instruction, contents, model=None, use_cache=True,
+                  genai_client=None, use_context_cache=True, provider=None):
+    """Call the model through a provider, serving repeated requests from the response cache
+
+    Without an explicit `provider` the configured one is used (see
+    get_default_provider); `model` overrides its default model. Responses
+    are cached under the model that actually answered, so a hedged
+    secondary's text is never replayed as the primary's.
+    """
+    provider = provider or get_provider(model, genai_client, use_context_cache)
+    key = make_key(provider.model, system_instruction, contents)
+    if use_cache:
+        text = get_response_cache().get(key)
+        if text is not None:
+            return text
+    completion = provider.generate(system_instruction, contents)
+    if use_cache:
+        cache_completion(completion, system_instruction, contents)
+    return completion.text
+
+
+async def agenerate_text(system_instruction, contents, model=None, use_cache=True,
+                         genai_client=None, use_context_cache=True, provider=None):
+    """Async variant of generate_text"""
+    provider = provider or get_provider(model, genai_client, use_context_cache)
+    key = make_key(provider.model, system_instruction, contents)
+    if use_cache:
+        text = get_response_cache().get(key)
+        if text is not None:
+            return text
+    completion = await provider.agenerate(system_instruction, contents)
+    if use_cache:
+        cache_completion(completion, system_instruction, contents)
+    return completion.text
+
+
+def filter_prompt(user_prompt, **kwargs):
+    """Expand a raw user request into a detailed animation brief"""
+    return generate_text(load_user_filter_instruction(), user_prompt, **kwargs)
+
+
+def generate_code(filtered_prompt, system_instruction=None, **kwargs):
+    """Generate Manim code for an animation brief
+
+    Only the instruction sections relevant to the brief are sent unless a
+    `system_instruction` is given.
+    """
+    system_instruction = system_instruction or select_system_instruction(filtered_prompt)
+    response_text = generate_text(system_instruction, filtered_prompt, **kwargs)
+    return extract_python_code_blocks(response_text)
+
+
+def generate_animation(prompt, reuse_similar=True, generate=generate_code, **kwargs):
+    """Turn a plain-language request into runnable Manim code
+
+    With `reuse_similar`, a prompt that is a near-duplicate of an earlier
+    one (or whose filtered brief is) returns the earlier generation instead
+    of calling the model again. `generate` turns the brief into code, e.g.
+    generate_checked_code.
+    """
+    index = get_prompt_index() if reuse_similar else None
+    match = index.lookup(prompt) if index else None
+    if match is None:
+        filtered_prompt = filter_prompt(prompt, **kwargs)
+        match = index.lookup(filtered_prompt, fields=("filtered_prompt",)) if index else None
+        if match is None:
+            code = generate(filtered_prompt, **kwargs)
+            if index:
+                index.add(prompt, code, filtered_prompt)
+            return code
+        # Index this wording too, so the next variant matches without filtering
+        index.add(prompt, match.code, filtered_prompt)
+    print(f"Reusing the generation for a {match.similarity:.0%} similar "
+          f"{match.field.replace('_', ' ')}: {match.prompt.strip()[:80]!r}")
+    return match.code
+
+
+class GenerationError(RuntimeError):
+    def __init__(self, code, error, attempts):
+        super().__init__(f"code still failing after {attempts} attempts:\n{error}")
+        self.code = code
+        self.error = error
+        self.attempts = attempts
+
+
+def repair_request(filtered_prompt, code, error):
+    """(system_instruction, contents) asking the model to fix `code` given its error"""
+    contents = load_repair_template().safe_substitute(
+        brief=filtered_prompt, code=code, error=error)
+    # The error may point at a topic the brief never mentioned, e.g. MathTex
+    return select_system_instruction(f"{filtered_prompt}\n{error}"), contents
+
+
+def repair_code(filtered_prompt, code, error, **kwargs):
+    """Ask the model to fix `code` given the error it raised"""
+    response_text = generate_text(*repair_request(filtered_prompt, code, error), **kwargs)
+    return extract_python_code_blocks(response_text)
+
+
+def check_code(code, smoke_mode="skip", pool=None):
+    """Pre-flight check, then smoke-render generated code (on `pool`, default the shared one)
+
+    Returns (scene_name, None) when the code is clean, or (scene_name,
+    error) with the diagnostics or traceback to feed back to the model.
+    """
+    from render.preflight import preflight
+    from render.smoke import smoke_test
+
+    report = preflight(code)
+    if not report.ok:
+        return report.scene_name, report.summary()
+    if smoke_mode is None:
+        return report.scene_name, None
+    result = smoke_test(code, report.scene_name, smoke_mode, pool=pool or get_render_pool())
+    return report.scene_name, None if result.ok else result.feedback()
+
+
+def generate_checked_code(filtered_prompt, max_attempts=3, smoke_mode="skip", **kwargs):
+    """Generate code and regenerate it with the error attached until it runs
+
+    Each attempt is pre-flight checked and smoke-rendered; at most
+    `max_attempts` generations are made before GenerationError is raised.
+    """
+    code = generate_code(filtered_prompt, **kwargs)
+    for attempt in range(1, max_attempts + 1):
+        _, error = check_code(code, smoke_mode)
+        if error is None:
+            return code
+        print(f"Attempt {attempt}/{max_attempts} failed:\n{error}")
+        if attempt == max_attempts:
+            raise GenerationError(code, error, attempt)
+        code = repair_code(filtered_prompt, code, error, **kwargs)
+
+
+def render_animation(code, quality=None, smoke_mode="skip", reuse_video=True):
+    """Check generated code, then render it on the shared render pool
+
+    The full render only starts once pre-flight passes and, unless
+    `smoke_mode` is None, a smoke render finished without raising. A video
+    already rendered from identical code (e.g. a reused generation) at
+    `quality` or better is returned as is.
+    """
+    quality = quality or get_render_pool().quality
+    if reuse_video:
+        video_path = get_prompt_index().video_for(code, quality)
+        if video_path:
+            return video_path
+    report = _check_before_render(code, smoke_mode)
+    video_path = get_render_pool().submit(code, report.scene_name, quality=quality).result()
+    if video_path:
+        get_prompt_index().record_video(code, video_path, quality)
+    return video_path
+
+
+def _check_before_render(code, smoke_mode):
+    """Pre-flight and (unless `smoke_mode` is None) smoke-test code; returns the report"""
+    from render.preflight import PreflightError, preflight
+    from render.smoke import SmokeError, smoke_test
+
+    report = preflight(code)
+    if not report.ok:
+        raise PreflightError(report)
+    if smoke_mode is not None:
+        result = smoke_test(code, report.scene_name, smoke_mode, pool=get_render_pool())
+        if not result.ok:
+            raise SmokeError(result)
+    return report
+
+
+def render_animation_progressive(code, on_upgrade=None, smoke_mode="skip",
+                                 final_quality="high_quality"):
+    """Like render_animation, but return as soon as a low-quality preview is playable
+
+    Returns a render.progressive.ProgressiveRender whose `output_path` is
+    replaced in place by the `final_quality` video once the background
+    render finishes. A recorded video of this code at `final_quality` or
+    better is returned as done; a lower-quality one serves as the preview
+    and the upgrade still runs.
+    """
+    from render.pool import find_scene_class, quality_rank
+    from render.progressive import ProgressiveRender, render_progressive
+
+    video_path, video_quality = get_prompt_index().best_video(code)
+    if video_path and quality_rank(video_quality) >= quality_rank(final_quality):
+        return ProgressiveRender.completed(find_scene_class(code), video_path, video_quality)
+    # A recorded preview already rendered once, so only pre-flight is repeated
+    report = _check_before_render(code, None if video_path else smoke_mode)
+
+    def upgraded(render):
+        get_prompt_index().record_video(code, render.output_path, render.final_quality)
+        if on_upgrade is not None:
+            on_upgrade(render)
+
+    options = {}
+    if video_path:
+        options = {"preview_path": video_path, "preview_quality": video_quality}
+    return render_progressive(code, report.scene_name, pool=get_render_pool(),
+                              background_pool=get_background_pool(),
+                              final_quality=final_quality, on_upgrade=upgraded, **options)
+
+
+def main():
+    user_prompt = '''
+create me animation video explaning the creation and fucntioning of neural networks.
+
+'''
 
-filtered_prompt = response.text
-print(filtered_prompt)
+    print("Generating response...")
+    print("__" * 50)
+    extracted_code = generate_animation(user_prompt, generate=generate_checked_code)
+    print(extracted_code)
 
+    with open("response.txt", "w", encoding="utf-8") as f:
+        f.write(extracted_code)
 
-print("Generating response...")
-print("__" * 50)
-response = client.models.generate_content(
-    model="gemini-2.5-flash-preview-05-20",
-    config=types.GenerateContentConfig(
-        system_instruction=system_instruction),
-    contents=user_prompt,
-)
+    print("Rendering...")
+    # generate_checked_code already smoke-rendered this code (or an earlier run did)
+    render = render_animation_progressive(extracted_code, smoke_mode=None)
+    print(f"Preview saved to {render.output_path} (upgrading to {render.final_quality})")
+    video_path = render.result()
+    print(f"Video saved to {video_path}")
+    print(f"Response cache: {get_response_cache().stats()}")
+    print(f"Prompt reuse: {get_prompt_index().stats()}")
+    print(f"Model usage: {get_usage_log().totals()}")
+    if hasattr(get_default_provider(), "stats"):
+        print(f"Hedging: {get_default_provider().stats()}")
+    return video_path
 
-print(response.text)
-extracted_code = extract_python_code_blocks(response.text)
 
-with open("response.txt", "w", encoding="utf-8") as f:
-    f.write(extracted_code)
+if __name__ == "__main__":
+    main()
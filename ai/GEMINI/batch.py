@@ -0,0 +1,347 @@
+"""Resumable batch runner: JSONL prompts -> filter -> generate -> extract -> render
+
+Each input line is a JSON object with a "prompt" and optionally an "id" and
+a "quality". Every job's progress is checkpointed to its own state file
+after each stage, so rerunning the same command after a crash or a failed
+prompt picks every job up at its first unfinished stage. A results JSONL
+with per-stage timings is rewritten as jobs finish.
+
+Generated code is pre-flight checked and smoke-rendered, and sent back to
+the model with its error until it runs, before a full render is queued. A
+full render that still fails sends the job back to the generate stage,
+which repairs the checkpointed code with the render error attached.
+
+    python -m ai.GEMINI.batch unit3.jsonl --results unit3.results.jsonl
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+
+from ai.GEMINI.app import (GenerationError, agenerate_text, check_code,
+                           extract_python_code_blocks, load_user_filter_instruction,
+                           repair_request, select_system_instruction)
+from ai.GEMINI.cache import ROOT_DIR
+
+DEFAULT_STATE_ROOT = os.path.join(ROOT_DIR, ".cache", "batch")
+STAGES = ("filter", "generate", "render")
+
+
+@dataclass
+class JobState:
+    id: str
+    prompt: str
+    quality: str = None
+    completed: list = field(default_factory=list)
+    filtered_prompt: str = None
+    code_path: str = None
+    scene_name: str = None
+    video_path: str = None
+    error: str = None
+    failed_stage: str = None
+    repair_error: str = None
+    repairs: int = 0
+    attempts: int = 0
+    timings: dict = field(default_factory=dict)
+    updated_at: float = None
+
+
+def job_id(record, occurrence=0):
+    """The record's "id", else a digest of its prompt
+
+    `occurrence` counts earlier records with the same prompt, so repeated
+    prompts get distinct ids that do not shift when other lines are edited.
+    """
+    if record.get("id"):
+        return str(record["id"])
+    digest = hashlib.sha256(record["prompt"].encode("utf-8")).hexdigest()[:10]
+    return f"{digest}_{occurrence + 1}" if occurrence else digest
+
+
+def read_jobs(path):
+    """Parse the input JSONL into fresh JobStates (blank lines and # comments skipped)"""
+    jobs = []
+    seen = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            record = json.loads(line)
+            if not record.get("prompt"):
+                raise ValueError(f"{path}:{line_number}: missing \"prompt\"")
+            occurrence = seen.get(record["prompt"], 0)
+            seen[record["prompt"]] = occurrence + 1
+            jobs.append(JobState(job_id(record, occurrence), record["prompt"],
+                                 record.get("quality")))
+    return jobs
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class BatchRunner:
+    def __init__(self, input_path, state_dir=None, out_dir=None, results_path=None,
+                 render=True, filter_concurrency=4, generate_concurrency=4,
+                 render_workers=None, max_attempts=3, repair_attempts=2, smoke_mode="skip",
+                 model=None, use_cache=True, genai_client=None):
+        name = os.path.splitext(os.path.basename(input_path))[0]
+        self.input_path = input_path
+        self.state_dir = state_dir or os.path.join(DEFAULT_STATE_ROOT, name)
+        self.out_dir = out_dir or os.path.join(self.state_dir, "code")
+        self.results_path = results_path or os.path.join(self.state_dir, "results.jsonl")
+        self.render = render
+        self.stages = STAGES if render else STAGES[:2]
+        self.filter_concurrency = filter_concurrency
+        self.generate_concurrency = generate_concurrency
+        self.render_workers = render_workers
+        self.max_attempts = max_attempts
+        self.repair_attempts = repair_attempts
+        # Without a render stage there is no point paying for smoke renders
+        self.smoke_mode = smoke_mode if render else None
+        self.model = model
+        self.use_cache = use_cache
+        self.genai_client = genai_client
+        self.jobs = []
+        self._pool = None
+
+    def _state_path(self, job):
+        return os.path.join(self.state_dir, "jobs", f"{job.id}.json")
+
+    def load(self):
+        """Read the input and merge in any checkpointed state"""
+        os.makedirs(os.path.join(self.state_dir, "jobs"), exist_ok=True)
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.jobs = []
+        for job in read_jobs(self.input_path):
+            path = self._state_path(job)
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    saved = JobState(**json.load(f))
+                # An edited prompt invalidates everything done for the old one
+                if saved.prompt == job.prompt and saved.quality == job.quality:
+                    job = saved
+            self.jobs.append(job)
+        return self.jobs
+
+    def checkpoint(self, job):
+        job.updated_at = time.time()
+        _write_json(self._state_path(job), asdict(job))
+
+    def write_results(self):
+        tmp_path = f"{self.results_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for job in self.jobs:
+                f.write(json.dumps({
+                    "id": job.id,
+                    "status": self.status(job),
+                    "completed": job.completed,
+                    "code_path": job.code_path,
+                    "scene_name": job.scene_name,
+                    "video_path": job.video_path,
+                    "error": job.error,
+                    "failed_stage": job.failed_stage,
+                    "attempts": job.attempts,
+                    "repairs": job.repairs,
+                    "timings": job.timings,
+                }) + "\n")
+        os.replace(tmp_path, self.results_path)
+
+    async def _stage(self, job, stage, semaphore, fn):
+        if stage in job.completed:
+            return
+        start = time.perf_counter()
+        if semaphore is None:
+            await fn()
+        else:
+            async with semaphore:
+                await fn()
+        job.timings[stage] = round(time.perf_counter() - start, 3)
+        job.completed.append(stage)
+        self.checkpoint(job)
+
+    async def _run_job(self, job, limits):
+        job.attempts += 1
+        job.error = job.failed_stage = None
+
+        async def filter_stage():
+            job.filtered_prompt = await agenerate_text(
+                limits["user_filter_prompt"], job.prompt, model=self.model,
+                use_cache=self.use_cache, genai_client=self.genai_client)
+
+        async def generate_stage():
+            if job.repair_error and job.code_path and os.path.exists(job.code_path):
+                # An earlier attempt's code failed after generation: fix it, don't start over
+                with open(job.code_path, "r", encoding="utf-8") as f:
+                    code = await self._repair(job, f.read(), job.repair_error)
+            else:
+                response_text = await agenerate_text(
+                    select_system_instruction(job.filtered_prompt), job.filtered_prompt,
+                    model=self.model, use_cache=self.use_cache, genai_client=self.genai_client)
+                code = extract_python_code_blocks(response_text)
+            job.code_path = os.path.join(self.out_dir, f"{job.id}.py")
+            try:
+                code = await self._checked(job, code)
+            except GenerationError as e:
+                self._write_code(job, e.code)
+                job.repair_error = e.error
+                raise
+            self._write_code(job, code)
+            job.repair_error = None
+
+        async def render_stage():
+            from render.preflight import PreflightError, preflight
+
+            with open(job.code_path, "r", encoding="utf-8") as f:
+                code = f.read()
+            try:
+                report = preflight(code)
+                if not report.ok:
+                    raise PreflightError(report)
+                render_job = self._render_pool().submit(code, report.scene_name, job.quality)
+                job.video_path = await asyncio.wrap_future(render_job.future)
+            except Exception as e:
+                # Re-rendering the same code would fail the same way: repair it next attempt
+                job.repair_error = f"{type(e).__name__}: {e}"
+                job.completed.remove("generate")
+                raise
+
+        stages = {"filter": (limits["filter"], filter_stage),
+                  "generate": (limits["generate"], generate_stage),
+                  "render": (None, render_stage)}
+        for stage in self.stages:
+            semaphore, fn = stages[stage]
+            try:
+                await self._stage(job, stage, semaphore, fn)
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                job.failed_stage = stage
+                self.checkpoint(job)
+                break
+        self.write_results()
+        return job
+
+    def _write_code(self, job, code):
+        from render.pool import find_scene_class
+
+        with open(job.code_path, "w", encoding="utf-8") as f:
+            f.write(code)
+        job.scene_name = find_scene_class(code)
+
+    async def _repair(self, job, code, error):
+        job.repairs += 1
+        response_text = await agenerate_text(
+            *repair_request(job.filtered_prompt, code, error), model=self.model,
+            use_cache=self.use_cache, genai_client=self.genai_client)
+        return extract_python_code_blocks(response_text)
+
+    async def _checked(self, job, code):
+        """Pre-flight and smoke-render `code`, repairing it up to `repair_attempts` times"""
+        pool = self._render_pool() if self.smoke_mode else None
+        for attempt in range(self.repair_attempts + 1):
+            _, error = await asyncio.to_thread(check_code, code, self.smoke_mode, pool)
+            if error is None:
+                return code
+            if attempt == self.repair_attempts:
+                raise GenerationError(code, error, attempt + 1)
+            code = await self._repair(job, code, error)
+
+    def _render_pool(self):
+        if self._pool is None:
+            from render.pool import RenderPool
+
+            self._pool = RenderPool(max_workers=self.render_workers)
+        return self._pool
+
+    def status(self, job):
+        if all(stage in job.completed for stage in self.stages):
+            return "done"
+        return "failed" if job.error else "pending"
+
+    def pending(self):
+        return [job for job in self.jobs
+                if self.status(job) != "done" and job.attempts < self.max_attempts]
+
+    async def run(self):
+        """Run every unfinished job that has attempts left; returns all jobs"""
+        if not self.jobs:
+            self.load()
+        limits = {
+            "filter": asyncio.Semaphore(self.filter_concurrency),
+            "generate": asyncio.Semaphore(self.generate_concurrency),
+            "user_filter_prompt": load_user_filter_instruction(),
+            }
+        try:
+            await asyncio.gather(*(self._run_job(job, limits) for job in self.pending()))
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+        self.write_results()
+        return self.jobs
+
+
+def run_batch(input_path, **kwargs):
+    """Synchronous wrapper: build a BatchRunner and run it to completion"""
+    runner = BatchRunner(input_path, **kwargs)
+    runner.load()
+    return asyncio.run(runner.run())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate and render lessons for every prompt in a JSONL file, resumably")
+    parser.add_argument("input", help="JSONL file with {\"prompt\": ..., \"id\": ...} per line")
+    parser.add_argument("--state-dir", default=None,
+                        help="checkpoint directory (default: .cache/batch/<input name>)")
+    parser.add_argument("-o", "--out-dir", default=None, help="where generated code is written")
+    parser.add_argument("--results", default=None, help="results JSONL path")
+    parser.add_argument("--no-render", action="store_true")
+    parser.add_argument("--filter-concurrency", type=int, default=4)
+    parser.add_argument("--generate-concurrency", type=int, default=4)
+    parser.add_argument("--render-workers", type=int, default=None)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--repair-attempts", type=int, default=2,
+                        help="model repairs per attempt when the code fails its checks")
+    parser.add_argument("--fake", action="store_true",
+                        help="Use the offline fake client instead of Gemini")
+    args = parser.parse_args(argv)
+
+    genai_client = None
+    if args.fake:
+        from ai.GEMINI.fake_client import FakeClient
+        genai_client = FakeClient(latency=0.2)
+
+    start = time.perf_counter()
+    runner = BatchRunner(
+        args.input, state_dir=args.state_dir, out_dir=args.out_dir,
+        results_path=args.results, render=not args.no_render,
+        filter_concurrency=args.filter_concurrency,
+        generate_concurrency=args.generate_concurrency,
+        render_workers=args.render_workers, max_attempts=args.max_attempts,
+        repair_attempts=args.repair_attempts, use_cache=not args.fake,
+        genai_client=genai_client)
+    jobs = runner.load()
+    todo = runner.pending()
+    print(f"{len(jobs)} jobs, {len(jobs) - len(todo)} already finished or out of attempts")
+    asyncio.run(runner.run())
+
+    failed = [job for job in jobs if job.error]
+    for job in failed:
+        print(f"[{job.id}] failed at {job.failed_stage} "
+              f"(attempt {job.attempts}/{args.max_attempts}): {job.error}")
+    print(f"{len(jobs) - len(failed)} ok, {len(failed)} failed "
+          f"in {time.perf_counter() - start:.1f}s; results in {runner.results_path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
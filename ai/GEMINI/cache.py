@@ -0,0 +1,156 @@
+"""Persistent content-addressed cache for model responses"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_CACHE_PATH = os.path.join(ROOT_DIR, ".cache", "responses.sqlite3")
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace so cosmetic edits map to the same key"""
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+def make_key(model, system_instruction, prompt):
+    """Key on model name, system instruction hash and normalized prompt"""
+    instruction_hash = hashlib.sha256(
+        system_instruction.encode("utf-8")).hexdigest()
+    payload = "\0".join([model, instruction_hash, normalize_prompt(prompt)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with LRU eviction, TTL and hit counters"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=1000,
+                 max_bytes=256 * 1024 * 1024, ttl=30 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(
+                self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )""")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key):
+        """Return the cached text for `key`, or None on a miss"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            now = time.time()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE responses SET accessed_at = ?, hit_count = hit_count + 1 WHERE key = ?",
+                (now, key))
+            conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, value, model=""):
+        """Store `value` under `key` and evict entries over the size bounds"""
+        with self._lock:
+            conn = self._connect()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, value, len(value.encode("utf-8")), now, now))
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn, now):
+        if self.ttl is not None:
+            cursor = conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            self.evictions += cursor.rowcount
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC").fetchall()
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        """Return hit/miss counters for this process and the on-disk totals"""
+        with self._lock:
+            count, total = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": count,
+            "bytes": total,
+        }
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect the response cache")
+    parser.add_argument("command", choices=["stats", "clear"])
+    parser.add_argument("--path", default=DEFAULT_CACHE_PATH)
+    args = parser.parse_args(argv)
+
+    cache = ResponseCache(args.path)
+    if args.command == "clear":
+        cache.clear()
+    print(json.dumps(cache.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Register static system instructions once as Gemini cached contents
+
+SystemInstruction.md and userFilterPrompt.md are identical on every call.
+With provider-side context caching they are uploaded once per TTL and each
+request only carries the user prompt plus a reference to the cache. Cache
+names are kept in a small JSON registry so other processes and later runs
+reuse them until they expire; the file is merged under a file lock, and
+entries are keyed by the account (API key or project) that owns the cache.
+Clients without a `caches` surface, models that do not support caching and
+prefixes below the provider's minimum size fall back to sending the
+instruction inline.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+
+from ai.GEMINI.cache import ROOT_DIR
+from render.filelock import FileLock
+
+DEFAULT_REGISTRY_PATH = os.path.join(ROOT_DIR, ".cache", "context_caches.json")
+
+
+def client_id(client):
+    """Short digest of who owns caches created through `client`
+
+    Cached contents belong to an API key (or a Vertex project and
+    location), so two clients only share cache names when those match.
+    """
+    api_client = getattr(client, "_api_client", None)
+    parts = [type(client).__name__] + [
+        str(getattr(api_client, attr, None) or "")
+        for attr in ("vertexai", "project", "location", "api_key")]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def prefix_key(model, system_instruction, owner=""):
+    digest = hashlib.sha256(system_instruction.encode("utf-8")).hexdigest()
+    return f"{owner}:{model}:{digest[:32]}"
+
+
+def is_stale_cache_error(exc):
+    """True when a request failed because its cached content expired or was deleted"""
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    return code in (400, 403, 404) and "cached" in str(exc).lower()
+
+
+class ContextCacheRegistry:
+    """Maps (model, instruction) to a live cached-content name"""
+
+    def __init__(self, path=DEFAULT_REGISTRY_PATH, ttl=3600, refresh_margin=120,
+                 retry_unsupported_after=24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.retry_unsupported_after = retry_unsupported_after
+        self.created = 0
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _commit(self, key, entry):
+        """Set (or with entry=None, drop) one entry, merged into the file on disk"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with FileLock(self.path + ".lock"):
+            entries = self._read()
+            if entry is None:
+                entries.pop(key, None)
+            else:
+                entries[key] = entry
+            now = time.time()
+            entries = {k: e for k, e in entries.items()
+                       if e.get("until", e.get("expires_at", 0)) > now}
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+        self._entries = entries
+
+    def _fresh(self, entry, now):
+        if entry is None:
+            return False
+        if entry.get("unsupported"):
+            return now < entry["until"]
+        return now < entry["expires_at"] - self.refresh_margin
+
+    def get(self, client, model, system_instruction):
+        """Return the cached-content name to use, or None to send the instruction inline"""
+        caches = getattr(client, "caches", None)
+        if caches is None:
+            return None
+        key = prefix_key(model, system_instruction, client_id(client))
+        now = time.time()
+        with self._lock:
+            entry = self._load().get(key)
+            if not self._fresh(entry, now):
+                # Another process may have created one since we last read the file
+                self._entries = self._read()
+                entry = self._entries.get(key)
+            if not self._fresh(entry, now):
+                entry = self._create(caches, model, system_instruction, key, now)
+                self._commit(key, entry)
+            return entry.get("name")
+
+    async def aget(self, client, model, system_instruction):
+        """Async get: lookups and cache creation run off the event loop"""
+        return await asyncio.to_thread(self.get, client, model, system_instruction)
+
+    def _create(self, caches, model, system_instruction, key, now):
+        from google.genai import types
+
+        try:
+            cached = caches.create(model=model, config=types.CreateCachedContentConfig(
+                system_instruction=system_instruction,
+                display_name=f"lumi-{key.split(':')[-1][:12]}",
+                ttl=f"{self.ttl}s",
+            ))
+        except Exception as e:
+            # Unsupported model, prefix under the minimum token count, no permission...
+            return {"unsupported": True, "until": now + self.retry_unsupported_after,
+                    "reason": f"{type(e).__name__}: {e}"[:300]}
+        self.created += 1
+        return {"name": cached.name, "expires_at": now + self.ttl}
+
+    def invalidate(self, client, model, system_instruction):
+        """Forget the cache for this prefix, e.g. after the provider reports it expired"""
+        key = prefix_key(model, system_instruction, client_id(client))
+        with self._lock:
+            self._commit(key, None)
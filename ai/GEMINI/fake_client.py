@@ -0,0 +1,120 @@
+"""Offline stand-in for genai.Client, used to exercise the pipeline without network access"""
+import asyncio
+import time
+import uuid
+from types import SimpleNamespace
+
+FAKE_SCENE = '''from manim import *
+
+
+class FakeScene(Scene):
+    def construct(self):
+        title = Text({title!r}, font_size=36)
+        self.play(Write(title))
+        self.wait(1)
+'''
+
+
+def default_respond(system_instruction, contents):
+    """Return a fenced scene that writes the first line of the prompt"""
+    lines = [line.strip() for line in str(contents).splitlines()
+             if line.strip() and not line.strip().startswith("```")]
+    title = lines[0][:40] if lines else "Lumi"
+    return f"```python\n{FAKE_SCENE.format(title=title)}\n```"
+
+
+class _Models:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def generate_content(self, model, contents, config=None):
+        return self._owner._respond(model, contents, config)
+
+    def generate_content_stream(self, model, contents, config=None):
+        response = self._owner._respond(model, contents, config)
+        text, size = response.text, self._owner.chunk_size
+        for start in range(0, len(text), size):
+            last = start + size >= len(text)
+            yield SimpleNamespace(text=text[start:start + size],
+                                  usage_metadata=response.usage_metadata if last else None)
+
+
+class _AsyncModels:
+    def __init__(self, owner):
+        self._owner = owner
+
+    async def generate_content(self, model, contents, config=None):
+        if self._owner.latency:
+            await asyncio.sleep(self._owner.latency)
+        return self._owner._record(model, contents, config)
+
+
+class FakeAPIError(Exception):
+    """Shaped like google.genai.errors.APIError: an HTTP `code` and a message"""
+
+    def __init__(self, code, message):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class _Caches:
+    def __init__(self, owner):
+        self._owner = owner
+        self.contents = {}
+        self._created = 0
+
+    def create(self, model, config=None):
+        self._created += 1
+        name = f"cachedContents/fake-{self._created}"
+        self.contents[name] = config.system_instruction
+        return SimpleNamespace(name=name, model=model)
+
+    def delete(self, name):
+        self.contents.pop(name, None)
+
+
+def _token_estimate(text):
+    return len(str(text or "")) // 4
+
+
+class FakeClient:
+    """Mimics `client.models`, `client.aio.models` and `client.caches` with canned responses"""
+
+    def __init__(self, respond=default_respond, latency=0.0, chunk_size=64):
+        self.respond = respond
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.calls = []
+        self.models = _Models(self)
+        self.aio = SimpleNamespace(models=_AsyncModels(self))
+        self.caches = _Caches(self)
+        # Stands in for the API key, so registries never mix up two fakes' cache names
+        self._api_client = SimpleNamespace(api_key=f"fake-{uuid.uuid4().hex}")
+
+    def _respond(self, model, contents, config):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._record(model, contents, config)
+
+    def _record(self, model, contents, config):
+        cached_content = getattr(config, "cached_content", None)
+        if cached_content:
+            system_instruction = self.caches.contents.get(cached_content)
+        else:
+            system_instruction = getattr(config, "system_instruction", None)
+        self.calls.append(SimpleNamespace(
+            model=model, contents=contents, system_instruction=system_instruction,
+            cached_content=cached_content))
+        if cached_content and cached_content not in self.caches.contents:
+            raise FakeAPIError(404, f"CachedContent not found (or expired): {cached_content}")
+        text = self.respond(system_instruction, contents)
+        prefix_tokens = _token_estimate(system_instruction)
+        prompt_tokens = prefix_tokens + _token_estimate(contents)
+        output_tokens = _token_estimate(text)
+        usage = SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            cached_content_token_count=prefix_tokens if cached_content else 0,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens,
+        )
+        return SimpleNamespace(text=text, usage_metadata=usage)
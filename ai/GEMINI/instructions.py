@@ -0,0 +1,212 @@
+"""Topic-aware slicing of SystemInstruction.md
+
+The system instruction is split into sections by marker lines
+
+    <!-- section: latex; tags: equation*, formula*, tex, math -->
+
+Sections without tags are always sent. Tagged sections (camera work,
+vector maths, LaTeX, graphs, arrows...) are only included when one of
+their tags appears as a word in the animation brief; a trailing `*` makes
+a tag match any word starting with it. The file is parsed into a
+SectionIndex once per process and every distinct selection is assembled
+once, so picking the instruction for a prompt is a set lookup, and equal
+selections give the identical string (and the same context-cache entry).
+
+Briefs written by userFilterPrompt.md repeat its output format, whose
+headings and fixed wording mention the camera and MathTex in every brief.
+BriefTemplate strips that scaffolding first, so only the text filled into
+the placeholders selects sections.
+
+    python -m ai.GEMINI.instructions "Visualize the quadratic formula"
+"""
+import argparse
+import functools
+import os
+import re
+import sys
+from dataclasses import dataclass
+
+SECTION_PATTERN = re.compile(
+    r"^<!-- section: (?P<name>[\w-]+)(?:; tags: (?P<tags>[^>]*?))? -->\n?", re.MULTILINE)
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+FENCE_PATTERN = re.compile(r"^```[^\n]*\n(.*?)^```", re.MULTILINE | re.DOTALL)
+PLACEHOLDER_PATTERN = re.compile(r"\[[^\]]*\]")
+MARKUP_PATTERN = re.compile(r"[*#`]|^\s*[-•]\s+")
+
+
+@dataclass(frozen=True)
+class Section:
+    name: str
+    text: str
+    tags: tuple = ()
+
+    @property
+    def always(self):
+        return not self.tags
+
+
+def parse_sections(text):
+    """Split marked-up instruction text into Sections, in file order"""
+    matches = list(SECTION_PATTERN.finditer(text))
+    if not matches:
+        return [Section("all", text)]
+    sections = []
+    if text[:matches[0].start()].strip():
+        sections.append(Section("preamble", text[:matches[0].start()]))
+    for match, following in zip(matches, matches[1:] + [None]):
+        end = following.start() if following else len(text)
+        tags = tuple(tag.strip().lower() for tag in (match["tags"] or "").split(",")
+                     if tag.strip())
+        sections.append(Section(match["name"], text[match.end():end], tags))
+    return sections
+
+
+class SectionIndex:
+    """Tag -> section lookup tables plus memoized assembled instructions"""
+
+    def __init__(self, text):
+        self.sections = parse_sections(text)
+        self.words = {}
+        self.prefixes = []
+        for i, section in enumerate(self.sections):
+            for tag in section.tags:
+                if tag.endswith("*"):
+                    self.prefixes.append((tag[:-1], i))
+                else:
+                    self.words.setdefault(tag, set()).add(i)
+        self.always = frozenset(i for i, s in enumerate(self.sections) if s.always)
+        self._assembled = {}
+
+    def full(self):
+        """Every section, i.e. the whole file without its markers"""
+        return self._assemble(frozenset(range(len(self.sections))))
+
+    def match(self, text):
+        """Indexes of the tagged sections whose tags occur in `text`"""
+        matched = set()
+        for word in set(WORD_PATTERN.findall(text.lower())):
+            matched.update(self.words.get(word, ()))
+            for prefix, i in self.prefixes:
+                if i not in matched and word.startswith(prefix):
+                    matched.add(i)
+        return matched
+
+    def select(self, text):
+        """Names of the sections that would be sent for `text`"""
+        chosen = self.always | self.match(text)
+        return [s.name for i, s in enumerate(self.sections) if i in chosen]
+
+    def assemble(self, text):
+        """The system instruction for a brief: always-on plus matching sections"""
+        return self._assemble(self.always | self.match(text))
+
+    def _assemble(self, chosen):
+        chosen = frozenset(chosen)
+        assembled = self._assembled.get(chosen)
+        if assembled is None:
+            assembled = "".join(s.text for i, s in enumerate(self.sections) if i in chosen)
+            self._assembled[chosen] = assembled
+        return assembled
+
+
+def _normalize(line):
+    return " ".join(MARKUP_PATTERN.sub("", line).split()).lower()
+
+
+def _literal(fragment):
+    return r"\s*".join(re.escape(word) if not word.isdigit() else r"\d+"
+                        for word in fragment.split())
+
+
+class BriefTemplate:
+    """The fixed wording of a brief format, to be removed from filled-in briefs
+
+    Each line of the format becomes a pattern: its literal text must match
+    (markdown and spacing ignored) and each [placeholder] captures whatever
+    was written in its place. A line that only keeps its label loses the label.
+    """
+
+    def __init__(self, text):
+        self.lines = []
+        for line in text.splitlines():
+            fragments = PLACEHOLDER_PATTERN.split(_normalize(line))
+            if not "".join(fragments).strip():
+                continue
+            whole = "(.*?)".join(_literal(f) for f in fragments)
+            label = _literal(fragments[0]) + "(.*)" if len(fragments) > 1 else None
+            self.lines.append((re.compile(whole.replace("(.*?)$", "(.*)") + "$"),
+                               label and re.compile(label)))
+
+    @classmethod
+    def from_prompt(cls, text):
+        """The template inside the first fenced block of a filter prompt"""
+        match = FENCE_PATTERN.search(text)
+        return cls(match.group(1) if match else "")
+
+    def strip(self, brief):
+        """`brief` with the template's own wording removed, line by line"""
+        kept = []
+        for line in brief.splitlines():
+            line = _normalize(line)
+            for whole, label in self.lines:
+                match = whole.fullmatch(line) or (label and label.match(line))
+                if match:
+                    line = " ".join(group.strip() for group in match.groups())
+                    break
+            if line.strip():
+                kept.append(line)
+        return "\n".join(kept)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_template(path, mtime):
+    with open(path, "r", encoding="utf-8") as f:
+        return BriefTemplate.from_prompt(f.read())
+
+
+def load_template(path):
+    """BriefTemplate from the filter prompt at `path`, rebuilt when it changes"""
+    return _load_template(os.path.abspath(path), os.path.getmtime(path))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_index(path, mtime):
+    with open(path, "r", encoding="utf-8") as f:
+        return SectionIndex(f.read())
+
+
+def load_index(path):
+    """SectionIndex for `path`, rebuilt only when the file changes"""
+    return _load_index(os.path.abspath(path), os.path.getmtime(path))
+
+
+def main(argv=None):
+    from ai.GEMINI.app import PROMPTS_DIR
+
+    parser = argparse.ArgumentParser(
+        description="Show which system-instruction sections a brief selects")
+    parser.add_argument("brief", nargs="?", help="brief text (default: read stdin)")
+    parser.add_argument("--file", default=None, help="read the brief from a file")
+    parser.add_argument("--instruction",
+                        default=os.path.join(PROMPTS_DIR, "SystemInstruction.md"))
+    parser.add_argument("--template", default=os.path.join(PROMPTS_DIR, "userFilterPrompt.md"),
+                        help="filter prompt whose output format is stripped from the brief")
+    args = parser.parse_args(argv)
+
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            brief = f.read()
+    else:
+        brief = args.brief if args.brief is not None else sys.stdin.read()
+    brief = load_template(args.template).strip(brief)
+    index = load_index(args.instruction)
+    selected = index.select(brief)
+    for section in index.sections:
+        mark = "+" if section.name in selected else " "
+        print(f"{mark} {section.name:<18} {len(section.text):>7,} chars")
+    full, sliced = len(index.full()), len(index.assemble(brief))
+    print(f"{sliced:,} of {full:,} chars ({sliced / full:.0%})")
+
+
+if __name__ == "__main__":
+    main()
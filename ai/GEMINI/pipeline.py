@@ -0,0 +1,110 @@
+"""Asyncio batch pipeline: filter -> generate -> extract for many prompts"""
+import argparse
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+
+from ai.GEMINI.app import (agenerate_text, extract_python_code_blocks,
+                           load_user_filter_instruction, select_system_instruction)
+
+
+@dataclass
+class PipelineResult:
+    prompt: str
+    filtered_prompt: str = None
+    response_text: str = None
+    code: str = None
+    error: str = None
+    timings: dict = field(default_factory=dict)
+
+
+async def _run_one(prompt, stages, model, use_cache, genai_client):
+    result = PipelineResult(prompt)
+    try:
+        start = time.perf_counter()
+        async with stages["filter"]:
+            result.filtered_prompt = await agenerate_text(
+                stages["user_filter_prompt"], prompt, model=model,
+                use_cache=use_cache, genai_client=genai_client)
+        result.timings["filter"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        async with stages["generate"]:
+            result.response_text = await agenerate_text(
+                select_system_instruction(result.filtered_prompt), result.filtered_prompt,
+                model=model, use_cache=use_cache, genai_client=genai_client)
+        result.timings["generate"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result.code = extract_python_code_blocks(result.response_text)
+        result.timings["extract"] = time.perf_counter() - start
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    return result
+
+
+async def run_pipeline(prompts, filter_concurrency=4, generate_concurrency=4,
+                       model=None, use_cache=True, genai_client=None):
+    """Run every prompt through filter -> generate -> extract concurrently
+
+    Each stage has its own concurrency limit, so filtering for later prompts
+    overlaps with code generation for earlier ones. Results keep input order.
+    """
+    stages = {
+        "filter": asyncio.Semaphore(filter_concurrency),
+        "generate": asyncio.Semaphore(generate_concurrency),
+        "user_filter_prompt": load_user_filter_instruction(),
+    }
+    return await asyncio.gather(*(
+        _run_one(prompt, stages, model, use_cache, genai_client)
+        for prompt in prompts
+    ))
+
+
+def generate_batch(prompts, **kwargs):
+    """Synchronous wrapper around run_pipeline"""
+    return asyncio.run(run_pipeline(prompts, **kwargs))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate Manim code for many prompts concurrently")
+    parser.add_argument("prompts_file", help="Text file with one prompt per line")
+    parser.add_argument("-o", "--out-dir", default="generated")
+    parser.add_argument("--filter-concurrency", type=int, default=4)
+    parser.add_argument("--generate-concurrency", type=int, default=4)
+    parser.add_argument("--fake", action="store_true",
+                        help="Use the offline fake client instead of Gemini")
+    args = parser.parse_args(argv)
+
+    with open(args.prompts_file, "r", encoding="utf-8") as f:
+        prompts = [line.strip() for line in f if line.strip()]
+
+    genai_client = None
+    if args.fake:
+        from ai.GEMINI.fake_client import FakeClient
+        genai_client = FakeClient(latency=0.2)
+
+    start = time.perf_counter()
+    results = generate_batch(
+        prompts,
+        filter_concurrency=args.filter_concurrency,
+        generate_concurrency=args.generate_concurrency,
+        use_cache=not args.fake,
+        genai_client=genai_client,
+    )
+    os.makedirs(args.out_dir, exist_ok=True)
+    for i, result in enumerate(results):
+        if result.error:
+            print(f"[{i}] failed: {result.error}")
+            continue
+        path = os.path.join(args.out_dir, f"lesson_{i:03d}.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(result.code)
+        print(f"[{i}] {path} ({sum(result.timings.values()):.1f}s)")
+    print(f"{len(prompts)} prompts in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Gemini adapter for the provider interface in ai/providers.py"""
+import asyncio
+import itertools
+import time
+
+from ai.GEMINI.app import (MODEL, arequest_config, get_client, get_context_caches, make_config,
+                           request_config)
+from ai.GEMINI.context_cache import is_stale_cache_error
+from ai.providers import Provider
+
+
+class GeminiProvider(Provider):
+    """google-genai models, with the system instruction sent as a cached prefix
+
+    `client` defaults to the process-wide genai.Client; pass a FakeClient
+    to run offline.
+    """
+
+    name = "gemini"
+    default_model = MODEL
+
+    def __init__(self, model=None, usage_log=None, client=None, use_context_cache=True):
+        super().__init__(model, usage_log)
+        self._client = client
+        self.use_context_cache = use_context_cache
+
+    @property
+    def client(self):
+        return self._client or get_client()
+
+    def generate(self, system_instruction, contents):
+        client = self.client
+        config, cached_content = request_config(client, self.model, system_instruction,
+                                                self.use_context_cache)
+        start = time.perf_counter()
+        try:
+            response = client.models.generate_content(
+                model=self.model, config=config, contents=contents)
+        except Exception as e:
+            # Only a cache that expired or was deleted is worth resending inline; 429s,
+            # 5xx and timeouts go up to the rate limiter / caller untouched
+            if cached_content is None or not is_stale_cache_error(e):
+                raise
+            get_context_caches().invalidate(client, self.model, system_instruction)
+            config, cached_content = make_config(system_instruction), None
+            start = time.perf_counter()
+            response = client.models.generate_content(
+                model=self.model, config=config, contents=contents)
+        return self._complete(response.text, start, system_instruction,
+                              getattr(response, "usage_metadata", None), cached_content)
+
+    async def agenerate(self, system_instruction, contents):
+        client = self.client
+        config, cached_content = await arequest_config(client, self.model, system_instruction,
+                                                       self.use_context_cache)
+        start = time.perf_counter()
+        try:
+            response = await client.aio.models.generate_content(
+                model=self.model, config=config, contents=contents)
+        except Exception as e:
+            if cached_content is None or not is_stale_cache_error(e):
+                raise
+            await asyncio.to_thread(get_context_caches().invalidate, client, self.model,
+                                    system_instruction)
+            config, cached_content = make_config(system_instruction), None
+            start = time.perf_counter()
+            response = await client.aio.models.generate_content(
+                model=self.model, config=config, contents=contents)
+        return self._complete(response.text, start, system_instruction,
+                              getattr(response, "usage_metadata", None), cached_content)
+
+    def stream(self, system_instruction, contents):
+        client = self.client
+        config, cached_content = request_config(client, self.model, system_instruction,
+                                                self.use_context_cache)
+        start = time.perf_counter()
+        chunks = iter(client.models.generate_content_stream(
+            model=self.model, config=config, contents=contents))
+        try:
+            # A stale cache fails on the first chunk, before anything was yielded
+            first = next(chunks, None)
+        except Exception as e:
+            if cached_content is None or not is_stale_cache_error(e):
+                raise
+            get_context_caches().invalidate(client, self.model, system_instruction)
+            config, cached_content = make_config(system_instruction), None
+            start = time.perf_counter()
+            chunks = iter(client.models.generate_content_stream(
+                model=self.model, config=config, contents=contents))
+            first = next(chunks, None)
+        parts = []
+        usage_metadata = None
+        for chunk in itertools.chain([first] if first is not None else [], chunks):
+            usage_metadata = getattr(chunk, "usage_metadata", None) or usage_metadata
+            if chunk.text:
+                parts.append(chunk.text)
+                yield chunk.text
+        return self._complete("".join(parts), start, system_instruction, usage_metadata,
+                              cached_content, streamed=True)
@@ -0,0 +1,192 @@
+"""Streaming code generation with incremental ```python block extraction"""
+import argparse
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from ai.GEMINI.app import (CODE_BLOCK_PATTERN, cache_completion, filter_prompt, get_provider,
+                           get_response_cache, select_system_instruction)
+from ai.GEMINI.cache import make_key
+from render.pool import RenderPool, find_scene_classes
+from render.preflight import preflight
+
+
+class IncrementalCodeExtractor:
+    """Find closed ```python fences as chunks arrive
+
+    Yields the same blocks extract_python_code_blocks would find on the
+    full text, but each one as soon as its closing fence is received. A
+    match found in a prefix of the response is final: later text cannot
+    produce an earlier closing fence.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.blocks = []
+        self._pos = 0
+
+    def feed(self, chunk):
+        """Append a chunk and return the blocks it completed"""
+        self.text += chunk
+        completed = []
+        while True:
+            match = CODE_BLOCK_PATTERN.search(self.text, self._pos)
+            if match is None:
+                break
+            completed.append(match.group(1))
+            self._pos = match.end()
+        self.blocks.extend(completed)
+        return completed
+
+    def finish(self):
+        """Return the full extraction, matching extract_python_code_blocks"""
+        return '\n\n'.join(self.blocks) if self.blocks else self.text
+
+
+def stream_text(system_instruction, contents, model=None, use_cache=True,
+                genai_client=None, use_context_cache=True, provider=None):
+    """Yield response text chunks, replaying cached responses as one chunk
+
+    Streams through the same provider stack as generate_text, so the rate
+    limiter, hedging and LUMI_PROVIDER apply.
+    """
+    provider = provider or get_provider(model, genai_client, use_context_cache)
+    key = make_key(provider.model, system_instruction, contents)
+    if use_cache:
+        text = get_response_cache().get(key)
+        if text is not None:
+            yield text
+            return
+    completion = yield from provider.stream(system_instruction, contents)
+    if use_cache:
+        cache_completion(completion, system_instruction, contents)
+
+
+def stream_code_blocks(contents, system_instruction=None, **kwargs):
+    """Yield each ```python block as soon as it has been fully generated"""
+    system_instruction = system_instruction or select_system_instruction(contents)
+    extractor = IncrementalCodeExtractor()
+    for chunk in stream_text(system_instruction, contents, **kwargs):
+        yield from extractor.feed(chunk)
+
+
+def stream_and_render(contents, pool, system_instruction=None, on_event=print,
+                      smoke_mode="skip", smoke_timeout=300, **kwargs):
+    """Pre-flight each completed block and queue its new scenes immediately
+
+    Blocks are rendered cumulatively (everything received so far), so a
+    scene that relies on helpers from an earlier block still renders, but
+    only Scene classes not queued yet are submitted. Unless `smoke_mode` is
+    None each one is smoke-rendered on the pool first, without holding up
+    the stream: the full render is queued when its smoke test passes. A
+    scene that fails is retried with the next block received after the
+    failure, and once more with the complete response. Returns the list of
+    submitted RenderJobs once the stream has ended and the smoke tests have
+    finished (or run past `smoke_timeout` seconds).
+    """
+    from render.smoke import submit_smoke_test
+
+    start = time.perf_counter()
+    lock = threading.Lock()
+    # Renders are queued from here, not from the smoke futures' callbacks,
+    # which may run on the render pool's own management thread
+    submitter = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stream-submit")
+    received = []
+    jobs = []
+    queued = set()
+    smoking = {}
+    failed = {}
+
+    def log(message):
+        on_event(f"[{time.perf_counter() - start:.1f}s] {message}")
+
+    def queue(code, scene_name, block):
+        job = pool.submit(code, scene_name)
+        with lock:
+            queued.add(scene_name)
+            jobs.append(job)
+        log(f"block {block}: {scene_name} queued as {job.job_id}")
+
+    def smoked(code, scene_name, block, future):
+        try:
+            result = future.result()
+            error = None if result.ok else result.error
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        with lock:
+            smoking.pop(scene_name, None)
+            if error is not None:
+                failed[scene_name] = code
+        if error is not None:
+            log(f"{scene_name} failed the smoke render: {error}")
+            return
+        try:
+            submitter.submit(queue, code, scene_name, block)
+        except RuntimeError:
+            log(f"{scene_name} passed its smoke render after the stream ended; not queued")
+
+    def start_scenes(code, block):
+        with lock:
+            scene_names = [name for name in find_scene_classes(code)
+                           if name not in queued and name not in smoking
+                           and failed.get(name) != code]
+        if not scene_names:
+            log(f"block {block} ok (no new Scene)")
+        for scene_name in scene_names:
+            if smoke_mode is None:
+                queue(code, scene_name, block)
+                continue
+            future = submit_smoke_test(code, scene_name, smoke_mode, pool)
+            with lock:
+                smoking[scene_name] = future
+            future.add_done_callback(functools.partial(smoked, code, scene_name, block))
+
+    def settle():
+        with lock:
+            pending = list(smoking.values())
+        _, not_done = wait(pending, timeout=smoke_timeout)
+        for future in not_done:
+            log(f"a smoke render did not finish in {smoke_timeout}s")
+
+    code = None
+    for block in stream_code_blocks(contents, system_instruction, **kwargs):
+        received.append(block)
+        candidate = '\n\n'.join(received)
+        report = preflight(candidate, require_scene=False)
+        if not report.ok:
+            log(f"block {len(received)} rejected: {report.errors[0]}")
+            continue
+        code = candidate
+        start_scenes(code, len(received))
+    if smoke_mode is not None:
+        settle()
+        with lock:
+            retry = code is not None and any(tried != code for tried in failed.values())
+        if retry:
+            start_scenes(code, len(received))
+            settle()
+    submitter.shutdown(wait=True)
+    with lock:
+        return list(jobs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Stream code generation and render blocks as they complete")
+    parser.add_argument("prompt")
+    parser.add_argument("-q", "--quality", default="low_quality")
+    args = parser.parse_args(argv)
+
+    filtered_prompt = filter_prompt(args.prompt)
+    with RenderPool(quality=args.quality) as pool:
+        jobs = stream_and_render(filtered_prompt, pool)
+        for job in jobs:
+            try:
+                print(f"{job.job_id} -> {job.result()}")
+            except Exception as e:
+                print(f"{job.job_id} failed: {e}")
+
+
+if __name__ == "__main__":
+    main()
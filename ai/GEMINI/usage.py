@@ -0,0 +1,112 @@
+"""Per-request token and latency accounting for model calls"""
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+from ai.GEMINI.cache import ROOT_DIR
+
+DEFAULT_USAGE_PATH = os.path.join(ROOT_DIR, ".cache", "usage.jsonl")
+
+
+@dataclass
+class UsageRecord:
+    model: str
+    latency_s: float
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    thinking_tokens: int = 0
+    total_tokens: int = 0
+    context_cache: str = None
+    streamed: bool = False
+    kind: str = None
+    timestamp: float = None
+
+
+def _count(usage_metadata, name):
+    return (getattr(usage_metadata, name, None) or 0) if usage_metadata is not None else 0
+
+
+class UsageLog:
+    """Collects one UsageRecord per model request, optionally appending them to JSONL"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.records = []
+        self._lock = threading.Lock()
+
+    def record(self, model, latency_s, usage_metadata=None, context_cache=None,
+               streamed=False, kind=None):
+        record = UsageRecord(
+            model=model,
+            latency_s=round(latency_s, 4),
+            input_tokens=_count(usage_metadata, "prompt_token_count"),
+            cached_tokens=_count(usage_metadata, "cached_content_token_count"),
+            output_tokens=_count(usage_metadata, "candidates_token_count"),
+            thinking_tokens=_count(usage_metadata, "thoughts_token_count"),
+            total_tokens=_count(usage_metadata, "total_token_count"),
+            context_cache=context_cache,
+            streamed=streamed,
+            kind=kind,
+            timestamp=time.time(),
+        )
+        with self._lock:
+            self.records.append(record)
+            if self.path:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(asdict(record)) + "\n")
+        return record
+
+    def totals(self):
+        return summarize(self.records)
+
+
+def summarize(records):
+    """Aggregate counters over UsageRecords"""
+    latencies = sorted(r.latency_s for r in records)
+    input_tokens = sum(r.input_tokens for r in records)
+    cached_tokens = sum(r.cached_tokens for r in records)
+    return {
+        "requests": len(records),
+        "input_tokens": input_tokens,
+        "cached_tokens": cached_tokens,
+        "cached_fraction": cached_tokens / input_tokens if input_tokens else 0.0,
+        "output_tokens": sum(r.output_tokens for r in records),
+        "thinking_tokens": sum(r.thinking_tokens for r in records),
+        "total_tokens": sum(r.total_tokens for r in records),
+        "latency_s": round(sum(latencies), 3),
+        "mean_latency_s": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "p95_latency_s": latencies[max(math.ceil(0.95 * len(latencies)) - 1, 0)]
+        if latencies else 0.0,
+    }
+
+
+def load_records(path=DEFAULT_USAGE_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return [UsageRecord(**json.loads(line)) for line in f if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize recorded model usage")
+    parser.add_argument("--path", default=DEFAULT_USAGE_PATH)
+    parser.add_argument("--since-hours", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    records = load_records(args.path)
+    if args.since_hours is not None:
+        cutoff = time.time() - args.since_hours * 3600
+        records = [r for r in records if (r.timestamp or 0) >= cutoff]
+    by_model = {}
+    for record in records:
+        by_model.setdefault(record.model, []).append(record)
+    print(json.dumps({"all": summarize(records),
+                      **{model: summarize(rs) for model, rs in by_model.items()}}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
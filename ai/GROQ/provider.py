@@ -0,0 +1,105 @@
+"""Groq adapter for the provider interface in ai/providers.py
+
+Needs the `groq` package and GROQ_API_KEY (read from the environment or
+.env). Token counts are mapped onto the Gemini usage field names so the
+usage log treats both providers alike.
+"""
+import functools
+import os
+import time
+from types import SimpleNamespace
+
+from ai.providers import Provider
+
+MODEL = "llama-3.3-70b-versatile"
+
+
+def _api_key():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return os.getenv("GROQ_API_KEY")
+
+
+@functools.lru_cache(maxsize=None)
+def get_client():
+    """Return the process-wide groq.Groq client, creating it on first use"""
+    from groq import Groq
+
+    return Groq(api_key=_api_key())
+
+
+@functools.lru_cache(maxsize=None)
+def get_async_client():
+    from groq import AsyncGroq
+
+    return AsyncGroq(api_key=_api_key())
+
+
+def usage_metadata(usage):
+    """Groq's OpenAI-style usage block under Gemini's field names"""
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    return SimpleNamespace(
+        prompt_token_count=usage.prompt_tokens,
+        cached_content_token_count=getattr(details, "cached_tokens", None) or 0,
+        candidates_token_count=usage.completion_tokens,
+        total_token_count=usage.total_tokens,
+    )
+
+
+class GroqProvider(Provider):
+    name = "groq"
+    default_model = MODEL
+
+    def __init__(self, model=None, usage_log=None, client=None, async_client=None,
+                 max_tokens=16384, temperature=None):
+        super().__init__(model, usage_log)
+        self._client = client
+        self._async_client = async_client
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+
+    def _request(self, system_instruction, contents):
+        request = {
+            "model": self.model,
+            "messages": [{"role": "system", "content": system_instruction},
+                         {"role": "user", "content": str(contents)}],
+            "max_tokens": self.max_tokens,
+        }
+        if self.temperature is not None:
+            request["temperature"] = self.temperature
+        return request
+
+    def generate(self, system_instruction, contents):
+        client = self._client or get_client()
+        start = time.perf_counter()
+        response = client.chat.completions.create(
+            **self._request(system_instruction, contents))
+        return self._complete(response.choices[0].message.content or "", start,
+                              system_instruction, usage_metadata(response.usage))
+
+    async def agenerate(self, system_instruction, contents):
+        client = self._async_client or get_async_client()
+        start = time.perf_counter()
+        response = await client.chat.completions.create(
+            **self._request(system_instruction, contents))
+        return self._complete(response.choices[0].message.content or "", start,
+                              system_instruction, usage_metadata(response.usage))
+
+    def stream(self, system_instruction, contents):
+        client = self._client or get_client()
+        start = time.perf_counter()
+        parts = []
+        usage = None
+        for chunk in client.chat.completions.create(
+                stream=True, **self._request(system_instruction, contents)):
+            # Groq reports usage on the last chunk, under x_groq
+            usage = getattr(getattr(chunk, "x_groq", None), "usage", None) or usage
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                parts.append(text)
+                yield text
+        return self._complete("".join(parts), start, system_instruction, usage_metadata(usage),
+                              streamed=True)
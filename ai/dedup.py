@@ -0,0 +1,370 @@
+"""Near-duplicate prompt index: reuse the code and video of an earlier request
+
+Prompts are normalized (lower-cased, punctuation and request filler such
+as "create me an animation video explaining" dropped, plus a few common
+misspellings of it like "explaning"), cut into character 3-gram shingles
+and MinHashed. Signatures are split into LSH bands stored in SQLite, so a
+lookup only compares against entries sharing a band. Candidates are then
+accepted on whole words: the Jaccard similarity of their word sets, where
+two words of five letters or more also count as equal one typo apart
+("nueral", "neural"), must reach `threshold`. Character overlap alone
+would let "sine waves" match "cosine waves".
+
+Both the raw prompt and the filtered brief of each generation are
+indexed. Briefs first lose the wording of the userFilterPrompt format they
+were written to, and are shingled and compared as word pairs, since two
+briefs on different topics still share most of their prose. The rendered
+video is attached to its code once known, together with its quality, so a
+preview is never taken for the final render.
+
+    python -m ai.dedup lookup "create an animation explaining neural networks"
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from ai.GEMINI.cache import ROOT_DIR
+from ai.GEMINI.instructions import load_template
+from render.pool import quality_rank
+
+DEFAULT_INDEX_PATH = os.path.join(ROOT_DIR, ".cache", "prompts.sqlite3")
+FILTER_PROMPT_PATH = os.path.join(ROOT_DIR, "prompts", "userFilterPrompt.md")
+FIELDS = ("prompt", "filtered_prompt")
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+MERSENNE_PRIME = (1 << 61) - 1
+FILLER_WORDS = frozenset("""
+    a an the of and or to for in on at by with about into from as is are be it its this that
+    i me my we us our you your please can could would like want need
+    make create generate produce build show explain explaining explains explanation describe
+    animate animation animations animated video videos visualize visualise visualization
+    illustrate illustrating illustration demonstrate demonstrating how what why
+""".split())
+# Only misspellings seen in real requests: matching filler loosely also eats
+# topic words ("world" for "would", "product" for "produce")
+FILLER_TYPOS = frozenset("""
+    explaning explainig expain animaton animtion anmation annimation vidoe viedo
+    visulize vizualize visualzie genrate creat ilustrate
+""".split())
+
+
+def _one_edit(a, b):
+    """True if b is a with one character inserted, deleted, replaced or transposed"""
+    if len(a) == len(b):
+        diff = [i for i in range(len(a)) if a[i] != b[i]]
+        return len(diff) == 1 or (len(diff) == 2 and diff[1] == diff[0] + 1
+                                  and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]])
+    if abs(len(a) - len(b)) != 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+def _is_filler(word):
+    return word in FILLER_WORDS or word in FILLER_TYPOS
+
+
+def normalize(text):
+    return " ".join(word for word in WORD_PATTERN.findall(text.lower())
+                    if not _is_filler(word))
+
+
+def normalize_brief(text):
+    """normalize() of a filtered brief without the wording of its format"""
+    if os.path.exists(FILTER_PROMPT_PATH):
+        text = load_template(FILTER_PROMPT_PATH).strip(text)
+    return normalize(text)
+
+
+def shingles(normalized, size=3):
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def word_shingles(normalized, size=2):
+    words = normalized.split()
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def word_similarity(a, b):
+    """Jaccard similarity of two normalized texts' word sets, forgiving one-typo words"""
+    a, b = set(a.split()), set(b.split())
+    unmatched = set(b - a)
+    matched = len(a & b)
+    for word in a - b:
+        if len(word) < 5:
+            continue
+        twin = next((other for other in unmatched
+                     if len(other) >= 5 and _one_edit(word, other)), None)
+        if twin is not None:
+            unmatched.discard(twin)
+            matched += 1
+    union = len(a) + len(b) - matched
+    return matched / union if union else 0.0
+
+
+class MinHasher:
+    def __init__(self, num_perm=128, seed=1):
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(MERSENNE_PRIME))
+                       for _ in range(num_perm)]
+
+    def signature(self, shingle_set):
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(),
+                                 "little") for s in shingle_set]
+        if not hashes:
+            return [MERSENNE_PRIME] * len(self.params)
+        return [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in self.params]
+
+
+@dataclass
+class Match:
+    entry_id: int
+    similarity: float
+    field: str
+    prompt: str
+    filtered_prompt: str
+    code: str
+    video_path: str = None
+    video_quality: str = None
+
+
+def code_hash(code):
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+class PromptIndex:
+    """SQLite-backed MinHash/LSH index of past prompts and their generations"""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, threshold=0.7, num_perm=128, bands=32,
+                 shingle_size=3):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = path
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm)
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    id INTEGER PRIMARY KEY,
+                    prompt TEXT NOT NULL,
+                    filtered_prompt TEXT,
+                    prompt_norm TEXT NOT NULL,
+                    filtered_norm TEXT,
+                    code TEXT NOT NULL,
+                    code_hash TEXT NOT NULL,
+                    video_path TEXT,
+                    video_quality TEXT,
+                    created_at REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS entries_code ON entries (code_hash);
+                CREATE TABLE IF NOT EXISTS bands (
+                    field TEXT NOT NULL,
+                    band INTEGER NOT NULL,
+                    bucket TEXT NOT NULL,
+                    entry_id INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS bands_bucket ON bands (field, band, bucket);
+            """)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+            if "video_quality" not in columns:
+                # Indexes from before qualities were recorded; their videos rank lowest
+                self._conn.execute("ALTER TABLE entries ADD COLUMN video_quality TEXT")
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _normalize(field, text):
+        return normalize(text) if field == "prompt" else normalize_brief(text)
+
+    def _shingles(self, field, normalized):
+        if field == "prompt":
+            return shingles(normalized, self.shingle_size)
+        return word_shingles(normalized)
+
+    def _similarity(self, field, query, stored):
+        if field == "prompt":
+            return word_similarity(query, stored)
+        return jaccard(word_shingles(query), word_shingles(stored))
+
+    def _buckets(self, field, normalized):
+        signature = self.hasher.signature(self._shingles(field, normalized))
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            yield band, hashlib.blake2b(json.dumps(rows).encode("ascii"),
+                                        digest_size=8).hexdigest()
+
+    def lookup(self, text, fields=FIELDS, threshold=None):
+        """Best stored generation at least `threshold` similar to `text`, else None"""
+        threshold = self.threshold if threshold is None else threshold
+        queries = {field: self._normalize(field, text) for field in fields}
+        queries = {field: query for field, query in queries.items() if query}
+        if not queries:
+            return None
+        with self._lock:
+            conn = self._connect()
+            candidates = set()
+            for field, query in queries.items():
+                for band, bucket in self._buckets(field, query):
+                    candidates.update(
+                        (field, row[0]) for row in conn.execute(
+                            "SELECT entry_id FROM bands WHERE field = ? AND band = ? "
+                            "AND bucket = ?", (field, band, bucket)))
+            best = None
+            for field, entry_id in candidates:
+                row = conn.execute(
+                    "SELECT prompt, filtered_prompt, code, video_path, video_quality "
+                    "FROM entries WHERE id = ?", (entry_id,)).fetchone()
+                if row is None:
+                    continue
+                # Renormalized rather than read from *_norm, which older entries
+                # stored under earlier rules
+                stored = self._normalize(field, row[0] if field == "prompt" else row[1] or "")
+                similarity = self._similarity(field, queries[field], stored)
+                if similarity >= threshold and (best is None or similarity > best.similarity):
+                    best = Match(entry_id, similarity, field, *row)
+            if best is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE entries SET hit_count = hit_count + 1 WHERE id = ?",
+                         (best.entry_id,))
+            conn.commit()
+            self.hits += 1
+        if best.video_path and not os.path.exists(best.video_path):
+            best.video_path = best.video_quality = None
+        return best
+
+    def add(self, prompt, code, filtered_prompt=None, video_path=None, video_quality=None):
+        """Index a finished generation; returns its entry id"""
+        prompt_norm = normalize(prompt)
+        filtered_norm = normalize_brief(filtered_prompt) if filtered_prompt else None
+        bands = [("prompt", band, bucket)
+                 for band, bucket in self._buckets("prompt", prompt_norm)]
+        if filtered_norm:
+            bands += [("filtered_prompt", band, bucket)
+                      for band, bucket in self._buckets("filtered_prompt", filtered_norm)]
+        with self._lock:
+            conn = self._connect()
+            if video_path is None:
+                video_path, video_quality = self._best_video(conn, code_hash(code))
+            cursor = conn.execute(
+                "INSERT INTO entries (prompt, filtered_prompt, prompt_norm, filtered_norm, "
+                "code, code_hash, video_path, video_quality, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (prompt, filtered_prompt, prompt_norm, filtered_norm, code, code_hash(code),
+                 video_path, video_quality, time.time()))
+            entry_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO bands (field, band, bucket, entry_id) VALUES (?, ?, ?, ?)",
+                [(field, band, bucket, entry_id) for field, band, bucket in bands])
+            conn.commit()
+        return entry_id
+
+    @staticmethod
+    def _best_video(conn, digest):
+        """(path, quality) of the best recorded video of this code still on disk"""
+        best = (None, None)
+        for path, quality in conn.execute(
+                "SELECT video_path, video_quality FROM entries WHERE code_hash = ? "
+                "AND video_path IS NOT NULL ORDER BY created_at DESC", (digest,)):
+            if os.path.exists(path) and (best[0] is None
+                                         or quality_rank(quality) > quality_rank(best[1])):
+                best = (path, quality)
+        return best
+
+    def best_video(self, code):
+        """(path, quality) of the best rendered video of exactly this code, or (None, None)"""
+        with self._lock:
+            return self._best_video(self._connect(), code_hash(code))
+
+    def video_for(self, code, quality=None):
+        """An existing video of exactly this code rendered at `quality` or better"""
+        path, recorded = self.best_video(code)
+        if path and (quality is None or quality_rank(recorded) >= quality_rank(quality)):
+            return path
+        return None
+
+    def record_video(self, code, video_path, quality):
+        """Attach a video rendered at `quality` to every entry that generated this code
+
+        A better video already on disk is kept.
+        """
+        with self._lock:
+            conn = self._connect()
+            path, recorded = self._best_video(conn, code_hash(code))
+            if path and path != video_path and quality_rank(recorded) > quality_rank(quality):
+                return
+            conn.execute("UPDATE entries SET video_path = ?, video_quality = ? "
+                         "WHERE code_hash = ?", (video_path, quality, code_hash(code)))
+            conn.commit()
+
+    def stats(self):
+        with self._lock:
+            conn = self._connect()
+            entries, reused, videos = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hit_count), 0), COUNT(video_path) "
+                "FROM entries").fetchone()
+        return {"entries": entries, "reused": reused, "with_video": videos,
+                "hits": self.hits, "misses": self.misses, "threshold": self.threshold}
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM bands")
+            conn.execute("DELETE FROM entries")
+            conn.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect the near-duplicate prompt index")
+    parser.add_argument("command", choices=["lookup", "stats", "clear"])
+    parser.add_argument("text", nargs="?")
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--path", default=DEFAULT_INDEX_PATH)
+    args = parser.parse_args(argv)
+
+    index = PromptIndex(args.path, threshold=args.threshold)
+    if args.command == "stats":
+        print(index.stats())
+    elif args.command == "clear":
+        index.clear()
+    else:
+        match = index.lookup(args.text or "")
+        if match is None:
+            print("no near-duplicate")
+        else:
+            print(f"{match.similarity:.2f} via {match.field}: {match.prompt!r} "
+                  f"(entry {match.entry_id}, video {match.video_path or '-'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""Model providers behind one interface, with optional hedged requests
+
+Every stage that calls a model (prompt filtering, code generation, repair)
+goes through a Provider: `generate(system_instruction, contents)` and its
+async twin return a Completion, and `stream` yields the text in chunks
+before returning one. Adapters live next to their SDK code
+(ai/GEMINI/provider.py, ai/GROQ/provider.py); FakeProvider answers locally
+for tests and offline runs.
+
+HedgedProvider wraps a primary and a secondary. It sends to the primary
+and, if no answer has arrived by the hedge deadline, sends the same
+request to the secondary and takes whichever finishes first. The deadline
+is a percentile of the primary's recent latencies for the same kind of
+request (filter and generation calls are tracked separately), so only
+the slow tail is ever duplicated.
+
+Providers are named by spec strings, "<provider>[:<model>]":
+
+    make_provider("groq:llama-3.3-70b-versatile")
+"""
+import asyncio
+import hashlib
+import importlib
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+PROVIDERS = {
+    "gemini": "ai.GEMINI.provider:GeminiProvider",
+    "groq": "ai.GROQ.provider:GroqProvider",
+    "fake": "ai.providers:FakeProvider",
+}
+
+
+def request_kind(system_instruction):
+    """Short id for the kind of request, taken from the start of its instruction
+
+    Sliced system instructions all begin with the same core section, so
+    every generation call shares a kind while filter calls get another.
+    """
+    head = (system_instruction or "")[:256]
+    return hashlib.sha256(head.encode("utf-8")).hexdigest()[:12]
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted sequence"""
+    return sorted_values[max(math.ceil(q / 100 * len(sorted_values)) - 1, 0)]
+
+
+@dataclass
+class Completion:
+    text: str
+    provider: str
+    model: str
+    latency_s: float
+    usage_metadata: object = None
+    context_cache: str = None
+
+
+class Provider:
+    """Base class: subclasses implement generate and usually agenerate and stream"""
+
+    name = None
+    default_model = None
+
+    def __init__(self, model=None, usage_log=None):
+        self.model = model or self.default_model
+        self.usage_log = usage_log
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.model!r})"
+
+    def generate(self, system_instruction, contents):
+        raise NotImplementedError
+
+    async def agenerate(self, system_instruction, contents):
+        return await asyncio.to_thread(self.generate, system_instruction, contents)
+
+    def stream(self, system_instruction, contents):
+        """Yield the response text in chunks, then return its Completion
+
+        Use `completion = yield from provider.stream(...)` to get both. This
+        default answers in a single chunk.
+        """
+        completion = self.generate(system_instruction, contents)
+        if completion.text:
+            yield completion.text
+        return completion
+
+    def _complete(self, text, start, system_instruction, usage_metadata=None,
+                  context_cache=None, streamed=False):
+        """Build the Completion and log the request's tokens and latency"""
+        latency_s = time.perf_counter() - start
+        if self.usage_log is not None:
+            self.usage_log.record(self.model, latency_s, usage_metadata, context_cache,
+                                  streamed=streamed, kind=request_kind(system_instruction))
+        return Completion(text, self.name, self.model, latency_s, usage_metadata,
+                          context_cache)
+
+
+class FakeProvider(Provider):
+    """Answers locally with a canned scene after `latency` seconds
+
+    `latency` may be a number or a zero-argument callable, which makes it
+    easy to simulate a slow tail when exercising hedging.
+    """
+
+    name = "fake"
+    default_model = "fake"
+
+    def __init__(self, model=None, usage_log=None, respond=None, latency=0.0):
+        from ai.GEMINI.fake_client import default_respond
+
+        super().__init__(model, usage_log)
+        self.respond = respond or default_respond
+        self.latency = latency
+        self.calls = []
+
+    def _delay(self):
+        return self.latency() if callable(self.latency) else self.latency
+
+    def _answer(self, system_instruction, contents, start):
+        self.calls.append(SimpleNamespace(system_instruction=system_instruction,
+                                          contents=contents))
+        text = self.respond(system_instruction, contents)
+        prompt_tokens = (len(system_instruction or "") + len(str(contents))) // 4
+        usage = SimpleNamespace(prompt_token_count=prompt_tokens,
+                                candidates_token_count=len(text) // 4,
+                                total_token_count=prompt_tokens + len(text) // 4)
+        return self._complete(text, start, system_instruction, usage)
+
+    def generate(self, system_instruction, contents):
+        start = time.perf_counter()
+        time.sleep(self._delay())
+        return self._answer(system_instruction, contents, start)
+
+    async def agenerate(self, system_instruction, contents):
+        start = time.perf_counter()
+        await asyncio.sleep(self._delay())
+        return self._answer(system_instruction, contents, start)
+
+    def stream(self, system_instruction, contents):
+        completion = self.generate(system_instruction, contents)
+        yield from completion.text.splitlines(keepends=True)
+        return completion
+
+
+def _start_thread(fn, *args):
+    """Run fn(*args) on a new thread; returns its Future and when the call began
+
+    Primaries get a thread each rather than a slot in the bounded hedge
+    executor, so slow calls in flight never delay the start of a new one.
+    """
+    future = Future()
+    started = threading.Event()
+    began = []
+
+    def run():
+        began.append(time.perf_counter())
+        started.set()
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="hedge-primary", daemon=True).start()
+    started.wait()
+    return future, began[0]
+
+
+def _remaining(deadline, start):
+    return None if deadline is None else max(deadline - (time.perf_counter() - start), 0.0)
+
+
+def _first_chunk(stream):
+    """("chunk", text) for the first chunk of `stream`, or ("done", completion)"""
+    try:
+        return "chunk", next(stream)
+    except StopIteration as stop:
+        return "done", stop.value
+
+
+class HedgedProvider(Provider):
+    """Send to `primary`, and also to `secondary` once the hedge deadline passes
+
+    Until `min_samples` primary latencies have been seen for a kind of
+    request, `initial_deadline` is used (None: no hedging yet). A primary
+    that fails before the deadline fails over to the secondary at once.
+    Every primary runs on its own thread, timed from when it starts;
+    `max_workers` only bounds the secondaries in flight.
+    """
+
+    name = "hedged"
+
+    def __init__(self, primary, secondary, percentile=95, min_samples=10, window=200,
+                 initial_deadline=None, max_workers=8):
+        super().__init__(primary.model)
+        self.primary = primary
+        self.secondary = secondary
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.initial_deadline = initial_deadline
+        self.max_workers = max_workers
+        self.requests = 0
+        self.hedged = 0
+        self.failovers = 0
+        self.secondary_wins = 0
+        self._latencies = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def __repr__(self):
+        return f"HedgedProvider({self.primary!r}, {self.secondary!r})"
+
+    def seed(self, records):
+        """Prime the latency windows from UsageRecords of earlier runs"""
+        for record in records:
+            if record.model == self.primary.model and record.kind and not record.streamed:
+                self._observe(record.kind, record.latency_s)
+
+    def _observe(self, kind, latency_s):
+        with self._lock:
+            self._latencies.setdefault(kind, deque(maxlen=self.window)).append(latency_s)
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def deadline(self, system_instruction):
+        """Seconds to wait for the primary before hedging, or None to never hedge"""
+        with self._lock:
+            samples = sorted(self._latencies.get(request_kind(system_instruction), ()))
+        if len(samples) < self.min_samples:
+            return self.initial_deadline
+        return percentile(samples, self.percentile)
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, "hedged": self.hedged,
+                    "failovers": self.failovers, "secondary_wins": self.secondary_wins}
+
+    def _settle(self, kind, start, winner_is_primary, primary_done):
+        elapsed = time.perf_counter() - start
+        if winner_is_primary:
+            self._observe(kind, elapsed)
+        else:
+            self._count("secondary_wins")
+            if not primary_done:
+                # Censored: the primary would have taken at least this long
+                self._observe(kind, elapsed)
+
+    def _pool(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="hedge")
+        return self._executor
+
+    def generate(self, system_instruction, contents):
+        kind = request_kind(system_instruction)
+        deadline = self.deadline(system_instruction)
+        self._count("requests")
+        primary, start = _start_thread(self.primary.generate, system_instruction, contents)
+        done, _ = wait([primary], timeout=_remaining(deadline, start))
+        if primary in done and primary.exception() is None:
+            self._observe(kind, time.perf_counter() - start)
+            return primary.result()
+        self._count("failovers" if done else "hedged")
+        secondary = self._pool().submit(self.secondary.generate, system_instruction, contents)
+        pending = {primary, secondary} - done
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future.exception() is None:
+                    # The loser keeps running in its thread; its result is dropped
+                    self._settle(kind, start, future is primary, primary.done())
+                    return future.result()
+        raise secondary.exception() from primary.exception()
+
+    async def agenerate(self, system_instruction, contents):
+        kind = request_kind(system_instruction)
+        deadline = self.deadline(system_instruction)
+        self._count("requests")
+        start = time.perf_counter()
+        primary = asyncio.ensure_future(self.primary.agenerate(system_instruction, contents))
+        done, _ = await asyncio.wait({primary}, timeout=deadline)
+        if primary in done and primary.exception() is None:
+            self._observe(kind, time.perf_counter() - start)
+            return primary.result()
+        self._count("failovers" if done else "hedged")
+        secondary = asyncio.ensure_future(
+            self.secondary.agenerate(system_instruction, contents))
+        pending = {primary, secondary} - done
+        try:
+            while pending:
+                finished, pending = await asyncio.wait(pending, return_when=FIRST_COMPLETED)
+                for task in finished:
+                    if task.exception() is None:
+                        self._settle(kind, start, task is primary, primary.done())
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise secondary.exception() from primary.exception()
+
+    def stream(self, system_instruction, contents):
+        """Hedge on the first chunk, then stream the rest from whichever sent it
+
+        Streamed latencies are not fed into the deadlines, which describe
+        complete responses.
+        """
+        deadline = self.deadline(system_instruction)
+        self._count("requests")
+        streams = {}
+        primary_stream = self.primary.stream(system_instruction, contents)
+        primary, start = _start_thread(_first_chunk, primary_stream)
+        streams[primary] = primary_stream
+        done, _ = wait([primary], timeout=_remaining(deadline, start))
+        winner = primary if primary in done and primary.exception() is None else None
+        if winner is None:
+            self._count("failovers" if done else "hedged")
+            secondary_stream = self.secondary.stream(system_instruction, contents)
+            secondary = self._pool().submit(_first_chunk, secondary_stream)
+            streams[secondary] = secondary_stream
+            pending = {primary, secondary} - done
+            while pending and winner is None:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                winner = next((f for f in finished if f.exception() is None), None)
+            if winner is None:
+                raise secondary.exception() from primary.exception()
+            if winner is secondary:
+                self._count("secondary_wins")
+        state, value = winner.result()
+        if state == "done":
+            return value
+        yield value
+        return (yield from streams[winner])
+
+
+def provider_class(name):
+    try:
+        module_name, _, class_name = PROVIDERS[name].partition(":")
+    except KeyError:
+        raise ValueError(f"unknown provider {name!r}; expected one of "
+                         f"{', '.join(sorted(PROVIDERS))}") from None
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def make_provider(spec, model=None, **kwargs):
+    """Build a provider from "<name>[:<model>]"; `model` overrides the spec's"""
+    name, _, spec_model = spec.partition(":")
+    return provider_class(name.strip().lower())(model=model or spec_model or None, **kwargs)
@@ -0,0 +1,354 @@
+"""Cross-process rate limiting for model calls
+
+Every process on the machine shares one state file per model under
+.cache/ratelimit/, guarded by render.filelock.FileLock. Each file holds:
+  * token buckets for requests/min and tokens/min, refilled continuously;
+    a request is admitted when both buckets can pay its estimated cost,
+    and its real token count is settled once the response arrives;
+  * an AIMD concurrency limit: +1/limit per success, halved on a 429
+    (at most once per backoff window, so a burst of 429s counts once);
+  * in-flight leases, which expire on their own if a process dies;
+  * a shared "blocked until" time, so after a 429 every caller backs off
+    together instead of retrying on its own schedule.
+Callers that cannot be admitted wait (sleep) rather than fail;
+RateLimitError is only raised once `max_wait` or the retries run out.
+
+    python -m ai.ratelimit status
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import time
+from dataclasses import dataclass
+
+from ai.GEMINI.cache import ROOT_DIR
+from ai.providers import Provider
+from render.filelock import FileLock
+
+DEFAULT_STATE_DIR = os.path.join(ROOT_DIR, ".cache", "ratelimit")
+RETRY_DELAY_PATTERN = re.compile(r"retry[ _-]?(?:delay|after)\W+(\d+(?:\.\d+)?)s?", re.I)
+
+
+@dataclass
+class Quota:
+    rpm: float = None
+    tpm: float = None
+    max_concurrency: int = 8
+
+
+# Free-tier limits; override with LUMI_RATE_LIMITS='{"<model>": {"rpm": ..., "tpm": ...}}'
+DEFAULT_QUOTAS = {
+    "gemini-2.5-flash-preview-05-20": Quota(rpm=10, tpm=250_000),
+    "llama-3.3-70b-versatile": Quota(rpm=30, tpm=12_000),
+}
+
+
+class RateLimitError(RuntimeError):
+    def __init__(self, model, message, retry_after=None):
+        super().__init__(f"{model}: {message}")
+        self.model = model
+        self.retry_after = retry_after
+
+
+def is_rate_limited(exc):
+    """True for HTTP 429 / RESOURCE_EXHAUSTED errors from either SDK"""
+    for attr in ("code", "status_code"):
+        if getattr(exc, attr, None) == 429:
+            return True
+    return "RESOURCE_EXHAUSTED" in str(exc)
+
+
+def retry_after(exc):
+    """Seconds the provider asked us to wait, if it said"""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    value = headers.get("retry-after")
+    if value is None:
+        match = RETRY_DELAY_PATTERN.search(str(exc))
+        value = match and match.group(1)
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def estimate_tokens(system_instruction, contents, expected_output=2000):
+    return (len(system_instruction or "") + len(str(contents))) // 4 + expected_output
+
+
+def load_quotas():
+    quotas = dict(DEFAULT_QUOTAS)
+    overrides = os.getenv("LUMI_RATE_LIMITS")
+    if overrides:
+        for model, values in json.loads(overrides).items():
+            quotas[model] = Quota(**values)
+    return quotas
+
+
+class RateLimiter:
+    """Token buckets plus AIMD concurrency per model, shared through lock files"""
+
+    def __init__(self, quotas=None, state_dir=DEFAULT_STATE_DIR, lease_s=600,
+                 base_backoff=2.0, max_backoff=60.0, poll_interval=0.25):
+        self.quotas = load_quotas() if quotas is None else quotas
+        self.state_dir = state_dir
+        self.lease_s = lease_s
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self._lease_ids = itertools.count()
+
+    def quota(self, model):
+        return self.quotas.get(model) or Quota()
+
+    def _path(self, model):
+        return os.path.join(self.state_dir, re.sub(r"[^\w.-]", "_", model) + ".json")
+
+    def _update(self, model, fn):
+        """Run fn(state, quota, now) on the model's state under its file lock"""
+        path = self._path(model)
+        quota = self.quota(model)
+        with FileLock(path + ".lock"):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = {}
+            now = time.time()
+            state["model"] = model
+            self._refill(state, quota, now)
+            result = fn(state, quota, now)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_path, path)
+        return result
+
+    @staticmethod
+    def _refill(state, quota, now):
+        elapsed = max(now - state.get("updated", now), 0.0)
+        for bucket, per_minute in (("requests", quota.rpm), ("tokens", quota.tpm)):
+            if per_minute:
+                level = state.get(bucket, per_minute)
+                state[bucket] = min(per_minute, level + elapsed * per_minute / 60)
+        state["updated"] = now
+        state.setdefault("limit", float(quota.max_concurrency))
+        state["leases"] = {lease: until for lease, until in state.get("leases", {}).items()
+                           if until > now}
+
+    def try_acquire(self, model, tokens):
+        """Return (lease, 0) when admitted, or (None, seconds to wait before retrying)"""
+        def admit(state, quota, now):
+            waits = [state.get("blocked_until", 0) - now]
+            if len(state["leases"]) >= max(int(state["limit"]), 1):
+                waits.append(self.poll_interval)
+            # A request larger than the whole bucket is let through once it is full
+            cost = {"requests": 1, "tokens": min(tokens, quota.tpm or tokens)}
+            for bucket, per_minute in (("requests", quota.rpm), ("tokens", quota.tpm)):
+                if per_minute and state[bucket] < cost[bucket]:
+                    waits.append((cost[bucket] - state[bucket]) * 60 / per_minute)
+            wait = max(waits)
+            if wait > 0:
+                return None, wait
+            lease = f"{os.getpid()}-{next(self._lease_ids)}"
+            state["leases"][lease] = now + self.lease_s
+            for bucket, per_minute in (("requests", quota.rpm), ("tokens", quota.tpm)):
+                if per_minute:
+                    state[bucket] -= cost[bucket]
+            return (lease, cost["tokens"]), 0.0
+
+        return self._update(model, admit)
+
+    def acquire(self, model, tokens, max_wait=None):
+        """Block until admitted; raises RateLimitError after `max_wait` seconds"""
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        while True:
+            lease, wait = self.try_acquire(model, tokens)
+            if lease is not None:
+                return lease
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise RateLimitError(model, f"not admitted within {max_wait}s", wait)
+            time.sleep(min(wait, 5.0))
+
+    async def aacquire(self, model, tokens, max_wait=None):
+        """acquire for coroutines: the file lock is taken in a worker thread"""
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        while True:
+            lease, wait = await asyncio.to_thread(self.try_acquire, model, tokens)
+            if lease is not None:
+                return lease
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise RateLimitError(model, f"not admitted within {max_wait}s", wait)
+            await asyncio.sleep(min(wait, 5.0))
+
+    def release(self, model, lease, tokens=None):
+        """Finish a successful request: settle its real token count, grow the limit"""
+        lease_id, charged = lease
+
+        def finish(state, quota, now):
+            state["leases"].pop(lease_id, None)
+            if quota.tpm and tokens is not None:
+                state["tokens"] -= tokens - charged
+            state["limit"] = min(state["limit"] + 1 / max(state["limit"], 1.0),
+                                 float(quota.max_concurrency))
+            state["consecutive_throttles"] = 0
+
+        self._update(model, finish)
+
+    def abandon(self, model, lease):
+        """Finish a request that failed for reasons other than rate limiting"""
+        self._update(model, lambda state, quota, now: state["leases"].pop(lease[0], None))
+
+    def throttled(self, model, lease, delay=None):
+        """Record a 429: halve the limit and make every caller back off"""
+        def backoff(state, quota, now):
+            state["leases"].pop(lease[0], None)
+            state["throttles"] = state.get("throttles", 0) + 1
+            if now < state.get("blocked_until", 0):
+                # Another in-flight request already reported this episode
+                return state["blocked_until"] - now
+            count = state.get("consecutive_throttles", 0)
+            state["consecutive_throttles"] = count + 1
+            state["limit"] = max(state["limit"] / 2, 1.0)
+            wait = delay or min(self.base_backoff * 2 ** count, self.max_backoff)
+            wait *= random.uniform(1.0, 1.25)
+            state["blocked_until"] = now + wait
+            return wait
+
+        return self._update(model, backoff)
+
+    def status(self):
+        """Current state of every model that has been rate limited, by model name"""
+        states = {}
+        if os.path.isdir(self.state_dir):
+            for name in sorted(os.listdir(self.state_dir)):
+                if name.endswith(".json"):
+                    with open(os.path.join(self.state_dir, name), "r", encoding="utf-8") as f:
+                        state = json.load(f)
+                    states[state.get("model", name[:-5])] = state
+        return states
+
+    def reset(self, model):
+        with FileLock(self._path(model) + ".lock"):
+            os.remove(self._path(model))
+
+
+class RateLimitedProvider(Provider):
+    """Admit each call through a RateLimiter and retry 429s after the shared backoff"""
+
+    def __init__(self, provider, limiter, max_retries=5, max_wait=None,
+                 expected_output=2000):
+        super().__init__(provider.model)
+        self.name = provider.name
+        self.provider = provider
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.expected_output = expected_output
+
+    def __repr__(self):
+        return f"RateLimitedProvider({self.provider!r})"
+
+    @staticmethod
+    def _tokens(completion):
+        usage = completion.usage_metadata
+        return getattr(usage, "total_token_count", None) if usage is not None else None
+
+    def generate(self, system_instruction, contents):
+        tokens = estimate_tokens(system_instruction, contents, self.expected_output)
+        for _ in range(self.max_retries + 1):
+            lease = self.limiter.acquire(self.model, tokens, self.max_wait)
+            try:
+                completion = self.provider.generate(system_instruction, contents)
+            except Exception as e:
+                if not is_rate_limited(e):
+                    self.limiter.abandon(self.model, lease)
+                    raise
+                self.limiter.throttled(self.model, lease, retry_after(e))
+                error = e
+                continue
+            self.limiter.release(self.model, lease, self._tokens(completion))
+            return completion
+        raise RateLimitError(self.model, f"still throttled after {self.max_retries} "
+                                         f"retries", retry_after(error)) from error
+
+    async def agenerate(self, system_instruction, contents):
+        tokens = estimate_tokens(system_instruction, contents, self.expected_output)
+        for _ in range(self.max_retries + 1):
+            lease = await self.limiter.aacquire(self.model, tokens, self.max_wait)
+            try:
+                completion = await self.provider.agenerate(system_instruction, contents)
+            except BaseException as e:
+                if not is_rate_limited(e):
+                    await asyncio.to_thread(self.limiter.abandon, self.model, lease)
+                    raise
+                await asyncio.to_thread(self.limiter.throttled, self.model, lease,
+                                        retry_after(e))
+                error = e
+                continue
+            await asyncio.to_thread(self.limiter.release, self.model, lease,
+                                    self._tokens(completion))
+            return completion
+        raise RateLimitError(self.model, f"still throttled after {self.max_retries} "
+                                         f"retries", retry_after(error)) from error
+
+    def stream(self, system_instruction, contents):
+        """Hold one lease for the whole stream; a 429 is retried only before any text"""
+        tokens = estimate_tokens(system_instruction, contents, self.expected_output)
+        for _ in range(self.max_retries + 1):
+            lease = self.limiter.acquire(self.model, tokens, self.max_wait)
+            stream = self.provider.stream(system_instruction, contents)
+            emitted = False
+            try:
+                while True:
+                    try:
+                        chunk = next(stream)
+                    except StopIteration as stop:
+                        completion = stop.value
+                        break
+                    emitted = True
+                    yield chunk
+            except GeneratorExit:
+                stream.close()
+                self.limiter.abandon(self.model, lease)
+                raise
+            except Exception as e:
+                if emitted or not is_rate_limited(e):
+                    self.limiter.abandon(self.model, lease)
+                    raise
+                self.limiter.throttled(self.model, lease, retry_after(e))
+                error = e
+                continue
+            self.limiter.release(self.model, lease, self._tokens(completion))
+            return completion
+        raise RateLimitError(self.model, f"still throttled after {self.max_retries} "
+                                         f"retries", retry_after(error)) from error
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or reset shared rate-limit state")
+    parser.add_argument("command", choices=["status", "reset"])
+    parser.add_argument("--state-dir", default=DEFAULT_STATE_DIR)
+    args = parser.parse_args(argv)
+
+    limiter = RateLimiter(state_dir=args.state_dir)
+    if args.command == "reset":
+        for model in limiter.status():
+            limiter.reset(model)
+        return
+    now = time.time()
+    for model, state in limiter.status().items():
+        quota = limiter.quota(model)
+        print(f"{model}: limit {state.get('limit', 0):.1f}/{quota.max_concurrency}, "
+              f"in flight {len(state.get('leases', {}))}, "
+              f"requests {state.get('requests', 0):.1f}/{quota.rpm or '-'}, "
+              f"tokens {state.get('tokens', 0):,.0f}/{quota.tpm or '-'}, "
+              f"429s {state.get('throttles', 0)}, "
+              f"blocked {max(state.get('blocked_until', 0) - now, 0):.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Benchmark always_redraw rebuilds against the in-place updater helpers
+
+Moves an Earth around its orbit for a number of frames and runs the
+updaters of the mobjects that depend on it, the way Scene 6 of
+new_example.py does. Each case is timed in one pass and its allocations
+are measured with tracemalloc in a second pass, so tracing does not skew
+the timings.
+
+    python benchmarks/bench_updaters.py --frames 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np  # noqa: E402
+from manim import (DOWN, ORIGIN, RED, RIGHT, UP, YELLOW_A, Circle, Dot, Line,  # noqa: E402
+                   always_redraw, normalize)
+
+from mobjects.updaters import attach_to, follow, keep_rotated_relative_to  # noqa: E402
+
+ORBIT_RADIUS = 3.5
+EARTH_RADIUS = 0.4
+TILT = 23.5 * np.pi / 180
+
+
+def _axis(earth):
+    return Line(earth.get_center() + UP * EARTH_RADIUS * 1.2,
+                earth.get_center() + DOWN * EARTH_RADIUS * 1.2,
+                color=RED).rotate(TILT, about_point=earth.get_center())
+
+
+def _glow():
+    return Dot(fill_color=YELLOW_A, radius=EARTH_RADIUS * 1.05, fill_opacity=0.4)
+
+
+def axis_always_redraw(earth):
+    return [always_redraw(lambda: _axis(earth))]
+
+
+def axis_attach_to(earth):
+    return [attach_to(_axis(earth), earth)]
+
+
+def axis_keep_rotated(earth):
+    return [keep_rotated_relative_to(_axis(earth), earth, ORIGIN)]
+
+
+def glow_move_to(earth):
+    glow = _glow()
+    glow.add_updater(lambda mob, dt: mob.move_to(
+        earth.get_center() + normalize(earth.get_center() - ORIGIN) * 0.01))
+    return [glow]
+
+
+def glow_follow(earth):
+    return [follow(_glow(), earth, offset=lambda center: normalize(center) * 0.01)]
+
+
+CASES = {
+    "axis: always_redraw": axis_always_redraw,
+    "axis: attach_to": axis_attach_to,
+    "axis: keep_rotated_relative_to": axis_keep_rotated,
+    "glow: move_to updater": glow_move_to,
+    "glow: follow": glow_follow,
+}
+
+
+def _drive(setup, frames):
+    earth = Circle(radius=EARTH_RADIUS, fill_opacity=1.0).move_to(RIGHT * ORBIT_RADIUS)
+    dependents = setup(earth)
+    angles = np.linspace(0, 2 * np.pi, frames)
+    positions = ORBIT_RADIUS * np.stack([np.cos(angles), np.sin(angles), np.zeros(frames)], axis=1)
+    dt = 1 / 60
+
+    def run():
+        for position in positions:
+            earth.move_to(position)
+            for mob in dependents:
+                mob.update(dt)
+
+    return run
+
+
+def bench(setup, frames):
+    run = _drive(setup, frames)
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+
+    run = _drive(setup, frames)
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "frames": frames,
+        "total_ms": round(elapsed * 1000, 2),
+        "us_per_frame": round(elapsed / frames * 1e6, 2),
+        "peak_traced_kb": round(peak / 1024, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = {name: bench(setup, args.frames) for name, setup in CASES.items()}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'case':34} {'us/frame':>10} {'peak KiB':>10}")
+    for name, result in results.items():
+        print(f"{name:34} {result['us_per_frame']:>10.1f} {result['peak_traced_kb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
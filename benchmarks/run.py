@@ -0,0 +1,233 @@
+"""Render benchmark over the scenes this repo actually ships
+
+Renders each workload several times at a fixed quality, each run in a
+fresh interpreter, and records wall time, frames per second, peak RSS and
+output size. Results can be saved as a versioned baseline in
+benchmarks/baselines/ and compared against the latest (or a given) one;
+any metric that regresses by more than --threshold fails the run.
+
+    python -m benchmarks.run                       # measure and compare to the latest baseline
+    python -m benchmarks.run --save                # ... and store the results as a new baseline
+    python -m benchmarks.run -w earth_seasons -n 5 --quality medium_quality
+
+Manim's partial-movie cache is disabled for every run. The shared glyph
+cache is not, so the warm-up run (excluded from the statistics) fills it.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+from render.pool import DEFAULT_MEDIA_DIR, ROOT_DIR, find_scene_class, write_scene_file
+
+BASELINE_DIR = os.path.join(ROOT_DIR, "benchmarks", "baselines")
+BENCH_MEDIA_DIR = os.path.join(DEFAULT_MEDIA_DIR, "benchmarks")
+WORKLOADS = {
+    "neural_network": ("example.py", "NeuralNetworkExplanation2"),
+    "earth_seasons": ("new_example.py", "EarthSeasonsAnimation"),
+    "generated_response": (os.path.join("ai", "GEMINI", "response.txt"), None),
+}
+# Metric -> True when larger is better
+METRICS = {"wall_s": False, "fps": True, "peak_rss_mb": False, "output_bytes": False}
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _frame_count(video_path):
+    import ffmpeg
+
+    stream = next(s for s in ffmpeg.probe(video_path)["streams"] if s["codec_type"] == "video")
+    if stream.get("nb_frames"):
+        return int(stream["nb_frames"])
+    num, den = stream["avg_frame_rate"].split("/")
+    return round(float(stream["duration"]) * int(num) / int(den))
+
+
+def render_once(path, scene_name, quality, media_dir):
+    """Worker side: render in this process and return the run's measurements"""
+    from manim import tempconfig
+
+    from render.pool import render_scene_file
+
+    start = time.perf_counter()
+    with tempconfig({"disable_caching": True}):
+        video_path = render_scene_file(path, scene_name, quality, media_dir)
+    wall = time.perf_counter() - start
+    frames = _frame_count(video_path)
+    return {
+        "wall_s": round(wall, 3),
+        "frames": frames,
+        "fps": round(frames / wall, 2) if wall else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "output_bytes": os.path.getsize(video_path),
+    }
+
+
+def _scene_file(workload):
+    relative, scene_name = WORKLOADS[workload]
+    path = os.path.join(ROOT_DIR, relative)
+    if path.endswith(".py"):
+        return path, scene_name
+    with open(path, "r", encoding="utf-8") as f:
+        code = f.read()
+    from ai.GEMINI.app import extract_python_code_blocks
+
+    code = extract_python_code_blocks(code)
+    return write_scene_file(code), scene_name or find_scene_class(code)
+
+
+def run_workload(workload, quality, runs, warmup=1):
+    path, scene_name = _scene_file(workload)
+    media_dir = os.path.join(BENCH_MEDIA_DIR, workload)
+    measurements = []
+    for i in range(warmup + runs):
+        shutil.rmtree(media_dir, ignore_errors=True)
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", "--worker",
+             path, scene_name, quality, media_dir],
+            cwd=ROOT_DIR, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{workload} run {i} failed:\n{proc.stderr[-2000:]}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if i >= warmup:
+            measurements.append(result)
+        print(f"  {workload} {'warmup' if i < warmup else f'run {i - warmup + 1}'}: "
+              f"{result['wall_s']:.2f}s, {result['fps']} fps", file=sys.stderr)
+    summary = {
+        metric: statistics.median(m[metric] for m in measurements)
+        for metric in METRICS if all(m[metric] is not None for m in measurements)
+    }
+    summary["frames"] = measurements[0]["frames"]
+    summary["runs"] = measurements
+    return summary
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    try:
+        import manim
+        manim_version = manim.__version__
+    except ImportError:
+        manim_version = None
+    return {
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "manim": manim_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def latest_baseline(baseline_dir=BASELINE_DIR):
+    paths = sorted(glob.glob(os.path.join(baseline_dir, "*.json")))
+    return paths[-1] if paths else None
+
+
+def save_baseline(results, baseline_dir=BASELINE_DIR):
+    os.makedirs(baseline_dir, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime(results["created_at"]))
+    commit = results["environment"]["git_commit"] or "nogit"
+    path = os.path.join(baseline_dir, f"{stamp}_{commit}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def compare(results, baseline, threshold):
+    """Return [(workload, metric, baseline, current, change)] beyond `threshold`"""
+    regressions = []
+    for workload, current in results["workloads"].items():
+        previous = baseline["workloads"].get(workload)
+        if previous is None or previous.get("quality", results["quality"]) != results["quality"]:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append((workload, metric, old, new, change))
+    return regressions
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "--worker":
+        path, scene_name, quality, media_dir = argv[1:5]
+        print(json.dumps(render_once(path, scene_name, quality, media_dir)))
+        return 0
+
+    parser = argparse.ArgumentParser(description="Benchmark rendering of the shipped scenes")
+    parser.add_argument("-w", "--workload", action="append", choices=sorted(WORKLOADS),
+                        help="workload to run (repeatable; default: all)")
+    parser.add_argument("-q", "--quality", default="low_quality")
+    parser.add_argument("-n", "--runs", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative regression that fails the run (default 0.10)")
+    parser.add_argument("--baseline", default=None,
+                        help="baseline to compare against (default: the latest)")
+    parser.add_argument("--save", action="store_true", help="store results as a new baseline")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = {
+        "created_at": time.time(),
+        "quality": args.quality,
+        "environment": environment(),
+        "workloads": {},
+    }
+    for workload in args.workload or list(WORKLOADS):
+        results["workloads"][workload] = {
+            "quality": args.quality,
+            **run_workload(workload, args.quality, args.runs, args.warmup),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'workload':20} {'wall s':>8} {'fps':>8} {'rss MB':>8} {'size KB':>9}")
+        for workload, result in results["workloads"].items():
+            rss = result.get("peak_rss_mb")
+            print(f"{workload:20} {result['wall_s']:>8.2f} {result['fps']:>8.1f} "
+                  f"{rss if rss is not None else '-':>8} {result['output_bytes'] / 1024:>9.1f}")
+
+    failed = False
+    baseline_path = args.baseline or latest_baseline()
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        print(f"compared with {os.path.relpath(baseline_path, ROOT_DIR)}: "
+              f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+        for workload, metric, old, new, change in regressions:
+            print(f"  REGRESSION {workload} {metric}: {old} -> {new} ({change:+.1%})")
+        failed = bool(regressions)
+    if args.save:
+        print(f"saved baseline {os.path.relpath(save_baseline(results), ROOT_DIR)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
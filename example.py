@@ -1,5 +1,8 @@
 from manim import *
 
+from mobjects.connections import AllPairsConnections
+from mobjects.particles import ParticleFlow, Particles
+
 
 class NeuralNetworkExplanation2(MovingCameraScene):
     def construct(self):
@@ -309,18 +312,11 @@ class NeuralNetworkExplanation2(MovingCameraScene):
             "Output Layer", font_size=28, color=TEXT_COLOR)
         output_layer_label.next_to(output_layer_nodes, DOWN, buff=0.5)
 
-        # Connections (Lines)
-        connections_1_2 = VGroup()
-        for in_node in input_layer_nodes:
-            for hid_node in hidden_layer_1_nodes:
-                connections_1_2.add(Line(in_node.get_center(), hid_node.get_center(
-                ), color=CONNECTION_COLOR, stroke_width=1.5))
-
-        connections_2_3 = VGroup()
-        for hid_node in hidden_layer_1_nodes:
-            for out_node in output_layer_nodes:
-                connections_2_3.add(Line(hid_node.get_center(
-                ), out_node.get_center(), color=CONNECTION_COLOR, stroke_width=1.5))
+        # Connections (every node pair, stored as one mobject per layer pair)
+        connections_1_2 = AllPairsConnections(
+            input_layer_nodes, hidden_layer_1_nodes, color=CONNECTION_COLOR, stroke_width=1.5)
+        connections_2_3 = AllPairsConnections(
+            hidden_layer_1_nodes, output_layer_nodes, color=CONNECTION_COLOR, stroke_width=1.5)
 
         # Group entire network for scaling/positioning later
         full_network = VGroup(
@@ -400,37 +396,25 @@ class NeuralNetworkExplanation2(MovingCameraScene):
         )
 
         # Animate data moving through connections and nodes
-        path_segments_1 = []
-        for line in connections_1_2:
-            data_dot = Dot(line.get_start(),
-                           color=HIGHLIGHT_COLOR, radius=node_radius*0.8)
-            path_segments_1.append(MoveAlongPath(data_dot, line, run_time=0.3))
-            self.add(data_dot)  # Add to scene so it's visible during movement
-
+        # (one dot per connection; the dots are removed when the flow ends)
+        signals_1 = Particles(connections_1_2, radius=node_radius*0.8,
+                              color=HIGHLIGHT_COLOR)
         self.play(
             # Lag ratio to make dots appear staggered
-            AnimationGroup(*path_segments_1, lag_ratio=0.01),
+            ParticleFlow(signals_1, travel_time=0.3, lag_ratio=0.01),
             AnimationGroup(*[
                 Flash(node, color=HIGHLIGHT_COLOR, flash_radius=node_radius*2) for node in hidden_layer_1_nodes
             ], lag_ratio=0.05, run_time=1)
         )
-        # Remove the moving dots
-        self.remove(*[p.mobject for p in path_segments_1])
-
-        path_segments_2 = []
-        for line in connections_2_3:
-            data_dot = Dot(line.get_start(),
-                           color=HIGHLIGHT_COLOR, radius=node_radius*0.8)
-            path_segments_2.append(MoveAlongPath(data_dot, line, run_time=0.3))
-            self.add(data_dot)
 
+        signals_2 = Particles(connections_2_3, radius=node_radius*0.8,
+                              color=HIGHLIGHT_COLOR)
         self.play(
-            AnimationGroup(*path_segments_2, lag_ratio=0.01),
+            ParticleFlow(signals_2, travel_time=0.3, lag_ratio=0.01),
             AnimationGroup(*[
                 Flash(node, color=HIGHLIGHT_COLOR, flash_radius=node_radius*2) for node in output_layer_nodes
             ], lag_ratio=0.05, run_time=1)
         )
-        self.remove(*[p.mobject for p in path_segments_2])
 
         final_output_text = Text("Output", font_size=28, color=SUCCESS_COLOR).next_to(
             output_layer_nodes, RIGHT, buff=0.5)
@@ -487,19 +471,11 @@ class NeuralNetworkExplanation2(MovingCameraScene):
         self.wait(1)
 
         # Highlight connections being updated
-        update_highlight_group = VGroup()
-        for conn in connections_1_2:
-            update_highlight_group.add(conn.copy().set_color(
-                HIGHLIGHT_COLOR).set_stroke_width(5))
-        for conn in connections_2_3:
-            update_highlight_group.add(conn.copy().set_color(
-                HIGHLIGHT_COLOR).set_stroke_width(5))
-
         self.play(
-            LaggedStart(*[Flash(conn, color=HIGHLIGHT_COLOR, flash_radius=0.1)
-                        for conn in connections_2_3], lag_ratio=0.01),
-            LaggedStart(*[Flash(conn, color=HIGHLIGHT_COLOR, flash_radius=0.1)
-                        for conn in connections_1_2], lag_ratio=0.01),
+            LaggedStart(*[Flash(point, color=HIGHLIGHT_COLOR, flash_radius=0.1)
+                        for point in connections_2_3.get_midpoints()], lag_ratio=0.01),
+            LaggedStart(*[Flash(point, color=HIGHLIGHT_COLOR, flash_radius=0.1)
+                        for point in connections_1_2.get_midpoints()], lag_ratio=0.01),
             run_time=2
         )
 
@@ -0,0 +1,127 @@
+"""Vectorized edge mobjects for dense layer-to-layer wiring
+
+A VGroup of Lines costs one mobject (and one Cairo path) per edge. EdgeSet
+stores every edge as one cubic segment in a single points array, so a
+fully connected layer pair is built, transformed and stroked in one go.
+"""
+import numpy as np
+from manim import GREY_B, YELLOW, Line, VGroup, VMobject
+
+_THIRDS = np.array([0.0, 1 / 3, 2 / 3, 1.0])[None, :, None]
+
+
+def _as_points(items):
+    """Centers of a sequence of mobjects, or an (n, 3) array of points"""
+    if isinstance(items, np.ndarray):
+        return np.asarray(items, dtype=float).reshape(-1, 3)
+    return np.array([item.get_center() if hasattr(item, "get_center") else item
+                     for item in items], dtype=float).reshape(-1, 3)
+
+
+class EdgeSet(VMobject):
+    """Straight edges stored as consecutive 4-point cubic segments
+
+    Create/Uncreate grow every edge from its start point. `draw_lag_ratio`
+    staggers the edges the way Create staggers the submobjects of a VGroup
+    (1.0 draws them one after another, 0.0 all at once).
+    """
+
+    def __init__(self, starts, ends, draw_lag_ratio=1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.draw_lag_ratio = draw_lag_ratio
+        self.set_edges(starts, ends)
+
+    def set_edges(self, starts, ends):
+        starts = np.asarray(starts, dtype=float).reshape(-1, 3)
+        ends = np.asarray(ends, dtype=float).reshape(-1, 3)
+        points = starts[:, None, :] + _THIRDS * (ends - starts)[:, None, :]
+        self.set_points(points.reshape(-1, 3))
+        return self
+
+    @property
+    def num_edges(self):
+        return len(self.points) // 4
+
+    def get_starts(self):
+        return self.points[0::4]
+
+    def get_ends(self):
+        return self.points[3::4]
+
+    def get_midpoints(self):
+        return (self.get_starts() + self.get_ends()) / 2
+
+    def pointwise_become_partial(self, vmobject, a, b):
+        if not isinstance(vmobject, EdgeSet) or vmobject.num_edges == 0:
+            return super().pointwise_become_partial(vmobject, a, b)
+        starts, ends = vmobject.get_starts(), vmobject.get_ends()
+        count = len(starts)
+        lag = self.draw_lag_ratio
+        full_length = (count - 1) * lag + 1
+        offsets = np.arange(count) * lag
+        lower = np.clip(a * full_length - offsets, 0, 1)[:, None]
+        upper = np.clip(b * full_length - offsets, 0, 1)[:, None]
+        delta = ends - starts
+        return self.set_edges(starts + lower * delta, starts + upper * delta)
+
+    def edge_line(self, index):
+        """A standalone Line for one edge, e.g. as a MoveAlongPath target"""
+        return Line(self.get_starts()[index], self.get_ends()[index],
+                    color=self.get_stroke_color(), stroke_width=self.get_stroke_width())
+
+    def edge_lines(self):
+        return VGroup(*[self.edge_line(i) for i in range(self.num_edges)])
+
+
+class AllPairsConnections(EdgeSet):
+    """Every source-target edge between two layers, in one points array
+
+    Edge (i, j) joins source i to target j and has index i * len(targets) + j,
+    the order of the usual nested `for src: for dst:` loop. Highlights are
+    EdgeSet submobjects drawn on top with their own stroke, so they move,
+    scale and fade with the connections.
+    """
+
+    def __init__(self, sources, targets, color=GREY_B, stroke_width=1.5, **kwargs):
+        source_points = _as_points(sources)
+        target_points = _as_points(targets)
+        self.shape = (len(source_points), len(target_points))
+        starts = np.repeat(source_points, self.shape[1], axis=0)
+        ends = np.tile(target_points, (self.shape[0], 1))
+        super().__init__(starts, ends, color=color, stroke_width=stroke_width, **kwargs)
+
+    def edge_index(self, source, target):
+        return source * self.shape[1] + target
+
+    def _edge_indices(self, edges):
+        edges = np.asarray(edges)
+        if edges.dtype == bool:
+            return np.flatnonzero(edges.reshape(-1))
+        if edges.ndim == 2 and edges.shape[1] == 2:
+            return edges[:, 0] * self.shape[1] + edges[:, 1]
+        return edges.reshape(-1).astype(int)
+
+    def edges_from(self, source):
+        return np.arange(self.shape[1]) + source * self.shape[1]
+
+    def edges_to(self, target):
+        return np.arange(self.shape[0]) * self.shape[1] + target
+
+    def highlight(self, edges, color=YELLOW, stroke_width=None, **kwargs):
+        """Overlay `edges` (indices, (i, j) pairs or a mask) with a new stroke
+
+        Returns the highlight so it can be animated on its own, e.g.
+        `self.play(Create(connections.highlight(connections.edges_to(0))))`.
+        """
+        indices = self._edge_indices(edges)
+        overlay = EdgeSet(
+            self.get_starts()[indices], self.get_ends()[indices],
+            draw_lag_ratio=self.draw_lag_ratio, color=color,
+            stroke_width=stroke_width if stroke_width is not None else self.get_stroke_width() * 2,
+            **kwargs)
+        self.add(overlay)
+        return overlay
+
+    def clear_highlights(self):
+        self.remove(*self.submobjects)
+        return self
@@ -0,0 +1,102 @@
+"""Prototype-and-copy factory for props that reappear throughout a scene
+
+Lessons rebuild the same sun, orbit, node or label in every section.
+PropFactory constructs each distinct (class, arguments) combination once
+and hands out copies of that prototype afterwards.
+
+Copies are full copies: manim transforms points in place (shift, rotate,
+apply_function), so copies cannot share arrays with the prototype. Copying
+is still far cheaper than building anything that involves text layout,
+SVG parsing or many submobjects.
+"""
+import time
+
+import numpy as np
+
+
+class Uncacheable(TypeError):
+    pass
+
+
+def _freeze(value):
+    """Hashable stand-in for a constructor argument"""
+    if isinstance(value, np.ndarray):
+        return ("ndarray", value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_freeze(item) for item in value))
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted((key, _freeze(item)) for key, item in value.items())))
+    if callable(value) and not isinstance(value, type):
+        # Functions (rate funcs, updaters) and mobjects would be keyed by identity
+        raise Uncacheable(f"cannot key on {type(value).__name__} argument")
+    try:
+        hash(value)
+    except TypeError:
+        raise Uncacheable(f"unhashable {type(value).__name__} argument") from None
+    return (type(value).__name__, value)
+
+
+class PropFactory:
+    """Memoize mobjects by constructor arguments and return copies
+
+        props = PropFactory()
+        sun = props.get(Circle, radius=1.0, color=YELLOW, fill_opacity=1.0)
+
+    Calls with arguments that cannot be keyed (mobjects, functions) are
+    built directly and counted as `uncacheable`.
+    """
+
+    def __init__(self):
+        self._prototypes = {}
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+        self.build_seconds = 0.0
+        self.copy_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def get(self, cls, *args, **kwargs):
+        try:
+            key = (cls, _freeze(args), _freeze(kwargs))
+        except Uncacheable:
+            self.uncacheable += 1
+            return cls(*args, **kwargs)
+
+        entry = self._prototypes.get(key)
+        hit = entry is not None
+        if hit:
+            self.hits += 1
+        else:
+            start = time.perf_counter()
+            prototype = cls(*args, **kwargs)
+            entry = self._prototypes[key] = (prototype, time.perf_counter() - start)
+            self.build_seconds += entry[1]
+            self.misses += 1
+
+        prototype, build_time = entry
+        start = time.perf_counter()
+        mob = prototype.copy()
+        copy_time = time.perf_counter() - start
+        self.copy_seconds += copy_time
+        if hit:
+            self.saved_seconds += max(build_time - copy_time, 0.0)
+        return mob
+
+    __call__ = get
+
+    def stats(self):
+        """Constructions avoided and an estimate of the setup time they saved"""
+        lookups = self.hits + self.misses
+        return {
+            "prototypes": len(self._prototypes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncacheable": self.uncacheable,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "build_seconds": round(self.build_seconds, 4),
+            "copy_seconds": round(self.copy_seconds, 4),
+            "saved_seconds": round(self.saved_seconds, 4),
+        }
+
+    def clear(self):
+        self._prototypes.clear()
@@ -0,0 +1,77 @@
+"""Updater helpers that move one mobject in place instead of rebuilding it
+
+`always_redraw(lambda: Line(...))` constructs a new mobject (and new point
+arrays) every frame. These helpers capture the geometry once and, on each
+frame, write the new position straight into the existing points arrays.
+Each returns `mob` with the updater added, so they chain like add_updater.
+"""
+import numpy as np
+
+
+def _translate_in_place(mob, delta):
+    if not delta.any():
+        return
+    for member in mob.family_members_with_points():
+        member.points += delta
+
+
+def attach_to(mob, target):
+    """Keep `mob` rigidly at its current offset from `target`'s center"""
+    offset = mob.get_center() - target.get_center()
+
+    def update(m):
+        _translate_in_place(m, target.get_center() + offset - m.get_center())
+
+    return mob.add_updater(update)
+
+
+def follow(mob, target, offset=None):
+    """Keep `mob` centered on `target`'s center plus `offset`
+
+    `offset` is a vector, or a function of the target's center returning
+    one (e.g. a small push away from a light source).
+    """
+    if offset is None:
+        offset = np.zeros(3)
+
+    def update(m):
+        center = target.get_center()
+        shift = offset(center) if callable(offset) else offset
+        _translate_in_place(m, center + shift - m.get_center())
+
+    return mob.add_updater(update)
+
+
+def keep_rotated_relative_to(mob, target, pivot, about=None):
+    """Carry `mob` with `target` and turn it as `target` swings around `pivot`
+
+    The mobject keeps the angle it currently makes with the pivot-to-target
+    direction, like a tidally locked moon. `pivot` is a point or a mobject
+    (its center is used); `about` is the point on `mob` that stays glued to
+    the target, defaulting to the target's current center. Rotation is in
+    the xy-plane.
+    """
+    def pivot_point():
+        return pivot.get_center() if hasattr(pivot, "get_center") else np.asarray(pivot)
+
+    anchor = target.get_center() if about is None else np.asarray(about, dtype=float)
+    glue = anchor - target.get_center()
+    direction = target.get_center() - pivot_point()
+    start_angle = np.arctan2(direction[1], direction[0])
+    members = mob.family_members_with_points()
+    templates = [member.points - anchor for member in members]
+
+    def update(m):
+        center = target.get_center()
+        direction = center - pivot_point()
+        angle = np.arctan2(direction[1], direction[0]) - start_angle
+        cos, sin = np.cos(angle), np.sin(angle)
+        rotation = np.array([[cos, -sin, 0], [sin, cos, 0], [0, 0, 1]])
+        origin = center + rotation @ glue
+        for member, template in zip(members, templates):
+            if member.points.shape != template.shape:
+                member.points = np.empty_like(template)
+            np.matmul(template, rotation.T, out=member.points)
+            member.points += origin
+
+    return mob.add_updater(update)
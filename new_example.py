@@ -1,10 +1,16 @@
 from manim import *
 
+from mobjects.factory import PropFactory
+from mobjects.updaters import attach_to, follow
+
 # Constants
 EARTH_ORBIT_RADIUS = 3.5
 EARTH_RADIUS = 0.4
 AXIAL_TILT = 23.5 * DEGREES  # 23.5 degrees in radians
 
+# Sun, orbit, Earth and labels recur in every section: build once, then copy
+props = PropFactory()
+
 
 class EarthSeasonsAnimation(Scene):
     def construct(self):
@@ -12,20 +18,22 @@ class EarthSeasonsAnimation(Scene):
         # Scene 1: Introduction to Earth's Orbit
         # --------------------
         # Sun at center
-        sun = Circle(radius=1.0, color=YELLOW, fill_opacity=1.0)
-        sun_label = Text("The Sun", color=WHITE).next_to(sun, DOWN, buff=0.3)
+        sun = props.get(Circle, radius=1.0, color=YELLOW, fill_opacity=1.0)
+        sun_label = props.get(Text, "The Sun",
+                              color=WHITE).next_to(sun, DOWN, buff=0.3)
 
         # Earth's orbital path
-        orbit = Circle(radius=EARTH_ORBIT_RADIUS,
-                       color=WHITE, stroke_opacity=0.5)
+        orbit = props.get(Circle, radius=EARTH_ORBIT_RADIUS,
+                          color=WHITE, stroke_opacity=0.5)
 
         orbit_label = Text("Earth's Orbit", color=WHITE).next_to(
             orbit, UP, buff=0.3)
 
         # Earth at starting point (right of Sun)
-        earth = Circle(radius=EARTH_RADIUS, color=BLUE,
-                       fill_opacity=1.0).shift(RIGHT * EARTH_ORBIT_RADIUS)
-        earth_label = Text("Earth", color=WHITE).next_to(earth, DOWN, buff=0.2)
+        earth = props.get(Circle, radius=EARTH_RADIUS, color=BLUE,
+                          fill_opacity=1.0).shift(RIGHT * EARTH_ORBIT_RADIUS)
+        earth_label = props.get(Text, "Earth",
+                                color=WHITE).next_to(earth, DOWN, buff=0.2)
 
         # Draw orbit
         self.play(Create(orbit), FadeIn(orbit_label))
@@ -89,16 +97,17 @@ class EarthSeasonsAnimation(Scene):
         # Scene 3: Summer Solstice (Northern Hemisphere)
         # --------------------
         # Add Sun and orbit back
-        sun3 = Circle(radius=1.0, color=YELLOW, fill_opacity=1.0)
-        sun3_label = Text("The Sun", color=WHITE).to_corner(UL)
-        orbit3 = Circle(radius=EARTH_ORBIT_RADIUS,
-                        color=WHITE, stroke_opacity=0.5)
+        sun3 = props.get(Circle, radius=1.0, color=YELLOW, fill_opacity=1.0)
+        sun3_label = props.get(Text, "The Sun", color=WHITE).to_corner(UL)
+        orbit3 = props.get(Circle, radius=EARTH_ORBIT_RADIUS,
+                           color=WHITE, stroke_opacity=0.5)
         self.add(sun3, sun3_label, orbit3)
 
         # Earth moving into June position
-        start_earth3 = Circle(radius=EARTH_RADIUS, color=BLUE, fill_opacity=1.0).move_to(
+        start_earth3 = props.get(Circle, radius=EARTH_RADIUS, color=BLUE,
+                                 fill_opacity=1.0).move_to(
             RIGHT * EARTH_ORBIT_RADIUS)
-        earth3_label = Text("Earth", color=WHITE).next_to(
+        earth3_label = props.get(Text, "Earth", color=WHITE).next_to(
             start_earth3, UP, buff=0.1)
         self.play(FadeIn(start_earth3), FadeIn(earth3_label))
         self.wait(0.3)
@@ -109,8 +118,8 @@ class EarthSeasonsAnimation(Scene):
         self.remove(start_earth3, earth3_label)
 
         # Earth at top (June Solstice)
-        earth3 = Circle(radius=EARTH_RADIUS, color=BLUE,
-                        fill_opacity=1.0).move_to(UP * EARTH_ORBIT_RADIUS)
+        earth3 = props.get(Circle, radius=EARTH_RADIUS, color=BLUE,
+                           fill_opacity=1.0).move_to(UP * EARTH_ORBIT_RADIUS)
         axis3 = Line(
             earth3.get_center() + UP * EARTH_RADIUS * 1.2,
             earth3.get_center() + DOWN * EARTH_RADIUS * 1.2,
@@ -153,16 +162,17 @@ class EarthSeasonsAnimation(Scene):
         # --------------------
         # Scene 4: Winter Solstice (Northern Hemisphere)
         # --------------------
-        sun4 = Circle(radius=1.0, color=YELLOW, fill_opacity=1.0)
-        sun4_label = Text("The Sun", color=WHITE).to_corner(UL)
-        orbit4 = Circle(radius=EARTH_ORBIT_RADIUS,
-                        color=WHITE, stroke_opacity=0.5)
+        sun4 = props.get(Circle, radius=1.0, color=YELLOW, fill_opacity=1.0)
+        sun4_label = props.get(Text, "The Sun", color=WHITE).to_corner(UL)
+        orbit4 = props.get(Circle, radius=EARTH_ORBIT_RADIUS,
+                           color=WHITE, stroke_opacity=0.5)
         self.add(sun4, sun4_label, orbit4)
 
         # Earth moves from top to bottom
-        start_earth4 = Circle(radius=EARTH_RADIUS, color=BLUE,
-                              fill_opacity=1.0).move_to(UP * EARTH_ORBIT_RADIUS)
-        earth4_label = Text("Earth", color=WHITE).next_to(
+        start_earth4 = props.get(Circle, radius=EARTH_RADIUS, color=BLUE,
+                                 fill_opacity=1.0).move_to(
+            UP * EARTH_ORBIT_RADIUS)
+        earth4_label = props.get(Text, "Earth", color=WHITE).next_to(
             start_earth4, UP, buff=0.1)
         self.play(FadeIn(start_earth4), FadeIn(earth4_label))
         self.wait(0.3)
@@ -173,8 +183,8 @@ class EarthSeasonsAnimation(Scene):
         self.remove(start_earth4, earth4_label)
 
         # Earth at bottom (December Solstice)
-        earth4 = Circle(radius=EARTH_RADIUS, color=BLUE,
-                        fill_opacity=1.0).move_to(DOWN * EARTH_ORBIT_RADIUS)
+        earth4 = props.get(Circle, radius=EARTH_RADIUS, color=BLUE,
+                           fill_opacity=1.0).move_to(DOWN * EARTH_ORBIT_RADIUS)
         axis4 = Line(
             earth4.get_center() + UP * EARTH_RADIUS * 1.2,
             earth4.get_center() + DOWN * EARTH_RADIUS * 1.2,
@@ -217,16 +227,17 @@ class EarthSeasonsAnimation(Scene):
         # --------------------
         # Scene 5: Equinoxes (Spring & Fall)
         # --------------------
-        sun5 = Circle(radius=1.0, color=YELLOW, fill_opacity=1.0)
-        sun5_label = Text("The Sun", color=WHITE).to_corner(UL)
-        orbit5 = Circle(radius=EARTH_ORBIT_RADIUS,
-                        color=WHITE, stroke_opacity=0.5)
+        sun5 = props.get(Circle, radius=1.0, color=YELLOW, fill_opacity=1.0)
+        sun5_label = props.get(Text, "The Sun", color=WHITE).to_corner(UL)
+        orbit5 = props.get(Circle, radius=EARTH_ORBIT_RADIUS,
+                           color=WHITE, stroke_opacity=0.5)
         self.add(sun5, sun5_label, orbit5)
 
         # Earth moves from bottom to left (March Equinox)
-        start_earth5 = Circle(radius=EARTH_RADIUS, color=BLUE, fill_opacity=1.0).move_to(
+        start_earth5 = props.get(Circle, radius=EARTH_RADIUS, color=BLUE,
+                                 fill_opacity=1.0).move_to(
             DOWN * EARTH_ORBIT_RADIUS)
-        earth5_label = Text("Earth", color=WHITE).next_to(
+        earth5_label = props.get(Text, "Earth", color=WHITE).next_to(
             start_earth5, DOWN, buff=0.1)
         self.play(FadeIn(start_earth5), FadeIn(earth5_label))
         self.wait(0.3)
@@ -239,8 +250,8 @@ class EarthSeasonsAnimation(Scene):
         self.remove(start_earth5, earth5_label)
 
         # Earth at March Equinox (left)
-        earth5 = Circle(radius=EARTH_RADIUS, color=BLUE,
-                        fill_opacity=1.0).move_to(LEFT * EARTH_ORBIT_RADIUS)
+        earth5 = props.get(Circle, radius=EARTH_RADIUS, color=BLUE,
+                           fill_opacity=1.0).move_to(LEFT * EARTH_ORBIT_RADIUS)
         axis5 = Line(
             earth5.get_center() + UP * EARTH_RADIUS * 1.2,
             earth5.get_center() + DOWN * EARTH_RADIUS * 1.2,
@@ -276,8 +287,8 @@ class EarthSeasonsAnimation(Scene):
         self.wait(0.3)
 
         # Earth moves from left to right (September Equinox)
-        earth6 = Circle(radius=EARTH_RADIUS, color=BLUE,
-                        fill_opacity=1.0).move_to(LEFT * EARTH_ORBIT_RADIUS)
+        earth6 = props.get(Circle, radius=EARTH_RADIUS, color=BLUE,
+                           fill_opacity=1.0).move_to(LEFT * EARTH_ORBIT_RADIUS)
         axis6 = Line(
             earth6.get_center() + UP * EARTH_RADIUS * 1.2,
             earth6.get_center() + DOWN * EARTH_RADIUS * 1.2,
@@ -291,8 +302,9 @@ class EarthSeasonsAnimation(Scene):
         self.remove(earth6)
 
         # Earth at September Equinox (right)
-        earth7 = Circle(radius=EARTH_RADIUS, color=BLUE,
-                        fill_opacity=1.0).move_to(RIGHT * EARTH_ORBIT_RADIUS)
+        earth7 = props.get(Circle, radius=EARTH_RADIUS, color=BLUE,
+                           fill_opacity=1.0).move_to(
+            RIGHT * EARTH_ORBIT_RADIUS)
         axis7 = Line(
             earth7.get_center() + UP * EARTH_RADIUS * 1.2,
             earth7.get_center() + DOWN * EARTH_RADIUS * 1.2,
@@ -331,20 +343,22 @@ class EarthSeasonsAnimation(Scene):
         # --------------------
         # Scene 6: Full Annual Cycle
         # --------------------
-        sun6 = Circle(radius=1.0, color=YELLOW, fill_opacity=1.0)
-        sun6_label = Text("The Sun", color=WHITE).to_corner(UL)
-        orbit6 = Circle(radius=EARTH_ORBIT_RADIUS,
-                        color=WHITE, stroke_opacity=0.5)
+        sun6 = props.get(Circle, radius=1.0, color=YELLOW, fill_opacity=1.0)
+        sun6_label = props.get(Text, "The Sun", color=WHITE).to_corner(UL)
+        orbit6 = props.get(Circle, radius=EARTH_ORBIT_RADIUS,
+                           color=WHITE, stroke_opacity=0.5)
         self.add(sun6, sun6_label, orbit6)
 
         # Earth with axis (initial at right)
-        earth8 = Circle(radius=EARTH_RADIUS, color=BLUE,
-                        fill_opacity=1.0).move_to(RIGHT * EARTH_ORBIT_RADIUS)
-        axis8 = always_redraw(lambda: Line(
+        earth8 = props.get(Circle, radius=EARTH_RADIUS, color=BLUE,
+                           fill_opacity=1.0).move_to(
+            RIGHT * EARTH_ORBIT_RADIUS)
+        axis8 = Line(
             earth8.get_center() + UP * EARTH_RADIUS * 1.2,
             earth8.get_center() + DOWN * EARTH_RADIUS * 1.2,
             color=RED
-        ).rotate(AXIAL_TILT, about_point=earth8.get_center()))
+        ).rotate(AXIAL_TILT, about_point=earth8.get_center())
+        attach_to(axis8, earth8)
 
         earth_and_axis8 = VGroup(earth8, axis8)
 
@@ -353,9 +367,9 @@ class EarthSeasonsAnimation(Scene):
             fill_color=YELLOW_A,
             radius=EARTH_RADIUS * 1.05,
             fill_opacity=0.4)
-        illuminated.add_updater(lambda mob, dt: mob.move_to(
-            earth8.get_center() + normalize(earth8.get_center() - sun6.get_center()) * 0.01
-        ))
+        sun6_center = sun6.get_center()
+        follow(illuminated, earth8,
+               offset=lambda center: normalize(center - sun6_center) * 0.01)
 
         self.add(earth_and_axis8, illuminated)
 
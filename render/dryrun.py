@@ -0,0 +1,214 @@
+"""Dry-run timeline: execute construct() with animations skipped and report the timeline
+
+Every self.play/self.wait runs (animations jump straight to their end
+state) and nothing is encoded; the only drawing is one 32x18 static frame
+per animation, which Manim's renderer does even when skipping. The report gives the total
+duration, animation count, peak mobject count and the on-screen bounding
+box of every mobject after each step, which is enough to reject lessons
+that are too long or put text off-frame, and to estimate render cost.
+"""
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+
+from render.pool import (RANDOM_SEED, find_scene_class, load_scene_class, no_output_config,
+                         write_scene_file)
+
+FRAME_RATES = {
+    "low_quality": 15,
+    "medium_quality": 30,
+    "high_quality": 60,
+    "production_quality": 60,
+    "fourk_quality": 60,
+}
+OFF_FRAME_TOLERANCE = 0.01
+
+
+@dataclass
+class MobjectBox:
+    name: str
+    bbox: list
+    off_frame: bool
+
+
+@dataclass
+class TimelineStep:
+    index: int
+    kind: str
+    line: int
+    start: float
+    run_time: float
+    animations: list
+    mobject_count: int
+    family_count: int
+    boxes: list = field(default_factory=list)
+
+
+@dataclass
+class TimelineReport:
+    scene_name: str
+    steps: list = field(default_factory=list)
+    frame: list = None
+    elapsed_s: float = 0.0
+
+    @property
+    def total_duration(self):
+        return sum(step.run_time for step in self.steps)
+
+    @property
+    def animation_count(self):
+        return sum(1 for step in self.steps if step.kind == "play")
+
+    @property
+    def peak_mobject_count(self):
+        return max((step.family_count for step in self.steps), default=0)
+
+    @property
+    def render_cost(self):
+        """Mobject-seconds: a rough proxy for rasterization work"""
+        return sum(step.run_time * step.family_count for step in self.steps)
+
+    def estimated_frames(self, quality="high_quality"):
+        return round(self.total_duration * FRAME_RATES[quality])
+
+    def off_frame(self):
+        """(step index, line, mobject name) for every off-frame mobject"""
+        return [(step.index, step.line, box.name)
+                for step in self.steps for box in step.boxes if box.off_frame]
+
+    def to_dict(self):
+        return {
+            "scene_name": self.scene_name,
+            "total_duration": round(self.total_duration, 3),
+            "animation_count": self.animation_count,
+            "wait_count": len(self.steps) - self.animation_count,
+            "peak_mobject_count": self.peak_mobject_count,
+            "render_cost": round(self.render_cost, 1),
+            "estimated_frames": {q: self.estimated_frames(q) for q in FRAME_RATES},
+            "frame": self.frame,
+            "off_frame": self.off_frame(),
+            "elapsed_s": round(self.elapsed_s, 3),
+            "steps": [asdict(step) for step in self.steps],
+        }
+
+
+def _describe(mob):
+    text = getattr(mob, "text", None) or getattr(mob, "tex_string", None)
+    if isinstance(text, str) and text:
+        return f"{type(mob).__name__}({text[:30]!r})"
+    return type(mob).__name__
+
+
+def _frame_bounds(camera):
+    center = camera.frame_center
+    half_w, half_h = camera.frame_width / 2, camera.frame_height / 2
+    return [center[0] - half_w, center[1] - half_h, center[0] + half_w, center[1] + half_h]
+
+
+def _boxes(scene, frame):
+    boxes = []
+    for mob in scene.mobjects:
+        if len(mob.get_all_points()) == 0:
+            continue
+        bbox = [float(mob.get_left()[0]), float(mob.get_bottom()[1]),
+                float(mob.get_right()[0]), float(mob.get_top()[1])]
+        off_frame = (bbox[0] < frame[0] - OFF_FRAME_TOLERANCE
+                     or bbox[1] < frame[1] - OFF_FRAME_TOLERANCE
+                     or bbox[2] > frame[2] + OFF_FRAME_TOLERANCE
+                     or bbox[3] > frame[3] + OFF_FRAME_TOLERANCE)
+        boxes.append(MobjectBox(_describe(mob), [round(v, 3) for v in bbox], off_frame))
+    return boxes
+
+
+def caller_line(path):
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_code.co_filename == path:
+            return frame.f_lineno
+        frame = frame.f_back
+    return None
+
+
+def dry_run_file(path, scene_name):
+    """Execute `scene_name` from `path` with animations skipped and return its timeline"""
+    from manim import Wait, tempconfig
+
+    scene_cls = load_scene_class(path, scene_name)
+    report = TimelineReport(scene_name)
+
+    class DryRunScene(scene_cls):
+        def play(self, *args, **kwargs):
+            line = caller_line(path)
+            start = self.renderer.time
+            super().play(*args, **kwargs)
+            played = self.animations or []
+            frame = _frame_bounds(self.camera)
+            report.steps.append(TimelineStep(
+                index=len(report.steps),
+                kind="wait" if played and all(isinstance(a, Wait) for a in played) else "play",
+                line=line,
+                start=round(start, 3),
+                run_time=round(self.renderer.time - start, 3),
+                animations=[type(a).__name__ for a in played],
+                mobject_count=len(self.mobjects),
+                family_count=len(self.get_mobject_family_members()),
+                boxes=_boxes(self, frame),
+            ))
+
+    started = time.perf_counter()
+    with tempconfig(no_output_config(path)):
+        scene = DryRunScene(skip_animations=True, random_seed=RANDOM_SEED)
+        scene.render()
+        report.frame = [round(v, 3) for v in _frame_bounds(scene.camera)]
+    report.elapsed_s = time.perf_counter() - started
+    return report
+
+
+def dry_run(code, scene_name=None):
+    """Dry-run generated code; see dry_run_file"""
+    scene_name = scene_name or find_scene_class(code)
+    if scene_name is None:
+        raise ValueError("No Scene subclass found in generated code")
+    return dry_run_file(write_scene_file(code), scene_name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Execute a scene without rendering and report its timeline")
+    parser.add_argument("file")
+    parser.add_argument("scene", nargs="?")
+    parser.add_argument("--max-duration", type=float, default=None,
+                        help="Fail if the video would be longer than this many seconds")
+    parser.add_argument("--allow-off-frame", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        report = dry_run(f.read(), args.scene)
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(f"{report.scene_name}: {report.total_duration:.1f}s of video, "
+              f"{report.animation_count} animations, "
+              f"{len(report.steps) - report.animation_count} waits, "
+              f"peak {report.peak_mobject_count} mobjects "
+              f"(dry run took {report.elapsed_s:.1f}s)")
+        print("estimated frames: " + ", ".join(
+            f"{q} {report.estimated_frames(q)}" for q in FRAME_RATES))
+        for index, line, name in report.off_frame():
+            print(f"  off-frame after step {index} (line {line}): {name}")
+
+    failed = False
+    if args.max_duration is not None and report.total_duration > args.max_duration:
+        print(f"too long: {report.total_duration:.1f}s > {args.max_duration:.1f}s")
+        failed = True
+    if report.off_frame() and not args.allow_off_frame:
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
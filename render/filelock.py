@@ -0,0 +1,73 @@
+"""Advisory inter-process file locks (fcntl on POSIX, msvcrt on Windows)"""
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class LockTimeout(TimeoutError):
+    pass
+
+
+class FileLock:
+    """Lock a sidecar file so cooperating processes serialize a critical section
+
+    `shared=True` takes a reader lock where the platform supports it (POSIX);
+    on Windows every lock is exclusive. `timeout=0` tries once and raises
+    LockTimeout if the lock is held, None waits forever.
+    """
+
+    def __init__(self, path, shared=False, timeout=None, poll_interval=0.05):
+        self.path = path
+        self.shared = shared
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._fd = None
+
+    def _try_lock(self, fd):
+        try:
+            if fcntl is not None:
+                mode = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+                fcntl.flock(fd, mode | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    def acquire(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while not self._try_lock(fd):
+            if deadline is not None and time.monotonic() >= deadline:
+                os.close(fd)
+                raise LockTimeout(f"could not lock {self.path}")
+            time.sleep(self.poll_interval)
+        self._fd = fd
+        return self
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -0,0 +1,321 @@
+"""Persistent cross-run cache of Text/MathTex outlines shared by all render workers
+
+Manim already keeps the SVG for each string on disk (text_dir/tex_dir), but
+every process parses that SVG and builds the glyph outlines again, and its
+in-memory SVG cache dies with the process. Once installed, this module
+stores the parsed outlines as .npz files keyed on the mobject's hash seed
+(class, SVG options, renderer and the SVG file name, which manim derives
+from the content, font, size, style and TeX template). It also points
+text_dir/tex_dir at one shared location, so pango and LaTeX are skipped too.
+
+Entries are written atomically (temp file + rename) so concurrent workers
+never see partial files. Eviction is mtime-LRU under a size bound, runs
+under an exclusive file lock and skips files younger than a grace period.
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import sys
+import time
+
+from render.filelock import FileLock, LockTimeout
+from render.pool import ROOT_DIR
+
+DEFAULT_CACHE_DIR = os.path.join(ROOT_DIR, ".cache", "glyphs")
+CACHE_VERSION = 1
+WARM_CLASSES = {"Text", "MarkupText", "MathTex", "Tex"}
+
+
+def shared_dirs(cache_dir=DEFAULT_CACHE_DIR):
+    """tempconfig options that share pango/LaTeX output across media dirs"""
+    return {
+        "text_dir": os.path.join(cache_dir, "texts"),
+        "tex_dir": os.path.join(cache_dir, "Tex"),
+    }
+
+
+def glyph_key(mob):
+    """Content key for an SVG-backed text mobject, independent of the media dir"""
+    import manim
+
+    seed = [os.path.basename(str(part)) if part is mob.file_name else part
+            for part in mob.hash_seed]
+    payload = json.dumps([CACHE_VERSION, manim.__version__, seed],
+                         sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class GlyphCache:
+    """Directory of .npz outline files with mtime-LRU eviction"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=512 * 1024 * 1024,
+                 min_age=600, prune_interval=64, touch_interval=3600):
+        self.cache_dir = cache_dir
+        self.outline_dir = os.path.join(cache_dir, "outlines")
+        self.lock_path = os.path.join(cache_dir, ".lock")
+        self.max_bytes = max_bytes
+        self.min_age = min_age
+        self.prune_interval = prune_interval
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._stores = 0
+
+    def _path(self, key):
+        return os.path.join(self.outline_dir, key[:2], f"{key}.npz")
+
+    def load(self, key):
+        """Return a list of VMobjects for `key`, or None on a miss"""
+        import numpy as np
+        from manim import VMobject
+
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        now = time.time()
+        try:
+            if now - os.path.getmtime(path) > self.touch_interval:
+                os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+
+        mobjects = []
+        bounds = {name: np.concatenate([[0], np.cumsum(arrays[f"{name}_counts"])])
+                  for name in ("points", "fill", "stroke", "background")}
+        for i in range(len(arrays["stroke_widths"])):
+            mob = VMobject()
+            mob.set_points(arrays["points"][bounds["points"][i]:bounds["points"][i + 1]])
+            mob.fill_rgbas = arrays["fill"][bounds["fill"][i]:bounds["fill"][i + 1]]
+            mob.stroke_rgbas = arrays["stroke"][bounds["stroke"][i]:bounds["stroke"][i + 1]]
+            mob.background_stroke_rgbas = arrays["background"][
+                bounds["background"][i]:bounds["background"][i + 1]]
+            mob.stroke_width = float(arrays["stroke_widths"][i])
+            mob.background_stroke_width = float(arrays["background_stroke_widths"][i])
+            mobjects.append(mob)
+        return mobjects
+
+    def store(self, key, mobjects):
+        """Atomically write the outlines of `mobjects` under `key`"""
+        import numpy as np
+
+        def stacked(attr):
+            parts = [np.asarray(getattr(mob, attr)).reshape(-1, 4) for mob in mobjects]
+            counts = [len(part) for part in parts]
+            return (np.concatenate(parts) if parts else np.zeros((0, 4))), counts
+
+        fill, fill_counts = stacked("fill_rgbas")
+        stroke, stroke_counts = stacked("stroke_rgbas")
+        background, background_counts = stacked("background_stroke_rgbas")
+        arrays = {
+            "points": (np.concatenate([mob.points for mob in mobjects])
+                       if mobjects else np.zeros((0, 3))),
+            "points_counts": [len(mob.points) for mob in mobjects],
+            "fill": fill, "fill_counts": fill_counts,
+            "stroke": stroke, "stroke_counts": stroke_counts,
+            "background": background, "background_counts": background_counts,
+            "stroke_widths": [float(mob.stroke_width) for mob in mobjects],
+            "background_stroke_widths": [float(mob.background_stroke_width)
+                                         for mob in mobjects],
+        }
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **{name: np.asarray(value) for name, value in arrays.items()})
+        os.replace(tmp_path, path)
+
+        self._stores += 1
+        if self.prune_interval and self._stores % self.prune_interval == 0:
+            self.prune(wait=False)
+
+    def _entries(self):
+        entries = []
+        for directory in (self.outline_dir, *shared_dirs(self.cache_dir).values()):
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def prune(self, max_bytes=None, wait=True):
+        """Delete least recently used files until the cache fits in `max_bytes`
+
+        Returns the number of files removed. With wait=False another
+        process already pruning is left to it.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        try:
+            lock = FileLock(self.lock_path, timeout=None if wait else 0).acquire()
+        except LockTimeout:
+            return 0
+        removed = 0
+        try:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            cutoff = time.time() - self.min_age
+            for mtime, size, path in entries:
+                if total <= max_bytes:
+                    break
+                if mtime > cutoff:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+        finally:
+            lock.release()
+        self.evictions += removed
+        return removed
+
+    def stats(self):
+        entries = self._entries()
+        outlines = [e for e in entries if e[2].endswith(".npz")]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "outlines": len(outlines),
+            "files": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
+
+    def clear(self):
+        with FileLock(self.lock_path):
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+_installed = None
+
+
+def install(cache=None):
+    """Route SVGMobject outline generation for text through the cache
+
+    Idempotent; returns the active GlyphCache. Only Text, MarkupText and
+    (Single)MathTex/Tex are cached, because for those the SVG file name is a
+    content hash. Other SVGMobjects keep manim's behaviour.
+    """
+    global _installed
+    if _installed is not None:
+        return _installed
+    from manim import MarkupText, SingleStringMathTex, SVGMobject, Text
+    from manim.mobject.svg.svg_mobject import SVG_HASH_TO_MOB_MAP
+    from manim.utils.hashing import hash_obj
+
+    cache = cache or GlyphCache()
+    original = SVGMobject.init_svg_mobject
+    cached_types = (Text, MarkupText, SingleStringMathTex)
+
+    def init_svg_mobject(self, use_svg_cache):
+        if not (use_svg_cache and isinstance(self, cached_types) and self.file_name):
+            return original(self, use_svg_cache)
+        hash_val = hash_obj(self.hash_seed)
+        if hash_val in SVG_HASH_TO_MOB_MAP:
+            return original(self, use_svg_cache)
+        key = glyph_key(self)
+        mobjects = cache.load(key)
+        if mobjects is None:
+            original(self, use_svg_cache)
+            cache.store(key, self.submobjects)
+            return
+        self.add(*mobjects)
+        SVG_HASH_TO_MOB_MAP[hash_val] = self.copy()
+
+    SVGMobject.init_svg_mobject = init_svg_mobject
+    _installed = cache
+    return cache
+
+
+def literal_text_calls(code):
+    """(class name, args, kwargs) for every Text/MathTex call with literal arguments"""
+    calls = []
+    for node in ast.walk(ast.parse(code)):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id in WARM_CLASSES):
+            continue
+        try:
+            args = [ast.literal_eval(arg) for arg in node.args]
+            kwargs = {kw.arg: ast.literal_eval(kw.value) for kw in node.keywords
+                      if kw.arg is not None}
+        except ValueError:
+            continue
+        if len(kwargs) == len(node.keywords):
+            calls.append((node.func.id, args, kwargs))
+    return calls
+
+
+def warm(paths, cache=None):
+    """Build every literal Text/MathTex in `paths` once so later renders hit the cache
+
+    Calls whose arguments are not literals (colors given as manim constants,
+    f-strings, variables) cannot be reproduced statically and are skipped.
+    Returns (built, failed) counts.
+    """
+    import manim
+    from manim import tempconfig
+
+    cache = install(cache)
+    built = failed = 0
+    seen = set()
+    with tempconfig({**shared_dirs(cache.cache_dir), "verbosity": "ERROR"}):
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                calls = literal_text_calls(f.read())
+            for name, args, kwargs in calls:
+                signature = repr((name, args, sorted(kwargs.items())))
+                if signature in seen:
+                    continue
+                seen.add(signature)
+                try:
+                    getattr(manim, name)(*args, **kwargs)
+                    built += 1
+                except Exception as e:
+                    print(f"  {path}: {name}{tuple(args)} failed: {e}", file=sys.stderr)
+                    failed += 1
+    return built, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the shared Text/MathTex glyph cache")
+    parser.add_argument("command", choices=["warm", "stats", "prune", "clear"])
+    parser.add_argument("files", nargs="*", help="scene files to scan (warm)")
+    parser.add_argument("--dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--max-mb", type=float, default=None,
+                        help="size bound for prune (default: the cache's own bound)")
+    args = parser.parse_args(argv)
+
+    cache = GlyphCache(args.dir)
+    if args.command == "warm":
+        start = time.perf_counter()
+        built, failed = warm(args.files, cache)
+        print(f"warmed {built} text mobjects ({failed} failed) "
+              f"in {time.perf_counter() - start:.1f}s")
+    elif args.command == "prune":
+        max_bytes = None if args.max_mb is None else int(args.max_mb * 1024 * 1024)
+        print(f"removed {cache.prune(max_bytes)} files")
+    elif args.command == "clear":
+        cache.clear()
+    print(json.dumps(cache.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""Incremental re-rendering: only redo the sections a regeneration changed
+
+Every segment gets a fingerprint built from
+  * the AST of its own statements (comments and formatting do not count),
+  * the rest of the module (imports, constants, helper methods), and
+  * a digest of the scene state it starts from: the mobjects on screen,
+    construct()'s local variables and the camera, captured by replaying the
+    scene with animations skipped.
+Rendered segments are kept in a store keyed by fingerprint, so editing the
+text of one section only re-renders that section. The store is pruned by
+last use (see prune_store) after every render that added to it.
+"""
+import argparse
+import ast
+import copy
+import hashlib
+import os
+import shutil
+import sys
+import time
+from dataclasses import dataclass, field
+
+from render.filelock import FileLock, LockTimeout
+from render.pool import (DEFAULT_MEDIA_DIR, RANDOM_SEED, RenderPool, find_scene_class,
+                         load_scene_class, no_output_config, write_scene_file)
+from render.segments import (concat_videos, construct_node, insert_section_markers,
+                             is_next_section)
+
+DEFAULT_STORE_DIR = os.path.join(DEFAULT_MEDIA_DIR, "segment_store")
+DEFAULT_STORE_MAX_BYTES = 2 * 1024 ** 3
+DEFAULT_STORE_MAX_AGE = 30 * 24 * 3600
+EMPTY_STATE = "empty"
+
+
+def _split_construct(tree, scene_name):
+    sections = [[]]
+    for stmt in construct_node(tree, scene_name).body:
+        if is_next_section(stmt):
+            sections.append([])
+        sections[-1].append(stmt)
+    return sections
+
+
+def split_sections(code, scene_name):
+    """Return (context_dump, [section_dump, ...]) for the scene's construct()"""
+    tree = ast.parse(code)
+    sections = _split_construct(tree, scene_name)
+    context = copy.deepcopy(tree)
+    construct_node(context, scene_name).body = [ast.Pass()]
+    return ast.dump(context), [ast.dump(ast.Module(body=stmts, type_ignores=[]))
+                               for stmts in sections]
+
+
+def section_read_names(code, scene_name):
+    """Names each section reads, i.e. the locals its output can depend on"""
+    names = []
+    for stmts in _split_construct(ast.parse(code), scene_name):
+        names.append(sorted({
+            node.id
+            for stmt in stmts
+            for node in ast.walk(stmt)
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)
+        }))
+    return names
+
+
+def _update_with_mobject(h, mob):
+    import numpy as np
+
+    for member in mob.get_family():
+        h.update(type(member).__name__.encode())
+        h.update(np.round(member.points, 6).tobytes())
+        for attr in ("fill_rgbas", "stroke_rgbas", "background_stroke_rgbas"):
+            value = getattr(member, attr, None)
+            if value is not None:
+                h.update(np.round(value, 6).tobytes())
+        h.update(repr((getattr(member, "stroke_width", None), member.z_index,
+                       len(member.updaters))).encode())
+
+
+def _update_with_value(h, value, depth=0):
+    import numpy as np
+    from manim import Mobject
+
+    if isinstance(value, Mobject):
+        _update_with_mobject(h, value)
+    elif isinstance(value, np.ndarray):
+        h.update(np.round(value, 6).tobytes() if value.dtype.kind == "f" else value.tobytes())
+    elif isinstance(value, (list, tuple)) and depth < 3:
+        h.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _update_with_value(h, item, depth + 1)
+    elif isinstance(value, (int, float, str, bool, type(None))):
+        h.update(repr(value).encode())
+    elif type(value).__repr__ is not object.__repr__ and not callable(value):
+        h.update(repr(value).encode())
+    else:
+        h.update(type(value).__qualname__.encode())
+
+
+def scene_state_digest(scene, local_vars, read_names):
+    """Digest of what a section can observe when it starts
+
+    Covers the mobjects on screen, the camera and those construct() locals
+    the section actually reads, so unrelated edits upstream do not
+    invalidate it.
+    """
+    h = hashlib.sha256()
+    for mob in scene.mobjects:
+        _update_with_mobject(h, mob)
+    h.update(repr(scene.camera.background_color).encode())
+    frame = getattr(scene.camera, "frame", None)
+    if frame is not None:
+        _update_with_mobject(h, frame)
+    for name in read_names:
+        if name != "self" and name in local_vars:
+            h.update(name.encode())
+            _update_with_value(h, local_vars[name])
+    return h.hexdigest()
+
+
+def probe_section_states(path, scene_name, read_names):
+    """Replay the scene with animations skipped and digest the state at each section start"""
+    from manim import tempconfig
+
+    scene_cls = load_scene_class(path, scene_name)
+    digests = [EMPTY_STATE]
+
+    class ProbeScene(scene_cls):
+        def next_section(self, *args, **kwargs):
+            names = read_names[len(digests)] if len(digests) < len(read_names) else []
+            digests.append(scene_state_digest(self, sys._getframe(1).f_locals, names))
+            super().next_section(*args, **kwargs)
+
+    with tempconfig(no_output_config(path)):
+        ProbeScene(skip_animations=True, random_seed=RANDOM_SEED).render()
+    return digests
+
+
+def segment_fingerprints(code, scene_name, states, quality):
+    context, sections = split_sections(code, scene_name)
+    if len(sections) != len(states):
+        raise ValueError(
+            f"{len(sections)} sections in source but {len(states)} reached at runtime; "
+            "next_section calls must be at the top level of construct()")
+    fingerprints = []
+    for section, state in zip(sections, states):
+        h = hashlib.sha256()
+        for part in (quality, context, section, state):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        fingerprints.append(h.hexdigest()[:24])
+    return fingerprints
+
+
+@dataclass
+class IncrementalResult:
+    output_path: str
+    reused: list = field(default_factory=list)
+    rendered: list = field(default_factory=list)
+    states: list = field(default_factory=list)
+
+
+def _store(store_dir, fingerprint, video_path):
+    if video_path is None:
+        open(os.path.join(store_dir, f"{fingerprint}.empty"), "w").close()
+        return None
+    target = os.path.join(store_dir, f"{fingerprint}.mp4")
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    shutil.copyfile(video_path, tmp_path)
+    os.replace(tmp_path, target)
+    return target
+
+
+def _lookup(store_dir, fingerprint):
+    """Return (hit, stored_path); stored_path is None for empty segments"""
+    for name in (f"{fingerprint}.mp4", f"{fingerprint}.empty"):
+        path = os.path.join(store_dir, name)
+        try:
+            os.utime(path)  # mtime doubles as last use for prune_store
+        except OSError:
+            continue
+        return True, path if name.endswith(".mp4") else None
+    return False, None
+
+
+def prune_store(store_dir=DEFAULT_STORE_DIR, max_bytes=DEFAULT_STORE_MAX_BYTES,
+                max_age=DEFAULT_STORE_MAX_AGE, min_age=600, wait=True):
+    """Evict stored segments by last use; returns the number of files removed
+
+    Segments unused for `max_age` seconds go first, then the least recently
+    used until the store fits in `max_bytes`. Segments used in the last
+    `min_age` seconds are kept, so a render in another process never loses
+    a segment between lookup and concat.
+    """
+    try:
+        lock = FileLock(os.path.join(store_dir, ".lock"), timeout=None if wait else 0).acquire()
+    except LockTimeout:
+        return 0
+    removed = 0
+    try:
+        entries = []
+        for name in os.listdir(store_dir):
+            if not name.endswith((".mp4", ".empty")):
+                continue
+            path = os.path.join(store_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        now = time.time()
+        for mtime, size, path in entries:
+            expired = max_age is not None and now - mtime > max_age
+            if not expired and (max_bytes is None or total <= max_bytes):
+                continue
+            if now - mtime < min_age:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+    finally:
+        lock.release()
+    return removed
+
+
+def default_output_path(scene_name, fingerprints):
+    """Output path named after every segment, so versions never share a file"""
+    digest = hashlib.sha256("\0".join(fingerprints).encode("ascii")).hexdigest()[:16]
+    return os.path.join(DEFAULT_MEDIA_DIR, "videos", f"{scene_name}_{digest}.mp4")
+
+
+def render_incremental(code, scene_name=None, quality="low_quality", output_path=None,
+                       pool=None, store_dir=DEFAULT_STORE_DIR, states=None):
+    """Render `code`, reusing stored segments whose fingerprint is unchanged
+
+    Section states do not depend on quality, so `states` from an earlier
+    result for the same code can be passed to skip the probing replay.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    owns_pool = pool is None
+    if owns_pool:
+        pool = RenderPool(quality=quality)
+    try:
+        code = insert_section_markers(code, scene_name)
+        scene_name = scene_name or find_scene_class(code)
+        if scene_name is None:
+            raise ValueError("No Scene subclass found in generated code")
+        path = write_scene_file(code, pool.work_dir)
+        if states is None:
+            states = pool.run(probe_section_states, path, scene_name,
+                              section_read_names(code, scene_name)).result()
+        fingerprints = segment_fingerprints(code, scene_name, states, quality)
+
+        result = IncrementalResult(output_path, states=states)
+        videos = [None] * len(fingerprints)
+        jobs = {}
+        for i, fingerprint in enumerate(fingerprints):
+            hit, stored = _lookup(store_dir, fingerprint)
+            if hit:
+                videos[i] = stored
+                result.reused.append(i)
+            else:
+                jobs[i] = pool.submit_file(path, scene_name, quality, segment=i)
+                result.rendered.append(i)
+        for i, job in jobs.items():
+            videos[i] = _store(store_dir, fingerprints[i], job.result())
+    finally:
+        if owns_pool:
+            pool.shutdown()
+
+    videos = [video for video in videos if video]
+    if not videos:
+        raise RuntimeError(f"{scene_name} produced no animations")
+    result.output_path = output_path or default_output_path(scene_name, fingerprints)
+    os.makedirs(os.path.dirname(result.output_path), exist_ok=True)
+    concat_videos(videos, result.output_path)
+    if result.rendered:
+        prune_store(store_dir, wait=False)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Re-render only the sections that changed since the last render")
+    parser.add_argument("file")
+    parser.add_argument("scene", nargs="?")
+    parser.add_argument("-q", "--quality", default="low_quality")
+    parser.add_argument("-o", "--output", default=None)
+    parser.add_argument("--store", default=DEFAULT_STORE_DIR)
+    args = parser.parse_args(argv)
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        code = f.read()
+    start = time.perf_counter()
+    result = render_incremental(code, args.scene, args.quality, args.output,
+                                store_dir=args.store)
+    print(f"{result.output_path} ({time.perf_counter() - start:.1f}s)")
+    print(f"reused segments: {result.reused}")
+    print(f"rendered segments: {result.rendered}")
+
+
+if __name__ == "__main__":
+    main()
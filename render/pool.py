@@ -0,0 +1,309 @@
+"""Render generated Manim code in a bounded pool of worker processes"""
+import argparse
+import ast
+import hashlib
+import importlib.util
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_MEDIA_DIR = os.path.join(ROOT_DIR, "media")
+DEFAULT_WORK_DIR = os.path.join(DEFAULT_MEDIA_DIR, "generated")
+# Every scene is built with this seed, so code using random/numpy draws the same
+# values in each segment, probe, smoke run and preview of it, and across reruns
+RANDOM_SEED = 0
+# Camera used when a scene is only executed, not rendered (see no_output_config)
+SKIP_CONFIG = {"pixel_width": 32, "pixel_height": 18, "frame_rate": 5}
+# Manim's quality presets, worst to best
+QUALITY_ORDER = ("low_quality", "medium_quality", "high_quality", "production_quality",
+                 "fourk_quality")
+
+
+def quality_rank(quality):
+    """Position of `quality` in QUALITY_ORDER; -1 for unknown or missing"""
+    return QUALITY_ORDER.index(quality) if quality in QUALITY_ORDER else -1
+
+
+def find_scene_classes(code):
+    """Return the names of every Scene subclass defined in `code`, in order"""
+    names = []
+    for node in ast.parse(code).body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        for base in node.bases:
+            if isinstance(base, ast.Name):
+                base_name = base.id
+            elif isinstance(base, ast.Attribute):
+                base_name = base.attr
+            else:
+                continue
+            if base_name.endswith("Scene"):
+                names.append(node.name)
+                break
+    return names
+
+
+def find_scene_class(code):
+    """Return the name of the first Scene subclass defined in `code`"""
+    names = find_scene_classes(code)
+    return names[0] if names else None
+
+
+def write_scene_file(code, work_dir=DEFAULT_WORK_DIR):
+    """Write `code` to a content-addressed .py file and return its path"""
+    os.makedirs(work_dir, exist_ok=True)
+    digest = hashlib.sha256(code.encode("utf-8")).hexdigest()[:12]
+    path = os.path.join(work_dir, f"scene_{digest}.py")
+    if not os.path.exists(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(code)
+    return path
+
+
+def load_scene_class(path, scene_name):
+    """Import the file at `path` and return its `scene_name` class"""
+    module_name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, scene_name)
+
+
+def no_output_config(path):
+    """tempconfig options for executing a scene without writing any media
+
+    Even with skip_animations, Manim's Cairo renderer still draws a static
+    frame for every play (save_static_frame_data), so the camera is shrunk
+    to a thumbnail to make those frames nearly free.
+    """
+    return {
+        "input_file": path,
+        "write_to_movie": False,
+        "save_last_frame": False,
+        "disable_caching": True,
+        "progress_bar": "none",
+        "verbosity": "WARNING",
+        **SKIP_CONFIG,
+    }
+
+
+def segment_scene_class(scene_cls, segment):
+    """Subclass `scene_cls` so only section `segment` is rendered into the movie
+
+    Sections are delimited by `self.next_section(...)` calls; everything
+    before the first call is segment 0. Earlier sections still run with
+    animations skipped (one static frame per animation is drawn, none is
+    encoded), which reconstructs the starting state of the target segment,
+    and the scene ends as soon as the next one begins.
+    """
+    from manim.utils.exceptions import EndSceneEarlyException
+
+    class SegmentScene(scene_cls):
+        def setup(self):
+            super().setup()
+            self._segment_index = 0
+            self.renderer.file_writer.sections[-1].skip_animations = segment != 0
+
+        def next_section(self, name="unnamed", *args, **kwargs):
+            self._segment_index += 1
+            if self._segment_index > segment:
+                raise EndSceneEarlyException()
+            kwargs["skip_animations"] = self._segment_index != segment
+            super().next_section(name, *args, **kwargs)
+
+    SegmentScene.__name__ = scene_cls.__name__
+    SegmentScene.__qualname__ = scene_cls.__qualname__
+    return SegmentScene
+
+
+def render_scene_file(path, scene_name, quality="low_quality", media_dir=DEFAULT_MEDIA_DIR,
+                      segment=None, profile_path=None):
+    """Render one scene in the current process and return the video path
+
+    With `segment` set, only that section is rendered (see
+    segment_scene_class) and None is returned if it has no animations.
+    With `profile_path` set, a per-animation profile (see render.profiler)
+    is written there as JSON.
+    """
+    from manim import tempconfig
+
+    from render.glyph_cache import install, shared_dirs
+
+    glyph_cache = install()
+    scene_cls = load_scene_class(path, scene_name)
+    options = {
+        "quality": quality,
+        "media_dir": media_dir,
+        "input_file": path,
+        "progress_bar": "none",
+        "verbosity": "WARNING",
+        **shared_dirs(glyph_cache.cache_dir),
+    }
+    if segment is not None:
+        scene_cls = segment_scene_class(scene_cls, segment)
+        segment_name = f"{scene_name}_segment{segment:02d}"
+        options["output_file"] = segment_name
+        # Parallel segments of one scene must not share a partial movie list
+        options["partial_movie_dir"] = "{video_dir}/partial_movie_files/" + segment_name
+    report = None
+    if profile_path is not None:
+        from render.profiler import ProfileReport, profiled_scene_class
+
+        report = ProfileReport(scene_name, quality)
+        scene_cls = profiled_scene_class(scene_cls, report, path)
+    start = time.perf_counter()
+    with tempconfig(options):
+        scene = scene_cls(random_seed=RANDOM_SEED)
+        movie_path = scene.renderer.file_writer.movie_file_path
+        if segment is not None and movie_path and os.path.exists(movie_path):
+            os.remove(movie_path)
+        scene.render()
+        movie_path = scene.renderer.file_writer.movie_file_path
+    if segment is not None and not (movie_path and os.path.exists(movie_path)):
+        movie_path = None
+    movie_path = str(movie_path) if movie_path else None
+    if report is not None:
+        report.total_ms = (time.perf_counter() - start) * 1000
+        report.video_path = movie_path
+        report.write(profile_path)
+    return movie_path
+
+
+def _lower_priority(increment):
+    """Worker initializer: yield the CPU to foreground renders (POSIX only)"""
+    if hasattr(os, "nice"):
+        os.nice(increment)
+
+
+@dataclass
+class RenderJob:
+    job_id: str
+    scene_name: str
+    source_path: str
+    quality: str
+    future: object = field(repr=False)
+    submitted_at: float = field(default_factory=time.time)
+
+    @property
+    def status(self):
+        if self.future.cancelled():
+            return "cancelled"
+        if self.future.done():
+            return "failed" if self.future.exception() else "done"
+        if self.future.running():
+            return "running"
+        return "queued"
+
+    @property
+    def error(self):
+        if self.future.done() and not self.future.cancelled():
+            exc = self.future.exception()
+            return f"{type(exc).__name__}: {exc}" if exc else None
+        return None
+
+    @property
+    def video_path(self):
+        if self.status == "done":
+            return self.future.result()
+        return None
+
+    def result(self, timeout=None):
+        """Block until the render finishes and return the video path"""
+        return self.future.result(timeout=timeout)
+
+
+class RenderPool:
+    """Bounded ProcessPoolExecutor of manim render workers
+
+    `nice` > 0 starts the workers at a lower scheduling priority, for
+    background work that should not slow down interactive renders.
+    """
+
+    def __init__(self, max_workers=None, quality="low_quality",
+                 media_dir=DEFAULT_MEDIA_DIR, work_dir=DEFAULT_WORK_DIR, nice=0):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.quality = quality
+        self.media_dir = media_dir
+        self.work_dir = work_dir
+        self.nice = nice
+        self.jobs = {}
+        if nice:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=_lower_priority, initargs=(nice,))
+        else:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def submit(self, code, scene_name=None, quality=None, profile_path=None):
+        """Queue extracted code for rendering and return its RenderJob"""
+        scene_name = scene_name or find_scene_class(code)
+        if scene_name is None:
+            raise ValueError("No Scene subclass found in generated code")
+        path = write_scene_file(code, self.work_dir)
+        return self.submit_file(path, scene_name, quality, profile_path=profile_path)
+
+    def submit_file(self, path, scene_name, quality=None, segment=None, profile_path=None):
+        """Queue an existing scene file (or one of its segments) for rendering"""
+        quality = quality or self.quality
+        future = self._executor.submit(
+            render_scene_file, path, scene_name, quality, self.media_dir, segment,
+            profile_path)
+        job_id = f"{os.path.splitext(os.path.basename(path))[0]}:{scene_name}:{quality}"
+        if segment is not None:
+            job_id += f":{segment}"
+        job = RenderJob(job_id, scene_name, path, quality, future)
+        self.jobs[job_id] = job
+        return job
+
+    def run(self, fn, *args):
+        """Run any picklable top-level function on a worker; returns a Future"""
+        return self._executor.submit(fn, *args)
+
+    def status(self):
+        """Return {job_id: status} for every submitted job"""
+        return {job_id: job.status for job_id, job in self.jobs.items()}
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render generated Manim files in parallel")
+    parser.add_argument("files", nargs="+",
+                        help="Python files or extracted code (e.g. response.txt)")
+    parser.add_argument("-q", "--quality", default="low_quality")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with RenderPool(max_workers=args.workers, quality=args.quality) as pool:
+        jobs = []
+        for file_path in args.files:
+            with open(file_path, "r", encoding="utf-8") as f:
+                jobs.append(pool.submit(f.read()))
+        while any(job.status in ("queued", "running") for job in jobs):
+            counts = {}
+            for status in pool.status().values():
+                counts[status] = counts.get(status, 0) + 1
+            print(", ".join(f"{k}: {v}" for k, v in sorted(counts.items())))
+            time.sleep(2)
+        failed = 0
+        for job in jobs:
+            if job.status == "done":
+                print(f"{job.job_id} -> {job.video_path}")
+            else:
+                failed += 1
+                print(f"{job.job_id} {job.status}: {job.error}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
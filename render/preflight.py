@@ -0,0 +1,267 @@
+"""Static pre-flight checks for generated Manim code, run before it takes a render worker"""
+import argparse
+import ast
+import builtins
+import difflib
+import functools
+import inspect
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+
+from render.pool import find_scene_class
+
+ASSET_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".svg", ".wav", ".mp3",
+                    ".ogg", ".mp4", ".mov", ".ttf", ".otf")
+ASSET_CALLS = {"ImageMobject", "SVGMobject", "open", "add_sound"}
+
+
+@dataclass
+class Diagnostic:
+    severity: str
+    code: str
+    message: str
+    line: int = None
+    col: int = None
+
+    def __str__(self):
+        location = f"{self.line}:{self.col}" if self.line is not None else "-"
+        return f"{location} {self.severity} {self.code} {self.message}"
+
+
+@dataclass
+class PreflightReport:
+    diagnostics: list = field(default_factory=list)
+    scene_name: str = None
+    elapsed_ms: float = 0.0
+
+    @property
+    def errors(self):
+        return [d for d in self.diagnostics if d.severity == "error"]
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def summary(self):
+        return "\n".join(str(d) for d in self.diagnostics) or "ok"
+
+    def to_dict(self):
+        return {
+            "ok": self.ok,
+            "scene_name": self.scene_name,
+            "elapsed_ms": round(self.elapsed_ms, 2),
+            "diagnostics": [asdict(d) for d in self.diagnostics],
+        }
+
+
+class PreflightError(ValueError):
+    def __init__(self, report):
+        super().__init__(report.summary())
+        self.report = report
+
+
+@functools.lru_cache(maxsize=None)
+def manim_namespace():
+    """Names brought in by `from manim import *`, or None if manim is unavailable"""
+    try:
+        import manim
+    except ImportError:
+        return None
+    names = getattr(manim, "__all__", None) or [n for n in dir(manim) if not n.startswith("_")]
+    return {name: getattr(manim, name) for name in names if hasattr(manim, name)}
+
+
+@functools.lru_cache(maxsize=None)
+def accepted_kwargs(cls):
+    """Return (names, severity) for `cls(...)`, or None if any kwarg is accepted
+
+    Walks the constructor chain while each __init__ forwards **kwargs.
+    Reaching an __init__ without **kwargs means unknown keywords raise a
+    TypeError; Animation swallows leftovers, so those are only ignored.
+    """
+    names = set()
+    for klass in cls.__mro__:
+        init = klass.__dict__.get("__init__")
+        if init is None:
+            continue
+        try:
+            params = inspect.signature(init).parameters.values()
+        except (TypeError, ValueError):
+            return None
+        names.update(p.name for p in params
+                     if p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY))
+        if not any(p.kind == p.VAR_KEYWORD for p in params):
+            return frozenset(names), "error"
+        if klass.__name__ == "Animation" and klass.__module__.startswith("manim."):
+            return frozenset(names), "warning"
+    return None
+
+
+def _bound_names(tree):
+    bound = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            bound.add(node.id)
+        elif isinstance(node, ast.arg):
+            bound.add(node.arg)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            bound.add(node.name)
+        elif isinstance(node, ast.alias):
+            bound.add((node.asname or node.name).split(".")[0])
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            bound.add(node.name)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            bound.update(node.names)
+        elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+            bound.add(node.name)
+    return bound
+
+
+def _star_imports(tree):
+    return {node.module for node in ast.walk(tree)
+            if isinstance(node, ast.ImportFrom)
+            and any(alias.name == "*" for alias in node.names)}
+
+
+def _scene_base(tree, scene_name):
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == scene_name:
+            for base in node.bases:
+                if isinstance(base, ast.Name):
+                    return base.id
+                if isinstance(base, ast.Attribute):
+                    return base.attr
+    return None
+
+
+def _suggest(name, candidates):
+    matches = difflib.get_close_matches(name, candidates, n=1)
+    return f" (did you mean {matches[0]!r}?)" if matches else ""
+
+
+def _check_names(tree, namespace, diagnostics):
+    known = _bound_names(tree) | set(dir(builtins)) | set(namespace)
+    reported = set()
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)
+                and node.id not in known and node.id not in reported):
+            reported.add(node.id)
+            diagnostics.append(Diagnostic(
+                "error", "E003",
+                f"undefined name {node.id!r}{_suggest(node.id, namespace)}",
+                node.lineno, node.col_offset))
+
+
+def _check_kwargs(tree, namespace, diagnostics):
+    local = _bound_names(tree)
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)):
+            continue
+        name = node.func.id
+        cls = namespace.get(name)
+        if name in local or not inspect.isclass(cls):
+            continue
+        accepted = accepted_kwargs(cls)
+        if accepted is None:
+            continue
+        names, severity = accepted
+        for keyword in node.keywords:
+            if keyword.arg is not None and keyword.arg not in names:
+                effect = "is not accepted" if severity == "error" else "is ignored"
+                diagnostics.append(Diagnostic(
+                    severity, "E004" if severity == "error" else "W004",
+                    f"{name}() keyword {keyword.arg!r} {effect}"
+                    f"{_suggest(keyword.arg, names)}",
+                    keyword.lineno, keyword.col_offset))
+
+
+def _check_assets(tree, diagnostics):
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            func = node.func
+            name = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+            if name in ASSET_CALLS:
+                diagnostics.append(Diagnostic(
+                    "warning", "W005", f"{name}() loads an external asset",
+                    node.lineno, node.col_offset))
+        elif (isinstance(node, ast.Constant) and isinstance(node.value, str)
+                and node.value.lower().endswith(ASSET_EXTENSIONS)):
+            diagnostics.append(Diagnostic(
+                "warning", "W005", f"references external file {node.value!r}",
+                node.lineno, node.col_offset))
+
+
+def _check_camera_frame(tree, scene_name, diagnostics):
+    base = _scene_base(tree, scene_name) or ""
+    if "MovingCamera" in base or "Zoomed" in base:
+        return
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Attribute) and node.attr == "frame"
+                and isinstance(node.value, ast.Attribute) and node.value.attr == "camera"):
+            diagnostics.append(Diagnostic(
+                "error", "E006",
+                f"self.camera.frame requires MovingCameraScene, but {scene_name} "
+                f"extends {base or 'an unknown base'}",
+                node.lineno, node.col_offset))
+            return
+
+
+def preflight(code, require_scene=True):
+    """Statically check generated code and return a PreflightReport"""
+    start = time.perf_counter()
+    report = PreflightReport()
+    diagnostics = report.diagnostics
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        diagnostics.append(Diagnostic("error", "E001", f"syntax error: {e.msg}",
+                                      e.lineno, e.offset))
+        report.elapsed_ms = (time.perf_counter() - start) * 1000
+        return report
+
+    report.scene_name = find_scene_class(code)
+    if report.scene_name is None and require_scene:
+        diagnostics.append(Diagnostic("error", "E002", "no Scene subclass defined"))
+    if report.scene_name is not None:
+        _check_camera_frame(tree, report.scene_name, diagnostics)
+
+    namespace = manim_namespace()
+    if namespace is None:
+        diagnostics.append(Diagnostic(
+            "warning", "W000", "manim is not importable; name and keyword checks skipped"))
+    else:
+        star_imports = _star_imports(tree)
+        if star_imports <= {"manim"}:
+            _check_names(tree, namespace if "manim" in star_imports else {}, diagnostics)
+        _check_kwargs(tree, namespace, diagnostics)
+    _check_assets(tree, diagnostics)
+
+    diagnostics.sort(key=lambda d: (d.line or 0, d.col or 0))
+    report.elapsed_ms = (time.perf_counter() - start) * 1000
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-flight check generated Manim code")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as f:
+            report = preflight(f.read())
+        failed = failed or not report.ok
+        if args.json:
+            print(json.dumps({"file": path, **report.to_dict()}, indent=2))
+        else:
+            print(f"{path}: {'ok' if report.ok else 'FAILED'} ({report.elapsed_ms:.1f} ms)")
+            for diagnostic in report.diagnostics:
+                print(f"  {diagnostic}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""Keyframe contact sheet: review a lesson from one PNG instead of a video
+
+The scene runs like a dry run (every animation jumps to its end state, no
+movie is written), but after each `self.play` the end state is rasterized
+at thumbnail size, optionally together with the state halfway through the
+animation. The frames are tiled into a contact sheet captioned with the
+step index, the timestamp in the final video, the source line and the
+animations played. Rendering a few dozen thumbnails costs a tiny fraction
+of the full render.
+
+    python -m render.preview response.txt -o review.png --midpoints
+"""
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+
+from render.dryrun import caller_line
+from render.pool import (DEFAULT_MEDIA_DIR, RANDOM_SEED, find_scene_class, load_scene_class,
+                         no_output_config, write_scene_file)
+
+DEFAULT_PREVIEW_DIR = os.path.join(DEFAULT_MEDIA_DIR, "previews")
+CAPTION_HEIGHT = 30
+HEADER_HEIGHT = 28
+PADDING = 6
+BACKGROUND = (24, 24, 24)
+TEXT_COLOR = (235, 235, 235)
+DIM_TEXT_COLOR = (150, 150, 150)
+
+
+@dataclass
+class PreviewFrame:
+    step: int
+    kind: str  # "end" or "mid"
+    time: float
+    line: int
+    animations: list
+    image: object = field(default=None, repr=False)
+
+
+def format_timestamp(seconds):
+    minutes, seconds = divmod(seconds, 60)
+    return f"{int(minutes)}:{seconds:04.1f}"
+
+
+def _snapshot(scene):
+    """Rasterize the scene's current state, skipping the renderer's static-frame cache"""
+    from manim.utils.iterables import list_update
+
+    camera = scene.renderer.camera
+    camera.reset()
+    camera.capture_mobjects(list_update(scene.mobjects, scene.foreground_mobjects))
+    return camera.get_image().convert("RGB")
+
+
+def capture_keyframes(path, scene_name, midpoints=False, width=320, height=180):
+    """Run `scene_name` from `path` and return a PreviewFrame per keyframe"""
+    from manim import Wait, tempconfig
+
+    from render.glyph_cache import install, shared_dirs
+
+    glyph_cache = install()
+    scene_cls = load_scene_class(path, scene_name)
+    frames = []
+
+    class PreviewScene(scene_cls):
+        def play(self, *args, **kwargs):
+            line = caller_line(path)
+            start = self.renderer.time
+            self._preview_mid = None
+            super().play(*args, **kwargs)
+            played = self.animations or []
+            if not played or all(isinstance(a, Wait) for a in played):
+                return
+            step = len({frame.step for frame in frames})
+            names = [type(a).__name__ for a in played]
+            if self._preview_mid is not None:
+                mid_time = start + (self.renderer.time - start) / 2
+                frames.append(PreviewFrame(step, "mid", round(mid_time, 2), line, names,
+                                           self._preview_mid))
+            frames.append(PreviewFrame(step, "end", round(self.renderer.time, 2), line,
+                                       names, _snapshot(self)))
+
+        def update_to_time(self, t):
+            # Skipped animations jump straight to t == run_time; stop halfway first
+            if (midpoints and t > 0 and self.animations
+                    and not all(isinstance(a, Wait) for a in self.animations)):
+                super().update_to_time(t / 2)
+                self._preview_mid = _snapshot(self)
+            super().update_to_time(t)
+
+    options = no_output_config(path)
+    options.update({"pixel_width": width, "pixel_height": height,
+                    **shared_dirs(glyph_cache.cache_dir)})
+    with tempconfig(options):
+        PreviewScene(skip_animations=True, random_seed=RANDOM_SEED).render()
+    return frames
+
+
+def contact_sheet(frames, title="", columns=4):
+    """Tile PreviewFrames into one captioned PIL image"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    if not frames:
+        raise ValueError("no keyframes to tile (the scene played no animations)")
+    font = ImageFont.load_default()
+    tile_w, tile_h = frames[0].image.size
+    columns = max(1, min(columns, len(frames)))
+    rows = -(-len(frames) // columns)
+    cell_w, cell_h = tile_w + PADDING, tile_h + CAPTION_HEIGHT + PADDING
+    sheet = Image.new("RGB", (columns * cell_w + PADDING,
+                              HEADER_HEIGHT + rows * cell_h + PADDING), BACKGROUND)
+    draw = ImageDraw.Draw(sheet)
+    draw.text((PADDING, PADDING), title, fill=TEXT_COLOR, font=font)
+    for i, frame in enumerate(frames):
+        x = PADDING + (i % columns) * cell_w
+        y = HEADER_HEIGHT + (i // columns) * cell_h
+        sheet.paste(frame.image, (x, y))
+        label = f"#{frame.step}{' (mid)' if frame.kind == 'mid' else ''}  " \
+                f"{format_timestamp(frame.time)}"
+        if frame.line:
+            label += f"  L{frame.line}"
+        draw.text((x, y + tile_h + 3), label, fill=TEXT_COLOR, font=font)
+        draw.text((x, y + tile_h + 16), ", ".join(frame.animations)[:tile_w // 6],
+                  fill=DIM_TEXT_COLOR, font=font)
+    return sheet
+
+
+def preview_file(path, scene_name, output=None, midpoints=False, columns=4,
+                 width=320, height=180):
+    """Write a contact sheet for `scene_name` in `path`; returns (output path, frames)"""
+    start = time.perf_counter()
+    frames = capture_keyframes(path, scene_name, midpoints, width, height)
+    steps = len({frame.step for frame in frames})
+    duration = max((frame.time for frame in frames), default=0.0)
+    title = (f"{scene_name}: {steps} animations, last ends at "
+             f"{format_timestamp(duration)} (preview took {time.perf_counter() - start:.1f}s)")
+    output = output or os.path.join(DEFAULT_PREVIEW_DIR, f"{scene_name}.png")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    contact_sheet(frames, title, columns).save(output)
+    return output, frames
+
+
+def preview(code, scene_name=None, output=None, **kwargs):
+    """Contact sheet for generated code; see preview_file"""
+    scene_name = scene_name or find_scene_class(code)
+    if scene_name is None:
+        raise ValueError("No Scene subclass found in generated code")
+    return preview_file(write_scene_file(code), scene_name, output, **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render the end frame of every animation into one PNG contact sheet")
+    parser.add_argument("file")
+    parser.add_argument("scene", nargs="?")
+    parser.add_argument("-o", "--output", default=None,
+                        help="PNG path (default: media/previews/<scene>.png)")
+    parser.add_argument("--midpoints", action="store_true",
+                        help="Also capture each animation halfway through")
+    parser.add_argument("--columns", type=int, default=4)
+    parser.add_argument("--width", type=int, default=320)
+    parser.add_argument("--height", type=int, default=180)
+    args = parser.parse_args(argv)
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        output, frames = preview(f.read(), args.scene, args.output, midpoints=args.midpoints,
+                                 columns=args.columns, width=args.width, height=args.height)
+    print(f"{len(frames)} keyframes -> {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
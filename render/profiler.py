@@ -0,0 +1,239 @@
+"""Opt-in per-animation render profiler
+
+Wraps a scene so that every self.play/self.wait records its wall time, the
+frames it produced, mean and p95 milliseconds per frame, the live mobject
+count, and how the time split between interpolation (update_to_time),
+rasterization (renderer.update_frame) and encoding (writing frames and
+closing the partial movie). The report is written as JSON and summarized
+as a list of the slowest steps.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+
+from render.dryrun import caller_line
+from render.pool import DEFAULT_MEDIA_DIR, render_scene_file
+
+
+@dataclass
+class ProfileStep:
+    index: int
+    kind: str
+    line: int
+    animations: list
+    wall_ms: float
+    frames: int
+    mean_frame_ms: float
+    p95_frame_ms: float
+    interpolate_ms: float
+    raster_ms: float
+    encode_ms: float
+    other_ms: float
+    mobject_count: int
+    family_count: int
+
+
+@dataclass
+class ProfileReport:
+    scene_name: str
+    quality: str = None
+    steps: list = field(default_factory=list)
+    total_ms: float = 0.0
+    video_path: str = None
+
+    @property
+    def frames(self):
+        return sum(step.frames for step in self.steps)
+
+    def slowest(self, n=10):
+        return sorted(self.steps, key=lambda step: step.wall_ms, reverse=True)[:n]
+
+    def totals(self):
+        keys = ("wall_ms", "interpolate_ms", "raster_ms", "encode_ms", "other_ms")
+        return {key: round(sum(getattr(step, key) for step in self.steps), 2) for key in keys}
+
+    def to_dict(self):
+        return {
+            "scene_name": self.scene_name,
+            "quality": self.quality,
+            "video_path": self.video_path,
+            "total_ms": round(self.total_ms, 2),
+            "frames": self.frames,
+            "totals": self.totals(),
+            "slowest": [step.index for step in self.slowest()],
+            "steps": [asdict(step) for step in self.steps],
+        }
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["scene_name"], data["quality"],
+                   [ProfileStep(**step) for step in data["steps"]],
+                   data["total_ms"], data["video_path"])
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def summary(self, n=10):
+        totals = self.totals()
+        lines = [
+            f"{self.scene_name}: {len(self.steps)} steps, {self.frames} frames, "
+            f"{self.total_ms / 1000:.1f}s total "
+            f"(interpolate {totals['interpolate_ms'] / 1000:.1f}s, "
+            f"raster {totals['raster_ms'] / 1000:.1f}s, "
+            f"encode {totals['encode_ms'] / 1000:.1f}s)",
+            f"{'step':>4} {'line':>5} {'wall ms':>9} {'frames':>6} {'ms/frame':>8} "
+            f"{'p95':>7} {'interp':>7} {'raster':>7} {'encode':>7} {'mobs':>5}  animations",
+        ]
+        for step in self.slowest(n):
+            lines.append(
+                f"{step.index:>4} {step.line or '-':>5} {step.wall_ms:>9.1f} {step.frames:>6} "
+                f"{step.mean_frame_ms:>8.2f} {step.p95_frame_ms:>7.2f} "
+                f"{step.interpolate_ms:>7.1f} {step.raster_ms:>7.1f} {step.encode_ms:>7.1f} "
+                f"{step.family_count:>5}  {', '.join(step.animations)}")
+        return "\n".join(lines)
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+class _StepTimer:
+    def __init__(self):
+        self.interpolate = 0.0
+        self.raster = 0.0
+        self.encode = 0.0
+        self.frames = 0
+        self.frame_ms = []
+        self.frame_start = None
+
+
+def profiled_scene_class(scene_cls, report, source_path=None):
+    """Subclass `scene_cls` so that rendering it fills `report` with ProfileSteps"""
+    from manim import Wait
+
+    class ProfiledScene(scene_cls):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._profile_step = None
+            renderer = self.renderer
+            update_frame = renderer.update_frame
+            add_frame = renderer.add_frame
+            end_animation = renderer.file_writer.end_animation
+
+            def timed_update_frame(*a, **kw):
+                step = self._profile_step
+                if step is None:
+                    return update_frame(*a, **kw)
+                start = time.perf_counter()
+                if step.frame_start is None:
+                    step.frame_start = start
+                try:
+                    return update_frame(*a, **kw)
+                finally:
+                    step.raster += time.perf_counter() - start
+
+            def timed_add_frame(frame, num_frames=1):
+                step = self._profile_step
+                if step is None:
+                    return add_frame(frame, num_frames)
+                start = time.perf_counter()
+                try:
+                    return add_frame(frame, num_frames)
+                finally:
+                    end = time.perf_counter()
+                    step.encode += end - start
+                    step.frames += num_frames
+                    frame_start = step.frame_start if step.frame_start is not None else start
+                    step.frame_ms.extend([(end - frame_start) * 1000 / num_frames] * num_frames)
+                    step.frame_start = None
+
+            def timed_end_animation(*a, **kw):
+                step = self._profile_step
+                start = time.perf_counter()
+                try:
+                    return end_animation(*a, **kw)
+                finally:
+                    if step is not None:
+                        step.encode += time.perf_counter() - start
+
+            renderer.update_frame = timed_update_frame
+            renderer.add_frame = timed_add_frame
+            renderer.file_writer.end_animation = timed_end_animation
+
+        def update_to_time(self, t):
+            step = self._profile_step
+            if step is None:
+                return super().update_to_time(t)
+            start = time.perf_counter()
+            step.frame_start = start
+            try:
+                return super().update_to_time(t)
+            finally:
+                step.interpolate += time.perf_counter() - start
+
+        def play(self, *args, **kwargs):
+            line = caller_line(source_path) if source_path else None
+            step = self._profile_step = _StepTimer()
+            start = time.perf_counter()
+            try:
+                super().play(*args, **kwargs)
+            finally:
+                self._profile_step = None
+            wall = time.perf_counter() - start
+            played = self.animations or []
+            report.steps.append(ProfileStep(
+                index=len(report.steps),
+                kind="wait" if played and all(isinstance(a, Wait) for a in played) else "play",
+                line=line,
+                animations=[type(a).__name__ for a in played],
+                wall_ms=round(wall * 1000, 3),
+                frames=step.frames,
+                mean_frame_ms=round(sum(step.frame_ms) / len(step.frame_ms), 3)
+                if step.frame_ms else 0.0,
+                p95_frame_ms=round(_percentile(step.frame_ms, 0.95), 3),
+                interpolate_ms=round(step.interpolate * 1000, 3),
+                raster_ms=round(step.raster * 1000, 3),
+                encode_ms=round(step.encode * 1000, 3),
+                other_ms=round(max(wall - step.interpolate - step.raster - step.encode, 0)
+                               * 1000, 3),
+                mobject_count=len(self.mobjects),
+                family_count=len(self.get_mobject_family_members()),
+            ))
+
+    ProfiledScene.__name__ = scene_cls.__name__
+    ProfiledScene.__qualname__ = scene_cls.__qualname__
+    return ProfiledScene
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a scene and profile every play/wait")
+    parser.add_argument("file")
+    parser.add_argument("scene")
+    parser.add_argument("-q", "--quality", default="low_quality")
+    parser.add_argument("-o", "--output", default=None,
+                        help="JSON report path (default: <media>/profiles/<scene>_<quality>.json)")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.join(
+        DEFAULT_MEDIA_DIR, "profiles", f"{args.scene}_{args.quality}.json")
+    render_scene_file(os.path.abspath(args.file), args.scene, args.quality,
+                      profile_path=output)
+    report = ProfileReport.load(output)
+    print(report.summary(args.top))
+    print(f"report: {output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
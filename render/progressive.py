@@ -0,0 +1,189 @@
+"""Progressive rendering: a cheap preview now, the full-quality video later
+
+The scene is first rendered at preview quality (480p15 by default) and
+copied to a stable output path, which is handed back immediately. A
+full-quality render (1080p60 by default) is then started in the
+background on a render pool with fewer, lower-priority workers. When it
+finishes, the output path is atomically replaced with the upgraded video
+and `on_upgrade` is called.
+
+Both passes go through render.incremental: the section-state probe of the
+preview is reused, full-quality segments already in the segment store
+(e.g. from an earlier version of the lesson) are not rendered again, and
+every worker shares the glyph cache, so text and LaTeX laid out for the
+preview are not re-typeset.
+
+    python -m render.progressive response.txt
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import threading
+import time
+
+from render.incremental import DEFAULT_STORE_DIR, render_incremental
+from render.pool import DEFAULT_MEDIA_DIR, RenderPool, find_scene_class
+from render.segments import insert_section_markers
+
+DEFAULT_OUTPUT_DIR = os.path.join(DEFAULT_MEDIA_DIR, "videos", "progressive")
+BACKGROUND_NICE = 10
+
+
+def make_background_pool(quality="high_quality"):
+    """A pool for upgrades: half the cores, at lower scheduling priority"""
+    return RenderPool(max_workers=max(1, (os.cpu_count() or 2) // 2), quality=quality,
+                      nice=BACKGROUND_NICE)
+
+
+def _publish(source, target):
+    """Copy `source` over `target` so readers only ever see a complete file"""
+    if os.path.abspath(source) == os.path.abspath(target):
+        return
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, target)
+
+
+class ProgressiveRender:
+    """Handle on a preview that upgrades itself in place
+
+    `output_path` always holds the best version finished so far.
+    """
+
+    def __init__(self, scene_name, output_path, preview_quality, final_quality):
+        self.scene_name = scene_name
+        self.output_path = output_path
+        self.preview_quality = preview_quality
+        self.final_quality = final_quality
+        self.preview_path = None
+        self.final_path = None
+        self.error = None
+        self.timings = {}
+        self._done = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def completed(cls, scene_name, output_path, quality="high_quality"):
+        """A handle for a video that needs no upgrade (e.g. one rendered earlier)"""
+        render = cls(scene_name, output_path, quality, quality)
+        render.preview_path = render.final_path = output_path
+        render._done.set()
+        return render
+
+    @property
+    def status(self):
+        if self.error:
+            return "failed"
+        if self.final_path:
+            return "done"
+        return "upgrading" if self.preview_path else "rendering"
+
+    def wait(self, timeout=None):
+        """Wait for the upgrade; returns False if `timeout` ran out first"""
+        return self._done.wait(timeout)
+
+    def result(self, timeout=None):
+        """Block until the upgraded video is in place and return its path"""
+        if not self.wait(timeout):
+            raise TimeoutError(f"{self.scene_name} upgrade still running")
+        if self.error:
+            raise self.error
+        return self.output_path
+
+
+def _upgrade(render, code, pool, owns_pool, store_dir, states, on_upgrade):
+    start = time.perf_counter()
+    try:
+        result = render_incremental(code, render.scene_name, render.final_quality,
+                                    pool=pool, store_dir=store_dir, states=states)
+        render.final_path = result.output_path
+        _publish(result.output_path, render.output_path)
+        render.timings["final"] = round(time.perf_counter() - start, 3)
+        if on_upgrade is not None:
+            on_upgrade(render)
+    except Exception as e:
+        render.error = e
+    finally:
+        render.timings.setdefault("final", round(time.perf_counter() - start, 3))
+        if owns_pool:
+            pool.shutdown()
+        render._done.set()
+
+
+def render_progressive(code, scene_name=None, output_path=None,
+                       preview_quality="low_quality", final_quality="high_quality",
+                       pool=None, background_pool=None, on_upgrade=None,
+                       store_dir=DEFAULT_STORE_DIR, preview_path=None):
+    """Render a preview and return once it is playable; upgrade it in the background
+
+    `pool` renders the preview and `background_pool` the final version;
+    missing pools are created (the background one with half the cores at
+    lower priority) and shut down when their pass is done. Callers that start
+    many upgrades should share one background pool, e.g. from
+    make_background_pool, so they queue instead of each adding workers. A `preview_path`
+    rendered earlier (at `preview_quality`) is published instead of
+    rendering a new preview.
+    """
+    code = insert_section_markers(code, scene_name)
+    scene_name = scene_name or find_scene_class(code)
+    if scene_name is None:
+        raise ValueError("No Scene subclass found in generated code")
+    digest = hashlib.sha256(code.encode("utf-8")).hexdigest()[:12]
+    output_path = output_path or os.path.join(DEFAULT_OUTPUT_DIR, f"{scene_name}_{digest}.mp4")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    render = ProgressiveRender(scene_name, output_path, preview_quality, final_quality)
+
+    start = time.perf_counter()
+    states = None
+    if preview_path is None:
+        owns_pool = pool is None
+        if owns_pool:
+            pool = RenderPool(quality=preview_quality)
+        try:
+            preview = render_incremental(code, scene_name, preview_quality, pool=pool,
+                                         store_dir=store_dir)
+        finally:
+            if owns_pool:
+                pool.shutdown()
+        preview_path, states = preview.output_path, preview.states
+    render.preview_path = preview_path
+    _publish(preview_path, output_path)
+    render.timings["preview"] = round(time.perf_counter() - start, 3)
+
+    owns_background = background_pool is None
+    if owns_background:
+        background_pool = make_background_pool(final_quality)
+    render._thread = threading.Thread(
+        target=_upgrade, name=f"upgrade-{scene_name}",
+        args=(render, code, background_pool, owns_background, store_dir, states, on_upgrade))
+    render._thread.start()
+    return render
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render a quick preview, then upgrade it to full quality in place")
+    parser.add_argument("file")
+    parser.add_argument("scene", nargs="?")
+    parser.add_argument("-o", "--output", default=None)
+    parser.add_argument("--preview-quality", default="low_quality")
+    parser.add_argument("--final-quality", default="high_quality")
+    args = parser.parse_args(argv)
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        code = f.read()
+    render = render_progressive(code, args.scene, args.output, args.preview_quality,
+                                args.final_quality)
+    print(f"preview ready in {render.timings['preview']:.1f}s: {render.output_path}")
+    render.wait()
+    if render.error:
+        print(f"upgrade failed: {type(render.error).__name__}: {render.error}")
+        return 1
+    print(f"upgraded to {args.final_quality} after another "
+          f"{render.timings['final']:.1f}s: {render.output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
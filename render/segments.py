@@ -0,0 +1,133 @@
+"""Render a scene's sections as independent segments in parallel and stitch them"""
+import argparse
+import ast
+import os
+import re
+import time
+
+from render.pool import RenderPool, find_scene_class, write_scene_file
+
+SECTION_COMMENT = re.compile(r'^(\s*)#[\s#-]*(Scene\s+\d+\b.*?)[\s-]*$')
+
+
+def construct_node(tree, scene_name):
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == scene_name:
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef) and item.name == "construct":
+                    return item
+    return None
+
+
+def is_next_section(stmt):
+    return (isinstance(stmt, ast.Expr)
+            and isinstance(stmt.value, ast.Call)
+            and isinstance(stmt.value.func, ast.Attribute)
+            and stmt.value.func.attr == "next_section"
+            and isinstance(stmt.value.func.value, ast.Name)
+            and stmt.value.func.value.id == "self")
+
+
+def insert_section_markers(code, scene_name=None):
+    """Turn `# Scene N: ...` comments in construct() into next_section calls
+
+    Generated lessons (and the shipped examples) already delimit their
+    acts with comments like `# --- Scene 2: The Artificial Neuron ---`.
+    Code that already calls self.next_section is returned unchanged.
+    """
+    scene_name = scene_name or find_scene_class(code)
+    construct = construct_node(ast.parse(code), scene_name)
+    if construct is None or any(is_next_section(stmt) for stmt in construct.body):
+        return code
+    body_indent = construct.body[0].col_offset
+    lines = code.splitlines(keepends=True)
+    for lineno in range(construct.end_lineno, construct.lineno, -1):
+        match = SECTION_COMMENT.match(lines[lineno - 1])
+        if match and len(match.group(1)) == body_indent:
+            title = match.group(2).strip()
+            lines.insert(lineno - 1,
+                         f"{match.group(1)}self.next_section({title!r})\n")
+    return "".join(lines)
+
+
+def count_segments(code, scene_name):
+    """Number of segments: the prelude plus one per top-level next_section call"""
+    construct = construct_node(ast.parse(code), scene_name)
+    if construct is None:
+        return 1
+    return 1 + sum(is_next_section(stmt) for stmt in construct.body)
+
+
+def concat_videos(paths, output_path):
+    """Concatenate videos with identical encoding using stream copy"""
+    import ffmpeg
+
+    list_path = output_path + ".txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    try:
+        (
+            ffmpeg
+            .input(list_path, format="concat", safe=0)
+            .output(output_path, c="copy")
+            .overwrite_output()
+            .run(quiet=True)
+        )
+    finally:
+        os.remove(list_path)
+    return output_path
+
+
+def submit_segments(pool, code, scene_name=None, quality=None):
+    """Queue every segment of `code` on `pool` and return (scene_name, jobs)"""
+    code = insert_section_markers(code, scene_name)
+    scene_name = scene_name or find_scene_class(code)
+    if scene_name is None:
+        raise ValueError("No Scene subclass found in generated code")
+    path = write_scene_file(code, pool.work_dir)
+    jobs = [pool.submit_file(path, scene_name, quality, segment=i)
+            for i in range(count_segments(code, scene_name))]
+    return scene_name, jobs
+
+
+def render_segmented(code, scene_name=None, quality="low_quality", output_path=None,
+                     pool=None, max_workers=None):
+    """Render each section in its own process and concatenate the results"""
+    owns_pool = pool is None
+    if owns_pool:
+        pool = RenderPool(max_workers=max_workers, quality=quality)
+    try:
+        scene_name, jobs = submit_segments(pool, code, scene_name, quality)
+        videos = [path for path in (job.result() for job in jobs) if path]
+    finally:
+        if owns_pool:
+            pool.shutdown()
+    if not videos:
+        raise RuntimeError(f"{scene_name} produced no animations")
+    output_path = output_path or os.path.join(
+        os.path.dirname(videos[0]), f"{scene_name}.mp4")
+    return concat_videos(videos, output_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render a scene's sections in parallel and concatenate them")
+    parser.add_argument("file")
+    parser.add_argument("scene", nargs="?")
+    parser.add_argument("-q", "--quality", default="low_quality")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args(argv)
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        code = f.read()
+    start = time.perf_counter()
+    output = render_segmented(code, args.scene, args.quality, args.output,
+                              max_workers=args.workers)
+    print(f"{output} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Smoke render: run a whole scene cheaply to surface runtime errors in seconds
+
+Two modes:
+  * "skip" executes construct() with every animation jumping to its end
+    state, drawing only one 32x18 frame per animation (fastest; catches
+    most construct errors);
+  * "tiny" also rasterizes every frame at 160x90 and 5 fps without writing
+    a movie, which additionally catches errors raised mid-animation.
+The result carries a trimmed traceback pointing into the generated file, in
+a form that can be handed back to the model.
+"""
+import argparse
+import sys
+import time
+import traceback
+from dataclasses import asdict, dataclass
+
+from render.pool import (RANDOM_SEED, find_scene_class, load_scene_class, no_output_config,
+                         write_scene_file)
+
+TINY_CONFIG = {"pixel_width": 160, "pixel_height": 90, "frame_rate": 5}
+
+
+@dataclass
+class SmokeResult:
+    ok: bool
+    scene_name: str
+    mode: str
+    elapsed_s: float = 0.0
+    error: str = None
+    line: int = None
+    traceback: str = None
+
+    def feedback(self):
+        """The failure in a compact form for a regeneration prompt"""
+        if self.ok:
+            return ""
+        location = f" at line {self.line}" if self.line else ""
+        return f"{self.error}{location}\n\n{self.traceback}"
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class SmokeError(RuntimeError):
+    def __init__(self, result):
+        super().__init__(result.feedback())
+        self.result = result
+
+
+def _scene_traceback(exc, path):
+    """Traceback limited to frames in the generated file, plus the exception line"""
+    frames = [frame for frame in traceback.extract_tb(exc.__traceback__)
+              if frame.filename == path]
+    line = frames[-1].lineno if frames else None
+    text = "".join(traceback.format_list(frames))
+    text += "".join(traceback.format_exception_only(type(exc), exc))
+    return line, text
+
+
+def smoke_render_file(path, scene_name, mode="skip"):
+    """Execute `scene_name` from `path` in smoke mode and return a SmokeResult"""
+    from manim import tempconfig
+
+    if mode not in ("skip", "tiny"):
+        raise ValueError(f"unknown smoke mode {mode!r}")
+    start = time.perf_counter()
+    result = SmokeResult(True, scene_name, mode)
+    options = no_output_config(path)
+    if mode == "tiny":
+        options.update(TINY_CONFIG)
+    try:
+        scene_cls = load_scene_class(path, scene_name)
+        with tempconfig(options):
+            scene_cls(skip_animations=mode == "skip", random_seed=RANDOM_SEED).render()
+    except Exception as e:
+        result.ok = False
+        result.error = f"{type(e).__name__}: {e}"
+        result.line, result.traceback = _scene_traceback(e, path)
+    result.elapsed_s = round(time.perf_counter() - start, 3)
+    return result
+
+
+def submit_smoke_test(code, scene_name, mode, pool):
+    """Queue a smoke render of `scene_name` on `pool`; returns a Future of its SmokeResult"""
+    return pool.run(smoke_render_file, write_scene_file(code, pool.work_dir), scene_name, mode)
+
+
+def smoke_test(code, scene_name=None, mode="skip", pool=None, timeout=300):
+    """Smoke-render generated code, on `pool` if given, else in this process"""
+    scene_name = scene_name or find_scene_class(code)
+    if scene_name is None:
+        raise ValueError("No Scene subclass found in generated code")
+    if pool is None:
+        return smoke_render_file(write_scene_file(code), scene_name, mode)
+    from concurrent.futures import TimeoutError
+
+    try:
+        return submit_smoke_test(code, scene_name, mode, pool).result(timeout=timeout)
+    except TimeoutError:
+        return SmokeResult(False, scene_name, mode, float(timeout),
+                           f"TimeoutError: smoke render did not finish in {timeout}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Smoke-render a scene to catch runtime errors")
+    parser.add_argument("file")
+    parser.add_argument("scene", nargs="?")
+    parser.add_argument("--mode", choices=["skip", "tiny"], default="skip")
+    args = parser.parse_args(argv)
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        result = smoke_test(f.read(), args.scene, args.mode)
+    if result.ok:
+        print(f"{result.scene_name}: ok ({result.mode}, {result.elapsed_s:.1f}s)")
+        return 0
+    print(f"{result.scene_name}: FAILED ({result.mode}, {result.elapsed_s:.1f}s)")
+    print(result.feedback())
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
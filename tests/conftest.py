@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Modules that bind the process-wide accessors from ai.GEMINI.app by name
+_ACCESSOR_MODULES = ("ai.GEMINI.app", "ai.GEMINI.provider", "ai.GEMINI.streaming",
+                     "ai.GEMINI.batch", "ai.GEMINI.pipeline")
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    """Point every shared cache, log and index at tmp_path instead of .cache/"""
+    import importlib
+
+    from ai.dedup import PromptIndex
+    from ai.GEMINI.cache import ResponseCache
+    from ai.GEMINI.context_cache import ContextCacheRegistry
+    from ai.GEMINI.usage import UsageLog
+
+    state = {
+        "get_response_cache": ResponseCache(str(tmp_path / "responses.sqlite3")),
+        "get_context_caches": ContextCacheRegistry(str(tmp_path / "context_caches.json")),
+        "get_usage_log": UsageLog(str(tmp_path / "usage.jsonl")),
+        "get_prompt_index": PromptIndex(str(tmp_path / "prompts.sqlite3")),
+    }
+    for module_name in _ACCESSOR_MODULES:
+        module = importlib.import_module(module_name)
+        for name, value in state.items():
+            if hasattr(module, name):
+                monkeypatch.setattr(module, name, lambda value=value: value)
+    for name in ("LUMI_PROVIDER", "LUMI_HEDGE_PROVIDER", "LUMI_RATE_LIMITS"):
+        monkeypatch.delenv(name, raising=False)
+    yield state
+    state["get_response_cache"].close()
+
+
+@pytest.fixture
+def fake_client():
+    """FakeClient for code paths that build google.genai request configs"""
+    pytest.importorskip("google.genai")
+    from ai.GEMINI.fake_client import FakeClient
+
+    return FakeClient()
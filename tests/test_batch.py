@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from ai.GEMINI.batch import BatchRunner, read_jobs
+from ai.GEMINI.fake_client import default_respond
+
+
+def _write_jobs(path, prompts):
+    path.write_text("".join(json.dumps({"prompt": p}) + "\n" for p in prompts),
+                    encoding="utf-8")
+
+
+@pytest.fixture
+def runner_for(tmp_path, fake_client):
+    def make(prompts, **kwargs):
+        input_path = tmp_path / "unit.jsonl"
+        _write_jobs(input_path, prompts)
+        kwargs.setdefault("render", False)
+        runner = BatchRunner(str(input_path), state_dir=str(tmp_path / "state"),
+                             use_cache=False, genai_client=fake_client, **kwargs)
+        runner.load()
+        return runner
+    return make
+
+
+def test_read_jobs_skips_comments(tmp_path):
+    path = tmp_path / "in.jsonl"
+    path.write_text('# header\n\n{"prompt": "a", "id": "first"}\n{"prompt": "b"}\n',
+                    encoding="utf-8")
+    jobs = read_jobs(str(path))
+    assert [job.prompt for job in jobs] == ["a", "b"]
+    assert jobs[0].id == "first"
+
+
+def test_batch_resumes_from_checkpoints(runner_for, fake_client):
+    import asyncio
+
+    runner = runner_for(["sine waves", "binary search"])
+    jobs = asyncio.run(runner.run())
+    assert [runner.status(job) for job in jobs] == ["done", "done"]
+    calls = len(fake_client.calls)
+    assert calls == 4
+
+    rerun = runner_for(["sine waves", "binary search"])
+    assert rerun.pending() == []
+    asyncio.run(rerun.run())
+    assert len(fake_client.calls) == calls
+
+
+def test_edited_prompt_is_redone(runner_for, fake_client):
+    import asyncio
+
+    asyncio.run(runner_for(["sine waves"]).run())
+    rerun = runner_for(["cosine waves"])
+    assert len(rerun.pending()) == 1
+
+
+def test_job_ids_survive_edits_to_other_lines(tmp_path):
+    path = tmp_path / "in.jsonl"
+    _write_jobs(path, ["sine waves", "binary search", "sine waves"])
+    before = [job.id for job in read_jobs(str(path))]
+    assert len(set(before)) == 3
+    _write_jobs(path, ["dijkstra", "sine waves", "binary search", "sine waves"])
+    assert [job.id for job in read_jobs(str(path))][1:] == before
+
+
+BROKEN = "```python\nfrom manim import *\n\nclass Broken(Scene):\n    def construct(self)\n```"
+
+
+def test_failing_code_is_repaired_before_render(runner_for, fake_client):
+    import asyncio
+
+    def respond(system_instruction, contents):
+        if "fails when the scene is executed" in contents:
+            return default_respond(system_instruction, "Repaired")
+        return "A brief about sine waves" if contents == "sine waves" else BROKEN
+
+    fake_client.respond = respond
+    runner = runner_for(["sine waves"])
+    job, = asyncio.run(runner.run())
+    assert runner.status(job) == "done"
+    assert job.repairs == 1
+    assert "class FakeScene" in open(job.code_path, encoding="utf-8").read()
+
+
+class FailingRenderPool:
+    def __init__(self, failures):
+        self.failures = failures
+        self.rendered = []
+
+    def submit(self, code, scene_name=None, quality=None):
+        from concurrent.futures import Future
+        from types import SimpleNamespace
+
+        future = Future()
+        self.rendered.append(code)
+        if len(self.rendered) <= self.failures:
+            future.set_exception(RuntimeError("ValueError: bad color at line 7"))
+        else:
+            future.set_result("/videos/out.mp4")
+        return SimpleNamespace(future=future)
+
+    def shutdown(self):
+        pass
+
+
+def test_failed_render_is_repaired_on_the_next_attempt(runner_for, fake_client):
+    import asyncio
+
+    pool = FailingRenderPool(failures=1)
+    runner = runner_for(["sine waves"], render=True, smoke_mode=None)
+    runner._render_pool = lambda: pool
+    job, = asyncio.run(runner.run())
+    assert job.failed_stage == "render" and "generate" not in job.completed
+
+    rerun = runner_for(["sine waves"], render=True, smoke_mode=None)
+    rerun._render_pool = lambda: pool
+    job, = asyncio.run(rerun.run())
+    assert rerun.status(job) == "done" and job.repairs == 1
+    assert "bad color" in fake_client.calls[-1].contents
+    assert len(pool.rendered) == 2
@@ -0,0 +1,27 @@
+from ai.GEMINI.cache import ResponseCache, make_key
+
+
+def test_key_ignores_whitespace_but_not_content():
+    key = make_key("m", "sys", "explain  the\nsine wave ")
+    assert key == make_key("m", "sys", "explain the sine wave")
+    assert key != make_key("m", "sys", "explain the cosine wave")
+    assert key != make_key("other", "sys", "explain the sine wave")
+    assert key != make_key("m", "sys2", "explain the sine wave")
+
+
+def test_lru_eviction_keeps_recently_read_entries(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"), max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"), ttl=-1)
+    cache.put("a", "1")
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
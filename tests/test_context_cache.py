@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from ai.GEMINI.context_cache import ContextCacheRegistry, client_id, is_stale_cache_error
+from ai.GEMINI.fake_client import FakeAPIError
+
+INSTRUCTION = "You write Manim scenes. " * 50
+
+
+@pytest.fixture
+def provider(fake_client, isolated_state):
+    from ai.GEMINI.provider import GeminiProvider
+
+    return GeminiProvider("gemini-test", client=fake_client)
+
+
+def test_stale_cache_errors_are_told_apart_from_throttling():
+    assert is_stale_cache_error(FakeAPIError(404, "CachedContent not found"))
+    assert is_stale_cache_error(FakeAPIError(400, "cachedContents/abc has expired"))
+    assert not is_stale_cache_error(FakeAPIError(429, "RESOURCE_EXHAUSTED cachedContents"))
+    assert not is_stale_cache_error(FakeAPIError(503, "UNAVAILABLE"))
+    assert not is_stale_cache_error(TimeoutError("read timed out"))
+
+
+def test_expired_cache_is_resent_inline_once(provider, fake_client, isolated_state):
+    provider.generate(INSTRUCTION, "first")
+    name = fake_client.calls[-1].cached_content
+    fake_client.caches.delete(name)
+    completion = provider.generate(INSTRUCTION, "second")
+    assert completion.context_cache is None
+    assert [call.cached_content for call in fake_client.calls] == [name, name, None]
+    assert isolated_state["get_context_caches"].get(fake_client, "gemini-test",
+                                                    INSTRUCTION) != name
+
+
+def test_throttling_keeps_the_cache_and_is_not_retried(provider, fake_client, isolated_state):
+    provider.generate(INSTRUCTION, "first")
+    name = fake_client.calls[-1].cached_content
+
+    def throttled(system_instruction, contents):
+        raise FakeAPIError(429, "RESOURCE_EXHAUSTED")
+
+    fake_client.respond = throttled
+    with pytest.raises(FakeAPIError):
+        asyncio.run(provider.agenerate(INSTRUCTION, "second"))
+    assert len(fake_client.calls) == 2
+    assert isolated_state["get_context_caches"].get(fake_client, "gemini-test",
+                                                    INSTRUCTION) == name
+
+
+def test_clients_with_different_keys_do_not_share_caches(tmp_path, fake_client):
+    from ai.GEMINI.fake_client import FakeClient
+
+    other = FakeClient()
+    assert client_id(other) != client_id(fake_client)
+    registry = ContextCacheRegistry(str(tmp_path / "registry.json"))
+    registry.get(fake_client, "m", INSTRUCTION)
+    registry.get(other, "m", INSTRUCTION)
+    assert len(fake_client.caches.contents) == len(other.caches.contents) == 1
+
+
+def test_processes_merge_their_entries(tmp_path, fake_client):
+    from ai.GEMINI.fake_client import FakeClient
+
+    path = str(tmp_path / "registry.json")
+    first, second = ContextCacheRegistry(path), ContextCacheRegistry(path)
+    first._load(), second._load()
+    name = first.get(fake_client, "m", INSTRUCTION)
+    second.get(FakeClient(), "m", INSTRUCTION)
+    assert len(ContextCacheRegistry(path)._load()) == 2
+    # A stale in-memory view re-reads the file before creating a duplicate
+    assert second.get(fake_client, "m", INSTRUCTION) == name
+    assert len(fake_client.caches.contents) == 1
+
+
+def test_expired_cache_is_resent_inline_when_streaming(provider, fake_client):
+    provider.generate(INSTRUCTION, "first")
+    fake_client.caches.delete(fake_client.calls[-1].cached_content)
+    assert "".join(provider.stream(INSTRUCTION, "second")).startswith("```python")
+    assert fake_client.calls[-1].cached_content is None
@@ -0,0 +1,135 @@
+import pytest
+
+from ai.dedup import PromptIndex, normalize
+
+CODE = "from manim import *\n\nclass Waves(Scene):\n    def construct(self):\n        pass"
+
+
+def brief(topic, objects, message):
+    return f"""Create a **cinematic 2D Manim animation** to {topic}. Structure into 2 **visually stunning scenes** with smooth fades and **captivating visual emphasis**.
+
+# Cinematic Scene Breakdown
+
+Scene 1: Meeting the Idea
+- **Opening Hook:** The title appears over {objects}
+- **Setup:** {objects} in the centre
+- **Key Message:** {message}
+
+# Cinematic Technical Specifications
+- **Dimension:** 2D chosen for **maximum visual impact** because it reads best flat
+- **Camera Work:** Static frame
+- **Text Treatment:** Dramatic reveals using Text/MathTex/Tex3D with a Write for the title
+"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    return PromptIndex(str(tmp_path / "prompts.sqlite3"))
+
+
+@pytest.mark.parametrize("text, kept", [
+    ("what would the world look like", "world"),
+    ("produce the product of two matrices", "product"),
+    ("create a python package layout", "package"),
+])
+def test_filler_removal_keeps_topic_words(text, kept):
+    assert kept in normalize(text).split()
+
+
+def test_misspelled_filler_is_dropped():
+    assert normalize("make an animaton explaning sorting") == "sorting"
+
+
+def test_reworded_prompt_with_typos_is_reused(index):
+    index.add("create an animation explaining how neural networks work", CODE)
+    match = index.lookup("make a video explaning how nueral networks work")
+    assert match is not None and match.code == CODE
+
+
+@pytest.mark.parametrize("stored, query", [
+    ("animate sine waves", "animate cosine waves"),
+    ("explain the product of two matrices", "explain the sum of two matrices"),
+    ("show how the world map is projected", "show how the moon map is projected"),
+])
+def test_near_miss_topics_are_not_reused(index, stored, query):
+    index.add(stored, CODE)
+    assert index.lookup(query) is None
+
+
+def test_briefs_on_different_topics_are_not_reused(index):
+    index.add("sine waves", CODE, brief("show how a sine wave is traced by a rotating point",
+                                        "a unit circle and a sine curve",
+                                        "the sine wave is a shadow of circular motion"))
+    other = brief("show how bubble sort orders a row of bars", "eight coloured bars",
+                  "each pass moves the largest bar to the end")
+    assert index.lookup(other, fields=("filtered_prompt",)) is None
+    same = brief("show how a sine wave is traced by a rotating point",
+                 "a unit circle and a sine curve",
+                 "the sine wave is a shadow of circular motion")
+    assert index.lookup(same, fields=("filtered_prompt",)).code == CODE
+
+
+def _video(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(b"video")
+    return str(path)
+
+
+def test_videos_are_reused_only_at_their_quality_or_better(index, tmp_path):
+    index.add("animate sine waves", CODE)
+    preview = _video(tmp_path, "preview.mp4")
+    index.record_video(CODE, preview, "low_quality")
+    assert index.video_for(CODE, "low_quality") == preview
+    assert index.video_for(CODE, "high_quality") is None
+    final = _video(tmp_path, "final.mp4")
+    index.record_video(CODE, final, "high_quality")
+    index.record_video(CODE, preview, "low_quality")
+    assert index.best_video(CODE) == (final, "high_quality")
+    assert index.video_for(CODE, "medium_quality") == final
+
+
+def test_indexes_without_qualities_are_migrated(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "old.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE entries (id INTEGER PRIMARY KEY, prompt TEXT NOT NULL, "
+                 "filtered_prompt TEXT, prompt_norm TEXT NOT NULL, filtered_norm TEXT, "
+                 "code TEXT NOT NULL, code_hash TEXT NOT NULL, video_path TEXT, "
+                 "created_at REAL NOT NULL, hit_count INTEGER NOT NULL DEFAULT 0)")
+    conn.commit()
+    conn.close()
+    index = PromptIndex(path)
+    index.add("animate sine waves", CODE, video_path=_video(tmp_path, "old.mp4"))
+    # A video of unknown quality is never taken for a final render
+    assert index.video_for(CODE, "low_quality") is None
+    assert index.best_video(CODE)[0] is not None
+
+
+def test_recorded_preview_is_upgraded_not_returned(monkeypatch, isolated_state, tmp_path):
+    from types import SimpleNamespace
+
+    import ai.GEMINI.app as app
+    import render.progressive
+
+    index = isolated_state["get_prompt_index"]
+    index.add("animate sine waves", CODE)
+    preview = _video(tmp_path, "preview.mp4")
+    index.record_video(CODE, preview, "low_quality")
+    started = []
+    monkeypatch.setattr(render.progressive, "render_progressive",
+                        lambda code, scene_name, **kwargs: started.append(kwargs))
+    monkeypatch.setattr(app, "_check_before_render",
+                        lambda code, smoke_mode: SimpleNamespace(scene_name="Waves"))
+    monkeypatch.setattr(app, "get_render_pool", lambda: None)
+    shared = object()
+    monkeypatch.setattr(app, "get_background_pool", lambda: shared)
+
+    app.render_animation_progressive(CODE)
+    assert started[0]["preview_path"] == preview
+    assert started[0]["final_quality"] == "high_quality"
+    assert started[0]["background_pool"] is shared
+
+    index.record_video(CODE, _video(tmp_path, "final.mp4"), "high_quality")
+    assert app.render_animation_progressive(CODE).status == "done"
+    assert len(started) == 1
@@ -0,0 +1,73 @@
+import os
+import time
+
+from render.incremental import _lookup, _store, default_output_path, prune_store
+
+
+def _segment(store_dir, fingerprint, size, age):
+    path = store_dir / f"{fingerprint}.mp4"
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_output_path_depends_on_every_segment():
+    first = default_output_path("Lesson", ["a1", "b2", "c3"])
+    assert first == default_output_path("Lesson", ["a1", "b2", "c3"])
+    assert first != default_output_path("Lesson", ["a9", "b2", "c3"])
+
+
+def test_store_round_trip(tmp_path):
+    source = tmp_path / "segment.mp4"
+    source.write_bytes(b"video")
+    stored = _store(str(tmp_path), "f1", str(source))
+    assert _lookup(str(tmp_path), "f1") == (True, stored)
+    _store(str(tmp_path), "f2", None)
+    assert _lookup(str(tmp_path), "f2") == (True, None)
+    assert _lookup(str(tmp_path), "f3") == (False, None)
+
+
+def test_prune_removes_expired_then_least_recently_used(tmp_path):
+    old = _segment(tmp_path, "old", 10, age=40 * 24 * 3600)
+    stale = _segment(tmp_path, "stale", 100, age=3 * 3600)
+    recent = _segment(tmp_path, "recent", 100, age=2 * 3600)
+    fresh = _segment(tmp_path, "fresh", 100, age=10)
+    assert prune_store(str(tmp_path), max_bytes=250) == 2
+    assert not old.exists() and not stale.exists()
+    assert recent.exists() and fresh.exists()
+
+
+def test_lookup_refreshes_last_use(tmp_path):
+    path = _segment(tmp_path, "used", 100, age=3 * 3600)
+    _lookup(str(tmp_path), "used")
+    assert prune_store(str(tmp_path), max_bytes=0) == 0
+    assert path.exists()
+
+
+
+def test_progressive_render_upgrades_a_given_preview(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+
+    import render.progressive
+    from render.progressive import render_progressive
+
+    preview = tmp_path / "preview.mp4"
+    preview.write_bytes(b"preview")
+    final = tmp_path / "final.mp4"
+    final.write_bytes(b"final")
+    rendered = []
+
+    def fake_render(code, scene_name, quality, **kwargs):
+        rendered.append(quality)
+        return SimpleNamespace(output_path=str(final), states=[])
+
+    monkeypatch.setattr(render.progressive, "render_incremental", fake_render)
+    code = "from manim import *\n\nclass Waves(Scene):\n    def construct(self):\n        pass\n"
+    output = tmp_path / "out.mp4"
+    render = render_progressive(code, "Waves", str(output), preview_quality="low_quality",
+                                background_pool=SimpleNamespace(shutdown=lambda: None),
+                                preview_path=str(preview))
+    assert render.preview_path == str(preview)
+    assert render.result(timeout=5) == str(output)
+    assert rendered == ["high_quality"] and output.read_bytes() == b"final"
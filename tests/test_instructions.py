@@ -0,0 +1,123 @@
+import os
+
+import pytest
+
+from ai.GEMINI.app import PROMPTS_DIR, select_system_instruction
+from ai.GEMINI.instructions import load_index, load_template
+
+BUBBLE_SORT = """Create a **cinematic 2D Manim animation** to reveal how bubble sort tames a chaotic row of numbers. A jumble of bars fights its way into order one swap at a time. Structure into 3 **visually stunning scenes** with smooth fades and **captivating visual emphasis**.
+
+# Cinematic Scene Breakdown
+
+Scene 1: The Unsorted Crowd
+- **Opening Hook:** Eight colored bars drop onto the stage at random heights
+- **Setup:** Bars in a row, labelled with their values, BLUE to RED by height
+- **Animation Sequence:** Bars wobble into place with staggered entrances
+- **Visual Drama:** The tallest bar glows before the first pass
+- **Key Message:** Disorder is the starting point
+
+Scene 2: Swapping Neighbours
+- **Transition:** The title fades as a highlight box slides in
+- **Visual Journey:** The box compares adjacent bars and swaps them when out of order
+- **Dramatic Elements:** Each pass locks the largest remaining bar in green
+- **Entertainment Factor:** A pass counter ticks up in the corner
+
+Scene 3: Order Restored
+- **Transition:** The last pass finishes with no swaps
+- **Visual Journey:** All bars turn green from left to right
+- **Dramatic Elements:** A brief pause on the sorted row
+- **Entertainment Factor:** The row bounces once in celebration
+
+# Cinematic Technical Specifications
+- **Dimension:** 2D chosen for **maximum visual impact** because the comparisons read best flat
+- **Visual Style:** Playful with rounded bars and soft shadows
+- **Objects:** Rectangle bars, Text labels, SurroundingRectangle highlight
+- **Camera Work:** Static frame, everything stays in view
+- **Lighting Drama:** Not applicable in 2D
+- **Color Palette:** BLUE to RED gradient, GREEN for sorted bars
+- **Animation Flow:** Swap animations of 0.5 s with smooth easing
+- **Text Treatment:** Dramatic reveals using Text/MathTex/Tex3D with a bouncy Write for the title
+- **Visual Effects:** Glow on the compared pair
+
+# Entertainment & Educational Goals
+- **Primary Objective:** Show that each pass moves the largest element to the end
+- **Entertainment Value:** The race of bars keeps attention
+- **Visual Journey:** From chaos to a calm sorted row
+- **Memorable Moments:** The final green sweep
+- **Audience Engagement:** Simple shapes keep the focus on the algorithm
+
+**Cinematic Enhancements:** Staggered entrances and a celebratory bounce
+"""
+
+QUADRATIC = """Create a **cinematic 2D Manim animation** to derive the quadratic formula by completing the square. Structure into 2 **visually stunning scenes** with equation morphs and **captivating visual emphasis**.
+
+# Cinematic Scene Breakdown
+
+Scene 1: Completing the Square
+- **Opening Hook:** ax^2 + bx + c = 0 writes itself in the centre
+- **Setup:** The equation in white with the coefficients in yellow
+- **Animation Sequence:** Each algebra step transforms into the next
+- **Visual Drama:** The added (b/2a)^2 term flashes gold
+- **Key Message:** Every step keeps both sides equal
+
+Scene 2: The Formula
+- **Transition:** The square root step slides up
+- **Visual Journey:** The final formula assembles from its parts
+- **Dramatic Elements:** The plus-minus sign pulses
+- **Entertainment Factor:** The discriminant is boxed
+
+# Cinematic Technical Specifications
+- **Dimension:** 2D chosen for **maximum visual impact** because the derivation is symbolic
+- **Camera Work:** Static
+- **Text Treatment:** Dramatic reveals using Text/MathTex/Tex3D with TransformMatchingTex between steps
+"""
+
+SOLAR_SYSTEM = """Create a **cinematic 3D Manim animation** to show why planets orbit the sun. Structure into 2 **visually stunning scenes** with sweeping moves and **captivating visual emphasis**.
+
+# Cinematic Scene Breakdown
+
+Scene 1: The Pull of the Sun
+- **Opening Hook:** A glowing sun fades in at the centre
+- **Animation Sequence:** The camera circles while a planet falls towards the sun
+- **Key Message:** Gravity pulls inwards
+
+# Cinematic Technical Specifications
+- **Dimension:** 3D chosen for **maximum visual impact** because orbits live in space
+- **Camera Work:** Slow ambient rotation around the sun, then a zoom onto the planet
+- **Text Treatment:** Dramatic reveals using Text/MathTex/Tex3D with fixed-in-frame labels
+"""
+
+
+@pytest.fixture
+def index():
+    return load_index(os.path.join(PROMPTS_DIR, "SystemInstruction.md"))
+
+
+@pytest.fixture
+def template():
+    return load_template(os.path.join(PROMPTS_DIR, "userFilterPrompt.md"))
+
+
+def test_template_wording_does_not_select_sections(index, template):
+    stripped = template.strip(BUBBLE_SORT)
+    assert "camera work" not in stripped and "mathtex" not in stripped
+    assert "static frame, everything stays in view" in stripped
+    assert index.select(stripped) == [s.name for s in index.sections if s.always]
+    # Matched on the raw brief, the boilerplate pulls in camera and LaTeX guidance
+    assert {"camera-work", "latex"} <= set(index.select(BUBBLE_SORT))
+
+
+def test_filled_in_text_still_selects(index, template):
+    assert "latex" in index.select(template.strip(QUADRATIC))
+    assert "camera-work" not in index.select(template.strip(QUADRATIC))
+    selected = index.select(template.strip(SOLAR_SYSTEM))
+    assert {"camera-work", "vector-math"} <= set(selected) and "latex" not in selected
+
+
+def test_plain_prompts_pass_through(template):
+    prompt = "Visualize the quadratic formula with a zoom on the discriminant"
+    assert template.strip(prompt) == prompt.lower()
+
+
+def test_sliced_instruction_is_smaller_for_template_briefs(index):
+    assert len(select_system_instruction(BUBBLE_SORT)) < len(index.assemble(BUBBLE_SORT))
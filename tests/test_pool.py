@@ -0,0 +1,27 @@
+from render.pool import find_scene_class, find_scene_classes, no_output_config
+
+CODE = '''
+from manim import *
+
+class Helper:
+    pass
+
+class Intro(Scene):
+    pass
+
+class Zoom(MovingCameraScene):
+    pass
+'''
+
+
+def test_scene_classes_in_definition_order():
+    assert find_scene_classes(CODE) == ["Intro", "Zoom"]
+    assert find_scene_class(CODE) == "Intro"
+    assert find_scene_class("x = 1") is None
+
+
+def test_skip_mode_uses_a_thumbnail_camera():
+    options = no_output_config("scene.py")
+    assert options["pixel_width"] * options["pixel_height"] <= 64 * 36
+    assert options["pixel_width"] * 9 == options["pixel_height"] * 16
+    assert options["frame_rate"] <= 15 and not options["write_to_movie"]
@@ -0,0 +1,126 @@
+import asyncio
+import itertools
+
+import pytest
+
+from ai.providers import FakeProvider, HedgedProvider, make_provider, percentile, request_kind
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 95) == 95
+    assert percentile(values, 100) == 100
+    assert percentile([3.0], 50) == 3.0
+
+
+def test_make_provider_parses_specs():
+    provider = make_provider("fake:tiny")
+    assert isinstance(provider, FakeProvider) and provider.model == "tiny"
+    with pytest.raises(ValueError):
+        make_provider("nope")
+
+
+def test_deadline_waits_for_min_samples_then_tracks_percentile():
+    hedged = HedgedProvider(FakeProvider(), FakeProvider(), percentile=90, min_samples=10,
+                            initial_deadline=None)
+    kind = request_kind("sys")
+    for latency in range(1, 10):
+        hedged._observe(kind, float(latency))
+    assert hedged.deadline("sys") is None
+    hedged._observe(kind, 10.0)
+    assert hedged.deadline("sys") == 9.0
+    assert hedged.deadline("another instruction") is None
+
+
+def test_slow_primary_is_hedged():
+    primary = FakeProvider("p", latency=0.5, respond=lambda s, c: "primary")
+    secondary = FakeProvider("s", respond=lambda s, c: "secondary")
+    hedged = HedgedProvider(primary, secondary, initial_deadline=0.05)
+    assert hedged.generate("sys", "hi").text == "secondary"
+    assert hedged.stats()["hedged"] == 1 and hedged.stats()["secondary_wins"] == 1
+
+
+def test_fast_primary_is_not_hedged():
+    secondary = FakeProvider("s")
+    hedged = HedgedProvider(FakeProvider("p"), secondary, initial_deadline=1.0)
+    assert asyncio.run(hedged.agenerate("sys", "hi")).model == "p"
+    assert secondary.calls == [] and hedged.stats()["hedged"] == 0
+
+
+def test_failing_primary_fails_over():
+    def fail(system_instruction, contents):
+        raise RuntimeError("boom")
+
+    hedged = HedgedProvider(FakeProvider("p", respond=fail), FakeProvider("s"),
+                            initial_deadline=5.0)
+    assert hedged.generate("sys", "hi").model == "s"
+    assert hedged.stats()["failovers"] == 1
+
+
+def test_mostly_fast_primary_only_hedges_the_tail():
+    latencies = itertools.cycle([0.0] * 9 + [0.3])
+    primary = FakeProvider("p", latency=lambda: next(latencies))
+    hedged = HedgedProvider(primary, FakeProvider("s"), percentile=80, min_samples=10)
+    for _ in range(20):
+        hedged.generate("sys", "hi")
+    assert hedged.deadline("sys") < 0.1
+    assert hedged.stats()["hedged"] <= 2
+
+
+def _drain(stream):
+    chunks = []
+    while True:
+        try:
+            chunks.append(next(stream))
+        except StopIteration as stop:
+            return chunks, stop.value
+
+
+def test_stream_yields_chunks_then_the_completion():
+    chunks, completion = _drain(FakeProvider("p", respond=lambda s, c: "a\nb\nc").stream(
+        "sys", "hi"))
+    assert chunks == ["a\n", "b\n", "c"] and completion.text == "a\nb\nc"
+
+
+def test_slow_stream_is_hedged_on_its_first_chunk():
+    primary = FakeProvider("p", latency=0.5, respond=lambda s, c: "primary")
+    hedged = HedgedProvider(primary, FakeProvider("s", respond=lambda s, c: "secondary"),
+                            initial_deadline=0.05)
+    chunks, completion = _drain(hedged.stream("sys", "hi"))
+    assert chunks == ["secondary"] and completion.model == "s"
+    assert hedged.stats()["hedged"] == 1 and hedged.stats()["secondary_wins"] == 1
+
+
+def test_busy_hedge_executor_does_not_delay_new_primaries():
+    import threading
+    import time
+
+    primary = FakeProvider("p", latency=0.5, respond=lambda s, c: "primary")
+    hedged = HedgedProvider(primary, FakeProvider("s", respond=lambda s, c: "secondary"),
+                            initial_deadline=0.05, max_workers=1)
+    answers, elapsed = [], []
+
+    def call():
+        start = time.perf_counter()
+        answers.append(hedged.generate("sys", "hi").text)
+        elapsed.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert answers == ["secondary"] * 3 and max(elapsed) < 0.4
+
+
+def test_hedged_answers_are_cached_under_the_model_that_answered(isolated_state):
+    from ai.GEMINI.app import generate_text
+    from ai.GEMINI.cache import make_key
+
+    primary = FakeProvider("p", latency=0.5, respond=lambda s, c: "primary")
+    hedged = HedgedProvider(primary, FakeProvider("s", respond=lambda s, c: "secondary"),
+                            initial_deadline=0.05)
+    assert generate_text("sys", "hi", provider=hedged) == "secondary"
+    cache = isolated_state["get_response_cache"]
+    assert cache.get(make_key("p", "sys", "hi")) is None
+    assert cache.get(make_key("s", "sys", "hi")) == "secondary"
@@ -0,0 +1,125 @@
+import pytest
+
+from ai.providers import FakeProvider
+from ai.ratelimit import (Quota, RateLimitedProvider, RateLimiter, RateLimitError,
+                          is_rate_limited, retry_after)
+
+
+@pytest.fixture
+def limiter(tmp_path):
+    return RateLimiter({"m": Quota(rpm=60, tpm=1000, max_concurrency=4)},
+                       state_dir=str(tmp_path), base_backoff=1.0, poll_interval=0.01)
+
+
+def test_requests_bucket_makes_callers_wait(tmp_path):
+    limiter = RateLimiter({"m": Quota(rpm=2)}, state_dir=str(tmp_path))
+    assert limiter.try_acquire("m", 10)[0] is not None
+    assert limiter.try_acquire("m", 10)[0] is not None
+    lease, wait = limiter.try_acquire("m", 10)
+    assert lease is None and 0 < wait <= 30
+
+
+def test_token_settlement_refunds_overestimates(limiter):
+    lease = limiter.acquire("m", 500)
+    limiter.release("m", lease, tokens=100)
+    assert limiter.status()["m"]["tokens"] == pytest.approx(900, abs=1)
+
+
+def test_aimd_halves_once_per_episode_and_grows_additively(limiter):
+    leases = [limiter.acquire("m", 10) for _ in range(3)]
+    limiter.throttled("m", leases[0])
+    limiter.throttled("m", leases[1])
+    state = limiter.status()["m"]
+    assert state["limit"] == 2.0
+    assert state["throttles"] == 2 and state["consecutive_throttles"] == 1
+    limiter.release("m", leases[2])
+    assert limiter.status()["m"]["limit"] == 2.5
+
+
+def test_concurrency_limit_blocks_new_leases(limiter):
+    for _ in range(4):
+        assert limiter.try_acquire("m", 1)[0] is not None
+    assert limiter.try_acquire("m", 1)[0] is None
+    with pytest.raises(RateLimitError):
+        limiter.acquire("m", 1, max_wait=0.05)
+
+
+def test_expired_leases_free_their_slot(tmp_path):
+    limiter = RateLimiter({"m": Quota(max_concurrency=1)}, state_dir=str(tmp_path), lease_s=-1)
+    assert limiter.try_acquire("m", 1)[0] is not None
+    assert limiter.try_acquire("m", 1)[0] is not None
+
+
+class Throttled(Exception):
+    code = 429
+
+
+def test_provider_retries_after_429(limiter):
+    answers = iter([Throttled("RESOURCE_EXHAUSTED retryDelay: 0s"), None])
+
+    def respond(system_instruction, contents):
+        error = next(answers)
+        if error:
+            raise error
+        return "ok"
+
+    provider = RateLimitedProvider(FakeProvider("m", respond=respond), limiter,
+                                   expected_output=10)
+    limiter.base_backoff = 0.01
+    assert provider.generate("sys", "hi").text == "ok"
+    assert limiter.status()["m"]["throttles"] == 1
+
+
+def test_rate_limit_detection():
+    error = Throttled("429 RESOURCE_EXHAUSTED. retryDelay: 7s")
+    assert is_rate_limited(error) and retry_after(error) == 7.0
+    assert not is_rate_limited(ValueError("bad request"))
+
+
+def test_stream_holds_one_lease_and_retries_429_before_text(limiter):
+    answers = iter([Throttled("RESOURCE_EXHAUSTED retryDelay: 0s"), None])
+
+    def respond(system_instruction, contents):
+        error = next(answers)
+        if error:
+            raise error
+        return "line 1\nline 2\n"
+
+    provider = RateLimitedProvider(FakeProvider("m", respond=respond), limiter,
+                                   expected_output=10)
+    limiter.base_backoff = 0.01
+    assert list(provider.stream("sys", "hi")) == ["line 1\n", "line 2\n"]
+    state = limiter.status()["m"]
+    assert state["throttles"] == 1 and state["leases"] == {}
+
+
+def test_abandoned_stream_frees_its_slot(limiter):
+    provider = RateLimitedProvider(FakeProvider("m", respond=lambda s, c: "a\nb\n"), limiter,
+                                   expected_output=10)
+    stream = provider.stream("sys", "hi")
+    assert next(stream) == "a\n"
+    stream.close()
+    assert limiter.status()["m"]["leases"] == {}
+
+
+def test_async_acquire_waits_for_the_lock_off_the_event_loop(limiter):
+    import asyncio
+    import threading
+    import time
+
+    from render.filelock import FileLock
+
+    lock = FileLock(limiter._path("m") + ".lock").acquire()
+    threading.Timer(0.3, lock.release).start()
+
+    async def main():
+        waiter = asyncio.create_task(limiter.aacquire("m", 1))
+        longest, last = 0.0, time.monotonic()
+        while not waiter.done():
+            # Other coroutines keep running while the lock is held elsewhere
+            await asyncio.sleep(0.01)
+            longest, last = max(longest, time.monotonic() - last), time.monotonic()
+        return longest, waiter.result()
+
+    longest, lease = asyncio.run(main())
+    assert lease is not None and longest < 0.2
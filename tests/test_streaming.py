@@ -0,0 +1,118 @@
+import random
+
+import pytest
+
+from ai.GEMINI.app import extract_python_code_blocks
+from ai.GEMINI.streaming import IncrementalCodeExtractor
+
+RESPONSES = [
+    "no code here at all",
+    "```python\nprint(1)\n```",
+    "Intro\n```python\nimport math\n```\ntext ```python\nclass A:\n    pass\n``` tail",
+    "```python\nx = '```'\n```\n```python\ny = 2\n```",
+    "```python\nunterminated = True\n",
+    "```py\nnot python\n```\n```python\nok = 1\n```",
+]
+
+
+def _chunks(text, rng):
+    chunks, pos = [], 0
+    while pos < len(text):
+        size = rng.randint(1, 7)
+        chunks.append(text[pos:pos + size])
+        pos += size
+    return chunks
+
+
+@pytest.mark.parametrize("text", RESPONSES)
+def test_incremental_extraction_matches_batch_extraction(text):
+    rng = random.Random(text)
+    for _ in range(20):
+        extractor = IncrementalCodeExtractor()
+        streamed = []
+        for chunk in _chunks(text, rng):
+            streamed.extend(extractor.feed(chunk))
+        assert extractor.finish() == extract_python_code_blocks(text)
+        assert streamed == extractor.blocks
+
+
+def test_blocks_are_emitted_when_their_fence_closes():
+    extractor = IncrementalCodeExtractor()
+    assert extractor.feed("```python\na = 1\n") == []
+    assert extractor.feed("```\n```python\nb = 2") == ["a = 1"]
+    assert extractor.feed("\n```") == ["b = 2"]
+
+
+class RecordingPool:
+    work_dir = None
+
+    def __init__(self, smoke=None, smoke_delay=0.1):
+        self.submitted = []
+        self.smoked = []
+        self.smoke = smoke
+        self.smoke_delay = smoke_delay
+
+    def run(self, fn, path, scene_name, mode):
+        import threading
+        import time
+        from concurrent.futures import Future
+
+        from render.smoke import SmokeResult
+
+        future = Future()
+        with open(path, encoding="utf-8") as f:
+            code = f.read()
+        self.smoked.append((scene_name, time.perf_counter()))
+        ok = self.smoke(scene_name, code) if self.smoke else True
+        result = SmokeResult(ok, scene_name, mode, error=None if ok else "NameError: helper")
+        threading.Timer(self.smoke_delay, future.set_result, (result,)).start()
+        return future
+
+    def submit(self, code, scene_name=None, quality=None):
+        from types import SimpleNamespace
+
+        self.submitted.append((scene_name, code))
+        return SimpleNamespace(job_id=f"job-{len(self.submitted)}")
+
+
+def test_each_scene_is_rendered_once_from_the_block_defining_it(fake_client):
+    from ai.GEMINI.streaming import stream_and_render
+
+    blocks = [
+        "from manim import *\n\nclass Intro(Scene):\n    def construct(self):\n        pass",
+        "def helper():\n    return 1",
+        "class Outro(Scene):\n    def construct(self):\n        helper()",
+    ]
+    fake_client.respond = lambda s, c: "\n".join(f"```python\n{b}\n```" for b in blocks)
+    pool = RecordingPool()
+    jobs = stream_and_render("brief", pool, system_instruction="sys", on_event=lambda e: None,
+                             smoke_mode=None, use_cache=False, genai_client=fake_client)
+    assert [name for name, _ in pool.submitted] == ["Intro", "Outro"]
+    assert len(jobs) == 2
+    assert "def helper" in pool.submitted[1][1]
+
+
+def test_smoke_tests_do_not_hold_up_the_stream(fake_client, tmp_path):
+    import time
+
+    from ai.GEMINI.streaming import stream_and_render
+
+    blocks = [
+        "from manim import *\n\nclass Intro(Scene):\n    def construct(self):\n        helper()",
+        "class Outro(Scene):\n    def construct(self):\n        pass",
+        "def helper():\n    return 1",
+    ]
+    fake_client.respond = lambda s, c: "\n".join(f"```python\n{b}\n```" for b in blocks)
+    # Intro only passes once helper() has been defined
+    pool = RecordingPool(smoke=lambda name, code: name != "Intro" or "def helper" in code)
+    pool.work_dir = str(tmp_path)
+    start = time.perf_counter()
+    jobs = stream_and_render("brief", pool, system_instruction="sys", on_event=lambda e: None,
+                             use_cache=False, genai_client=fake_client)
+    first_two = [name for name, _ in pool.smoked[:2]]
+    assert first_two == ["Intro", "Outro"]
+    # Both smoke tests were started before the first one (0.1s) could finish
+    assert pool.smoked[1][1] - start < 0.1
+    assert sorted(name for name, _ in pool.submitted) == ["Intro", "Outro"]
+    assert len(jobs) == 2
+    assert "def helper" in dict(pool.submitted)["Intro"]